@@ -0,0 +1,559 @@
+#!/usr/bin/env python
+"""
+Offline benchmarks for the client, run against a local stub of the API
+
+A stub server, in its own process, answers every route the subclients
+call with a realistically sized fixture, after a configurable delay. The
+same mix of calls across members, bills, votes, committees, statements
+and lobbying filings is then run four ways:
+
+* ``serial``: one call after another, on one thread
+* ``threaded``: calls spread over a thread pool sharing one client
+* ``batched``: the same paths through ``Client.fetch_many``
+* ``async``: the calls through ``AsyncCongress``, gathered
+
+For each, it reports throughput, p50 and p99 latency (per call, or per batch
+for ``batched``), CPU time per call, and peak and retained memory. Results
+can be saved as JSON and compared against a saved run::
+
+    $ python bench.py --calls 1000 --latency 0.02 --save before.json
+    $ python bench.py --calls 1000 --latency 0.02 --compare before.json
+
+With ``--compare``, the exit status is 1 if any scenario regressed by more
+than ``--threshold`` percent. ``--fixtures`` serves responses from a JSON
+file mapping route templates to response bodies, such as one written by
+``--dump-fixtures``, in place of the built-in ones. ``--cassette`` serves
+real responses recorded with ``congress.cassette.Cassette``, one per route.
+
+No API key or network access is needed. Requires Python 3.4 or newer, for
+``time.process_time`` and ``tracemalloc``; the ``async`` scenario needs 3.6.
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from six.moves import BaseHTTPServer, socketserver
+
+import congress
+from congress import Congress
+from congress.metrics import ROUTES, display, route
+from congress.transport import PooledHttp
+
+SCENARIOS = ('serial', 'threaded', 'batched', 'async')
+if sys.version_info < (3, 6):
+    # no AsyncCongress
+    SCENARIOS = SCENARIOS[:-1]
+
+# lower is better for these; higher for throughput
+COSTS = ('p50_ms', 'p99_ms', 'cpu_ms_per_call', 'peak_kib')
+
+STATES = ('CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI')
+POSITIONS = ('Yes', 'Yes', 'No', 'No', 'Not Voting', 'Present')
+
+
+# fixtures
+
+def member_id(i):
+    return '{0}{1:06d}'.format(chr(ord('A') + i % 26), i)
+
+
+def member(i):
+    return {
+        'id': member_id(i), 'member_id': member_id(i), 'api_uri': 'https://api.propublica.org/congress/v1/members/{0}.json'.format(member_id(i)),
+        'first_name': 'First{0}'.format(i), 'middle_name': None, 'last_name': 'Last{0}'.format(i),
+        'suffix': None, 'date_of_birth': '1960-01-01', 'gender': 'F' if i % 2 else 'M',
+        'party': 'D' if i % 2 else 'R', 'leadership_role': None, 'twitter_account': 'Rep{0}'.format(i),
+        'facebook_account': 'Rep{0}'.format(i), 'youtube_account': None, 'govtrack_id': str(400000 + i),
+        'cspan_id': str(1000 + i), 'votesmart_id': str(2000 + i), 'icpsr_id': str(3000 + i),
+        'crp_id': 'N{0:08d}'.format(i), 'google_entity_id': '/m/0{0}'.format(i), 'fec_candidate_id': 'H{0:08d}'.format(i),
+        'url': 'https://example.house.gov/{0}'.format(i), 'rss_url': None, 'contact_form': None,
+        'in_office': True, 'seniority': str(i % 30), 'next_election': '2020',
+        'total_votes': 700, 'missed_votes': i % 20, 'total_present': 0,
+        'last_updated': '2019-06-01 12:00:00 -0400', 'ocd_id': 'ocd-division/country:us/state:ca/cd:{0}'.format(i % 50),
+        'office': '{0} Rayburn House Office Building'.format(1000 + i), 'phone': '202-225-{0:04d}'.format(i),
+        'fax': None, 'state': STATES[i % len(STATES)], 'district': str(i % 50 + 1), 'at_large': False,
+        'geoid': '06{0:02d}'.format(i % 50), 'missed_votes_pct': 1.2, 'votes_with_party_pct': 95.1,
+        'roles': [{'congress': '116', 'chamber': 'House', 'title': 'Representative', 'state': STATES[i % len(STATES)],
+                   'party': 'D' if i % 2 else 'R', 'district': str(i % 50 + 1), 'start_date': '2019-01-03',
+                   'end_date': '2021-01-03', 'committees': [{'name': 'Committee on Rules', 'code': 'HSRU'}]}],
+    }
+
+
+def position(i):
+    return {
+        'member_id': member_id(i), 'name': 'First{0} Last{0}'.format(i), 'party': 'D' if i % 2 else 'R',
+        'state': STATES[i % len(STATES)], 'district': str(i % 50 + 1), 'vote_position': POSITIONS[i % len(POSITIONS)],
+        'dw_nominate': round(((i % 200) - 100) / 100.0, 3),
+    }
+
+
+def vote(n, positions=()):
+    result = {
+        'congress': 116, 'session': 1, 'chamber': 'House', 'roll_call': n, 'source': 'https://clerk.house.gov/evs/2019/roll{0:03d}.xml'.format(n),
+        'url': 'https://clerk.house.gov/evs/2019/roll{0:03d}.xml'.format(n),
+        'bill': {'bill_id': 'hr{0}-116'.format(n), 'number': 'H.R.{0}'.format(n), 'api_uri': None,
+                 'title': 'A bill to do something, number {0}'.format(n), 'latest_action': 'Passed'},
+        'question': 'On Passage', 'description': 'Some act of {0}'.format(n), 'vote_type': 'RECORDED VOTE',
+        'date': '2019-03-{0:02d}'.format(n % 28 + 1), 'time': '14:{0:02d}:00'.format(n % 60),
+        'result': 'Passed', 'tie_breaker': '', 'tie_breaker_vote': '',
+        'democratic': {'yes': 230, 'no': 3, 'present': 0, 'not_voting': 2, 'majority_position': 'Yes'},
+        'republican': {'yes': 10, 'no': 185, 'present': 0, 'not_voting': 4, 'majority_position': 'No'},
+        'total': {'yes': 240, 'no': 188, 'present': 0, 'not_voting': 6},
+    }
+    if positions:
+        result['positions'] = list(positions)
+    return result
+
+
+def bill(i):
+    return {
+        'bill_id': 'hr{0}-116'.format(i), 'bill_slug': 'hr{0}'.format(i), 'bill_type': 'hr', 'number': 'H.R.{0}'.format(i),
+        'congress': '116', 'title': 'To amend title {0} of the United States Code, and for other purposes.'.format(i),
+        'short_title': 'Act number {0}'.format(i), 'sponsor_title': 'Rep.', 'sponsor_id': member_id(i),
+        'sponsor_name': 'First{0} Last{0}'.format(i), 'sponsor_state': STATES[i % len(STATES)], 'sponsor_party': 'D',
+        'introduced_date': '2019-02-{0:02d}'.format(i % 28 + 1), 'active': True, 'house_passage': None,
+        'senate_passage': None, 'enacted': None, 'vetoed': None, 'cosponsors': i % 40,
+        'cosponsors_by_party': {'D': i % 30, 'R': i % 10}, 'committees': 'House Ways and Means Committee',
+        'committee_codes': ['HSWM'], 'subcommittee_codes': [], 'primary_subject': 'Taxation',
+        'summary': 'This bill makes changes to things. ' * 8, 'summary_short': 'This bill makes changes to things.',
+        'latest_major_action_date': '2019-03-{0:02d}'.format(i % 28 + 1),
+        'latest_major_action': 'Referred to the House Committee on Ways and Means.',
+        'actions': [{'id': j, 'chamber': 'House', 'action_type': 'IntroReferral', 'datetime': '2019-02-01',
+                     'description': 'Referred to the House Committee on Ways and Means.'} for j in range(5)],
+        'votes': [],
+    }
+
+
+def statement(i):
+    return {
+        'url': 'https://example.house.gov/media/press-releases/{0}'.format(i), 'date': '2019-05-{0:02d}'.format(i % 28 + 1),
+        'title': 'Statement on the passage of bill number {0}, a very important measure'.format(i),
+        'statement_type': 'Press Release', 'member_id': member_id(i), 'congress': 116, 'member_uri': None,
+        'name': 'First{0} Last{0}'.format(i), 'chamber': 'House', 'state': STATES[i % len(STATES)],
+        'party': 'D' if i % 2 else 'R', 'subjects': [{'name': 'Health', 'slug': 'health'}],
+    }
+
+
+def committee(i):
+    return {
+        'id': 'HS{0:02d}'.format(i), 'name': 'Committee number {0}'.format(i), 'chamber': 'House', 'congress': '116',
+        'url': 'https://example.house.gov/committee/{0}'.format(i), 'chair': 'First{0} Last{0}'.format(i),
+        'chair_id': member_id(i), 'chair_party': 'D', 'chair_state': 'CA', 'ranking_member_id': member_id(i + 1),
+        'current_members': [dict(position(j), rank_in_party=j, side='majority') for j in range(40)],
+        'subcommittees': [{'id': 'HS{0:02d}{1:02d}'.format(i, j), 'name': 'Subcommittee {0}'.format(j)} for j in range(6)],
+    }
+
+
+def filing(i):
+    return {
+        'id': str(i), 'lobbying_registrant': {'name': 'Registrant {0} LLC'.format(i), 'general_description': 'Lobbying'},
+        'lobbying_client': {'name': 'Client {0} Inc'.format(i), 'general_description': 'Widgets'},
+        'signed_date': '2019-04-01', 'effective_date': '2019-04-01', 'xml_filename': None,
+        'specific_issues': ['Issues relating to appropriations and widgets, number {0}'.format(i)],
+        'report_type': 'Registration', 'report_year': '2019',
+    }
+
+
+def cassette_fixtures(filename):
+    "Response bodies by route template, from a recorded cassette"
+    from congress.cassette import Cassette
+
+    fixtures = build_fixtures()
+    for interaction in Cassette(filename).interactions.values():
+        if interaction.status == 200 and not interaction.conditions:
+            fixtures[route(interaction.path)] = json.loads(interaction.body.decode('utf-8'))
+    return fixtures
+
+
+def build_fixtures():
+    "Response bodies for every route the subclients call, keyed by route template"
+    members = [member(i) for i in range(441)]
+    page = 20
+
+    results = {
+        '{congress}/{chamber}/sessions/{session}/votes/{n}.json':
+            {'votes': {'vote': vote(17, [position(i) for i in range(435)]), 'vacant_seats': []}},
+        '{chamber}/votes/recent.json': {'chamber': 'House', 'offset': 0, 'num_results': page,
+                                        'votes': [vote(n) for n in range(page)]},
+        '{chamber}/votes/{year}/{month}.json': {'chamber': 'House', 'votes': [vote(n) for n in range(60)]},
+        '{chamber}/votes/{start}/{end}.json': {'chamber': 'House', 'votes': [vote(n) for n in range(60)]},
+        'members/{member_id}.json': [members[0]],
+        '{congress}/{chamber}/members.json': [{'congress': '116', 'chamber': 'House', 'num_results': len(members),
+                                               'offset': 0, 'members': members}],
+        '{congress}/bills/{bill_id}.json': [bill(1)],
+        '{congress}/{chamber}/bills/{type}.json': [{'congress': 116, 'chamber': 'House', 'num_results': page,
+                                                    'offset': 0, 'bills': [bill(i) for i in range(page)]}],
+        '{congress}/{chamber}/committees.json': [{'congress': '116', 'chamber': 'House', 'num_results': 20,
+                                                  'committees': [committee(i) for i in range(20)]}],
+        '{congress}/{chamber}/committees/{committee}.json': [committee(1)],
+        'statements/latest.json': [statement(i) for i in range(page)],
+        'statements/date/{date}.json': [statement(i) for i in range(page)],
+        'statements/search.json': [statement(i) for i in range(page)],
+        'lobbying/latest.json': [{'num_results': page, 'offset': 0,
+                                  'lobbying_representations': [filing(i) for i in range(page)]}],
+        'lobbying/{filing}.json': [filing(1)],
+    }
+
+    fixtures = {}
+    for template in ROUTES:
+        template = display(template)
+        fixtures[template] = {'status': 'OK', 'copyright': 'Copyright (c) 2019 Pro Publica Inc. All Rights Reserved.',
+                              'results': results.get(template, [{}])}
+    return fixtures
+
+
+# the stub server
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    "Answer each path with its route's fixture, after the server's delay"
+
+    protocol_version = 'HTTP/1.1'
+
+    # send headers and body in one write, not two small packets
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        path = self.path.split('/congress/v1/', 1)[-1]
+        body = server.bodies.get(route(path), server.not_found)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve(pipe, fixtures, latency=0, jitter=0):
+    "Run a stub server, sending its port down ``pipe``"
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    server.bodies = dict((template, json.dumps(body).encode('utf-8')) for template, body in fixtures.items())
+    server.not_found = json.dumps({'status': '404'}).encode('utf-8')
+    server.latency = latency
+    server.jitter = jitter
+
+    pipe.send(server.server_port)
+    server.serve_forever()
+
+
+def start_server(fixtures, latency=0, jitter=0):
+    "Start a stub server in another process. Returns the process and its base URI"
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(child, fixtures, latency, jitter))
+    process.daemon = True
+    process.start()
+    port = parent.recv()
+    return process, 'http://127.0.0.1:{0}/congress/v1/'.format(port)
+
+
+# the workload: (call, path) pairs, each a function of the call's index,
+# so every call in a run requests a different path
+
+WORKLOAD = (
+    (lambda c, i: c.members.get(member_id(i)),
+     lambda i: 'members/{0}.json'.format(member_id(i))),
+    (lambda c, i: c.bills.get('hr{0}'.format(i + 1), 116),
+     lambda i: '116/bills/hr{0}.json'.format(i + 1)),
+    (lambda c, i: c.votes.get('house', i + 1, 1, 116),
+     lambda i: '116/house/sessions/1/votes/{0}.json'.format(i + 1)),
+    (lambda c, i: c.bills.recent('house', 116, page=i + 1),
+     lambda i: '116/house/bills/introduced.json?offset={0}'.format(i * 20)),
+    (lambda c, i: c.statements.recent(page=i + 1),
+     lambda i: 'statements/latest.json?offset={0}'.format(i * 20)),
+    (lambda c, i: c.committees.get('house', 'HS{0:04d}'.format(i), 116),
+     lambda i: '116/house/committees/HS{0:04d}.json'.format(i)),
+    (lambda c, i: c.lobbying.get(i + 1),
+     lambda i: 'lobbying/{0}.json'.format(i + 1)),
+)
+
+SUBCLIENTS = ('members', 'bills', 'votes', 'statements', 'committees', 'lobbying')
+
+
+def call(client, i):
+    return WORKLOAD[i % len(WORKLOAD)][0](client, i)
+
+
+def path(i):
+    return WORKLOAD[i % len(WORKLOAD)][1](i)
+
+
+def results(response):
+    return response['results']
+
+
+def point(client, base_uri):
+    "Send a client's requests, and its subclients', to the stub server"
+    client.BASE_URI = base_uri
+    for name in SUBCLIENTS:
+        getattr(client, name).BASE_URI = base_uri
+    return client
+
+
+def timed(fn, *args):
+    start = time.time()
+    fn(*args)
+    return time.time() - start
+
+
+def run_serial(options, base_uri, calls, offset=0):
+    client = point(Congress('bench', cache=None, records=options.records), base_uri)
+    return [timed(call, client, offset + i) for i in range(calls)]
+
+
+def run_threaded(options, base_uri, calls, offset=0):
+    http = PooledHttp(None, pool_size=options.threads)
+    client = point(Congress('bench', cache=None, http=http, records=options.records), base_uri)
+    with ThreadPoolExecutor(options.threads) as pool:
+        return list(pool.map(lambda i: timed(call, client, offset + i), range(calls)))
+
+
+def run_batched(options, base_uri, calls, offset=0):
+    http = PooledHttp(None, pool_size=options.threads)
+    client = point(Congress('bench', cache=None, http=http, records=options.records), base_uri)
+
+    latencies = []
+    for start in range(0, calls, options.batch):
+        paths = [(path(offset + i), results) for i in range(start, min(calls, start + options.batch))]
+        latencies.append(timed(client.fetch_many, paths, options.threads))
+    return latencies
+
+
+def run_async(options, base_uri, calls, offset=0):
+    # written without async syntax, so the other scenarios still run before 3.6
+    import asyncio
+    from congress.aio import AsyncCongress
+
+    loop = asyncio.new_event_loop()
+    client = point(AsyncCongress('bench', max_concurrency=options.concurrency,
+                                 records=options.records), base_uri)
+    latencies = []
+
+    def start(i):
+        started = time.time()
+        task = loop.create_task(call(client, offset + i))
+        task.add_done_callback(lambda task: latencies.append(time.time() - started))
+        return task
+
+    try:
+        loop.run_until_complete(asyncio.gather(*[start(i) for i in range(calls)]))
+        loop.run_until_complete(client.close())
+    finally:
+        loop.close()
+    return latencies
+
+
+RUNNERS = {
+    'serial': run_serial,
+    'threaded': run_threaded,
+    'batched': run_batched,
+    'async': run_async,
+}
+
+
+# measurement
+
+def percentile(values, q):
+    "The q-th percentile of values, by nearest rank"
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(q / 100.0 * len(values))) - 1))]
+
+
+def measure_memory(runner, options, base_uri, calls):
+    """
+    Peak memory allocated during a run of ``calls`` calls, in KiB, and
+    bytes still allocated per call once it's over
+    """
+    try:
+        import tracemalloc
+    except ImportError:
+        return None, None
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        runner(options, base_uri, calls, offset=options.calls)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - before) / 1024.0, (current - before) / float(calls)
+
+
+def measure(name, options, base_uri):
+    "Run one scenario and return its results"
+    runner = RUNNERS[name]
+
+    # warm up: open connections, import modules, fill route memos
+    runner(options, base_uri, min(options.calls, len(WORKLOAD) * 2))
+
+    cpu, wall = time.process_time(), time.time()
+    latencies = runner(options, base_uri, options.calls)
+    cpu, wall = time.process_time() - cpu, time.time() - wall
+
+    peak, retained = measure_memory(runner, options, base_uri, min(options.calls, options.memory_calls))
+    return {
+        'calls': options.calls,
+        'seconds': wall,
+        'throughput': options.calls / wall,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'cpu_ms_per_call': cpu * 1000 / options.calls,
+        'peak_kib': peak,
+        'retained_bytes_per_call': retained,
+    }
+
+
+def metadata(options):
+    return {
+        'date': datetime.datetime.utcnow().isoformat(),
+        'version': congress.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': multiprocessing.cpu_count(),
+        'options': dict((k, v) for k, v in vars(options).items()
+                        if k in ('calls', 'latency', 'jitter', 'threads', 'batch', 'concurrency', 'records')),
+    }
+
+
+def run(options, log=print):
+    "Run the chosen scenarios against a fresh stub server, returning the results"
+    if options.fixtures:
+        with open(options.fixtures) as f:
+            fixtures = json.load(f)
+    elif options.cassette:
+        fixtures = cassette_fixtures(options.cassette)
+    else:
+        fixtures = build_fixtures()
+
+    process, base_uri = start_server(fixtures, options.latency, options.jitter)
+    try:
+        results = {}
+        for name in options.scenarios:
+            results[name] = measure(name, options, base_uri)
+            log(report_line(name, results[name]))
+        return {'meta': metadata(options), 'results': results}
+    finally:
+        process.terminate()
+        process.join()
+
+
+# reporting
+
+def report_line(name, result):
+    return ('{0:<9} {throughput:9.1f} calls/s  p50 {p50_ms:7.2f} ms  p99 {p99_ms:7.2f} ms  '
+            'cpu {cpu_ms_per_call:6.3f} ms/call  peak {peak} KiB').format(
+                name, peak='{0:.0f}'.format(result['peak_kib']) if result['peak_kib'] is not None else '-',
+                **result)
+
+
+def change(new, old):
+    if not old or new is None:
+        return None
+    return (new - old) * 100.0 / old
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a saved baseline. Returns lines to print and the
+    regressions: (scenario, measure, percent change) for every measure more
+    than ``threshold`` percent worse.
+    """
+    lines, regressions = [], []
+    for name, result in sorted(results['results'].items()):
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+
+        worse = [('throughput', -change(result['throughput'], old['throughput']))]
+        worse.extend((key, change(result[key], old.get(key))) for key in COSTS)
+
+        parts = []
+        for key, pct in worse:
+            if pct is None:
+                continue
+            parts.append('{0} {1:+.1f}%'.format(key, -pct if key == 'throughput' else pct))
+            if pct > threshold:
+                regressions.append((name, key, pct))
+        lines.append('{0:<9} {1}'.format(name, '  '.join(parts)))
+    return lines, regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the client against a local stub API")
+    parser.add_argument('--calls', type=int, default=500, help="calls per scenario")
+    parser.add_argument('--latency', type=float, default=0.005, help="seconds the stub waits before answering")
+    parser.add_argument('--jitter', type=float, default=0, help="extra random wait, up to this many seconds")
+    parser.add_argument('--threads', type=int, default=16, help="workers for threaded and batched")
+    parser.add_argument('--batch', type=int, default=100, help="paths per fetch_many batch")
+    parser.add_argument('--concurrency', type=int, default=100, help="requests in flight for async")
+    parser.add_argument('--memory-calls', type=int, default=200, help="calls in the traced memory run")
+    parser.add_argument('--records', action='store_true', help="return typed records instead of dicts")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        type=lambda s: [name for name in s.split(',') if name],
+                        help="comma-separated: " + ', '.join(SCENARIOS))
+    parser.add_argument('--fixtures', help="JSON file of response bodies by route template")
+    parser.add_argument('--cassette', help="serve responses recorded in a cassette")
+    parser.add_argument('--dump-fixtures', metavar='FILE', help="write the built-in fixtures and exit")
+    parser.add_argument('--save', metavar='FILE', help="save results as JSON")
+    parser.add_argument('--compare', metavar='FILE', help="compare with saved results")
+    parser.add_argument('--threshold', type=float, default=10.0, help="percent change that counts as a regression")
+
+    options = parser.parse_args(argv)
+    for name in options.scenarios:
+        if name not in RUNNERS:
+            parser.error("unknown scenario: {0}".format(name))
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+
+    if options.dump_fixtures:
+        with open(options.dump_fixtures, 'w') as f:
+            json.dump(build_fixtures(), f, indent=1, sort_keys=True)
+        return 0
+
+    results = run(options)
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, options.threshold)
+        print('\ncompared with {0}:'.format(options.compare))
+        for line in lines:
+            print(line)
+        if regressions:
+            for name, key, pct in regressions:
+                print('REGRESSION {0} {1}: {2:.1f}% worse'.format(name, key, pct))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,28 +7,57 @@ __author__ = "Chris Amico (eyeseast@gmail.com)"
 __modified__ = "WebCandy, LLC (webcandyllc@gmail.com)"
 __version__ = "0.3.0"
 
+import importlib
 import os
+import sys
 
-from .client import Client
-from .utils import CongressError, NotFound, check_chamber, get_congress, CURRENT_CONGRESS, check_category, check_chamber, check_comms, check_quarter, get_offset
+from .client import Client, Subclient
+from .utils import CongressError, NotFound, QuotaExceeded, check_chamber, get_congress, CURRENT_CONGRESS, check_category, check_chamber, check_comms, check_quarter, get_offset
 
-# subclients
-from .bills import BillsClient
-from .members import MembersClient
-from .committees import CommitteesClient
-from .votes import VotesClient
-from .nominations import NominationsClient
+# subclient classes, imported when first used
+SUBCLIENTS = {
+    'BillsClient': 'congress.bills',
+    'MembersClient': 'congress.members',
+    'CommitteesClient': 'congress.committees',
+    'VotesClient': 'congress.votes',
+    'NominationsClient': 'congress.nominations',
 
-# New as of 4/4/2019
-from .communications import CommunicationsClient
-from .explanations import ExplanationsClient
-from .flooractions import FloorActionsClient
-from .lobbying import LobbyingClient
-from .officeexpenses import OfficeExpensesClient
-from .statements import StatementsClient
+    # New as of 4/4/2019
+    'CommunicationsClient': 'congress.communications',
+    'ExplanationsClient': 'congress.explanations',
+    'FloorActionsClient': 'congress.flooractions',
+    'LobbyingClient': 'congress.lobbying',
+    'OfficeExpensesClient': 'congress.officeexpenses',
+    'StatementsClient': 'congress.statements',
+}
 
 
-__all__ = ('Congress', 'CongressError', 'NotFound', 'get_congress', 'CURRENT_CONGRESS', 'check_category', 'check_chamber', 'check_comms', 'check_quarter', 'get_offset')
+def load_async():
+    try:
+        from .aio import AsyncCongress
+    except SyntaxError:
+        # asyncio support needs Python 3.6+
+        AsyncCongress = None
+    return AsyncCongress
+
+
+def __getattr__(name):
+    "Import subclient classes and AsyncCongress on first use, keeping ``import congress`` fast"
+    if name in SUBCLIENTS:
+        return getattr(importlib.import_module(SUBCLIENTS[name]), name)
+    if name == 'AsyncCongress':
+        return load_async()
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__, so import everything up front
+    for _name, _module in SUBCLIENTS.items():
+        globals()[_name] = getattr(importlib.import_module(_module), _name)
+    AsyncCongress = load_async()
+
+
+__all__ = ('Congress', 'AsyncCongress', 'CongressError', 'NotFound', 'QuotaExceeded', 'get_congress', 'CURRENT_CONGRESS', 'check_category', 'check_chamber', 'check_comms', 'check_quarter', 'get_offset')
 
 
 class Congress(Client):
@@ -50,24 +79,44 @@ class Congress(Client):
     it uses `httplib2.FileCache <https://httplib2.readthedocs.io/en/latest/libhttplib2.html#httplib2.FileCache>`_,
     in a directory called ``.cache``, but it should also work with memcache
     or anything else that exposes the same interface as FileCache (per httplib2 docs).
+
+    Requests go through a thread-safe ``congress.transport.PooledHttp``, shared by
+    every subclient, so one Congress instance can be used from many threads.
+    Pass your own as ``http`` to change the per-host pool size.
+
+    To stay under the key's rate limits, pass a ``congress.ratelimit.RateLimiter``
+    as ``limiter``; it's shared by every subclient. Concurrent requests for the same
+    path, through any subclient, are coalesced into one. ``decoder`` swaps in
+    another JSON decoder, taking raw response bytes. With ``records=True``, methods
+    return the typed records in ``congress.records`` in place of dicts, and a
+    ``congress.metrics.Metrics`` passed as ``metrics`` collects per-endpoint metrics.
     """
 
-    def __init__(self, apikey=None, cache='.cache', http=None):
+    def __init__(self, apikey=None, cache='.cache', http=None, limiter=None, decoder=None,
+                 records=False, metrics=None):
         if apikey is None:
             apikey = os.environ.get('PROPUBLICA_API_KEY')
 
-        super(Congress, self).__init__(apikey, cache, http)
-
-        self.bills = BillsClient(self.apikey, cache, self.http)
-        self.committees = CommitteesClient(self.apikey, cache, self.http)
-        self.members = MembersClient(self.apikey, cache, self.http)
-        self.nominations = NominationsClient(self.apikey, cache, self.http)
-        self.votes = VotesClient(self.apikey, cache, self.http)
-
-        #New as of 4/4/2019
-        self.communications = CommunicationsClient(self.apikey, cache, self.http)
-        self.explanations = ExplanationsClient(self.apikey, cache, self.http)
-        self.flooractions = FloorActionsClient(self.apikey, cache, self.http)
-        self.lobbying = LobbyingClient(self.apikey, cache, self.http)
-        self.officeexpenses = OfficeExpensesClient(self.apikey, cache, self.http)
-        self.statements = StatementsClient(self.apikey, cache, self.http)
+        super(Congress, self).__init__(apikey, cache, http, limiter, decoder, records, metrics)
+
+    # each subclient is created on first access
+    bills = Subclient('congress.bills.BillsClient')
+    committees = Subclient('congress.committees.CommitteesClient')
+    members = Subclient('congress.members.MembersClient')
+    nominations = Subclient('congress.nominations.NominationsClient')
+    votes = Subclient('congress.votes.VotesClient')
+
+    #New as of 4/4/2019
+    communications = Subclient('congress.communications.CommunicationsClient')
+    explanations = Subclient('congress.explanations.ExplanationsClient')
+    flooractions = Subclient('congress.flooractions.FloorActionsClient')
+    lobbying = Subclient('congress.lobbying.LobbyingClient')
+    officeexpenses = Subclient('congress.officeexpenses.OfficeExpensesClient')
+    statements = Subclient('congress.statements.StatementsClient')
+
+    def subclient(self, cls):
+        "Create a subclient sharing this client's transport, cache, limiter, metrics and in-flight requests"
+        client = cls(self.apikey, self.cache, self.http, self.limiter, self.decoder, self.records,
+                     self.metrics)
+        client.flight = self.flight
+        return client
@@ -0,0 +1,139 @@
+"""
+All-pairs agreement between members, computed locally
+
+``MembersClient.compare`` costs one API call per pair of members, which
+is out of reach for a whole chamber. These functions compute the same
+kind of figure for every pair at once, with matrix products over data
+already ingested: vote agreement from a ``VoteMatrix``, and cosponsorship
+overlap from bill cosponsor lists.
+
+::
+
+    >>> from congress.agreement import vote_agreement
+    >>> agreement = vote_agreement(ingest.matrix())
+    >>> agreement.pair('P000197', 'M000355')
+    12.4
+    >>> agreement.top('P000197', 5)
+    [('H000874', 98.9), ...]
+
+Requires NumPy (``pip install python-congress[matrix]``).
+"""
+from .matrix import NO, YES, require_numpy
+from .utils import field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Similarity(object):
+    """
+    A symmetric member-by-member matrix of scores, such as agreement
+    percentages. ``members`` holds the bioguide ID for each row and
+    column. Pairs with nothing in common to compare are NaN.
+    """
+
+    def __init__(self, values, members, counts=None):
+        require_numpy()
+        self.values = values
+        self.members = members
+        self.counts = counts
+        self.index = dict((m, i) for i, m in enumerate(members.tolist()))
+
+    def __repr__(self):
+        return '<Similarity {0} members>'.format(len(self.members))
+
+    def __len__(self):
+        return len(self.members)
+
+    def row(self, member_id):
+        try:
+            return self.index[member_id]
+        except KeyError:
+            raise KeyError("No data for member {0}".format(member_id))
+
+    def pair(self, first, second):
+        "The score for two members, or None if they have nothing to compare"
+        value = self.values[self.row(first), self.row(second)]
+        return None if np.isnan(value) else float(value)
+
+    def top(self, member_id, k=10):
+        """
+        The ``k`` members scoring highest with this one, as a list of
+        ``(member_id, score)`` pairs, best first
+        """
+        i = self.row(member_id)
+        scores = np.where(np.isnan(self.values[i]), -np.inf, self.values[i])
+        scores[i] = -np.inf
+
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(str(self.members[j]), float(scores[j])) for j in best if np.isfinite(scores[j])]
+
+
+def ratio(numerator, denominator):
+    "numerator / denominator * 100, with NaN where the denominator is zero"
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, 100.0 * numerator.astype(np.float64) / denominator, np.nan)
+
+
+def vote_agreement(matrix, min_votes=1):
+    """
+    How often each pair of members voted the same way, as a percentage
+    of the roll calls where both voted yes or no. Pairs sharing fewer
+    than ``min_votes`` such roll calls are NaN. ``counts`` on the result
+    holds the number of shared roll calls.
+    """
+    require_numpy()
+
+    votes = np.asarray(matrix.votes)
+    yes = (votes == YES).astype(np.float32)
+    no = (votes == NO).astype(np.float32)
+    voted = yes + no
+
+    agreed = yes.dot(yes.T) + no.dot(no.T)
+    shared = voted.dot(voted.T)
+
+    values = ratio(agreed, shared)
+    values[shared < min_votes] = np.nan
+    return Similarity(values, matrix.members, shared.astype(np.int32))
+
+
+def cosponsor_overlap(bills, include_sponsors=True):
+    """
+    How much each pair of members' cosponsorships overlap: the Jaccard
+    index of the bills each has cosponsored, as a percentage.
+
+    ``bills`` are ``BillsClient.cosponsors`` responses, or anything
+    with a ``bill_id`` and a ``cosponsors`` list of ``cosponsor_id``s.
+    With ``include_sponsors``, a bill's sponsor counts as one of its
+    cosponsors. ``counts`` on the result holds the number of bills
+    each pair has in common.
+    """
+    require_numpy()
+
+    pairs = set()
+    for bill in bills:
+        bill_id = field(bill, 'bill_id')
+        for cosponsor in field(bill, 'cosponsors') or ():
+            pairs.add((field(cosponsor, 'cosponsor_id'), bill_id))
+        if include_sponsors and field(bill, 'sponsor_id'):
+            pairs.add((field(bill, 'sponsor_id'), bill_id))
+
+    member_ids, bill_ids = zip(*pairs) if pairs else ((), ())
+    members, rows = np.unique(np.array(member_ids, dtype='U'), return_inverse=True)
+    __, columns = np.unique(np.array(bill_ids, dtype='U'), return_inverse=True)
+
+    sponsored = np.zeros((len(members), columns.max() + 1 if len(columns) else 0), dtype=np.float32)
+    sponsored[rows, columns] = 1
+
+    shared = sponsored.dot(sponsored.T)
+    totals = np.diag(shared)
+    union = totals[:, None] + totals[None, :] - shared
+
+    return Similarity(ratio(shared, union), members, shared.astype(np.int32))
@@ -0,0 +1,535 @@
+"""
+Asyncio versions of the Congress client and its subclients
+
+Every subclient method builds an API path and hands it to ``fetch``.
+The async clients swap in a ``fetch`` that returns a coroutine, so
+each method of ``AsyncCongress`` mirrors its blocking counterpart
+and can simply be awaited::
+
+    >>> import asyncio
+    >>> from congress.aio import AsyncCongress
+    >>> async def main():
+    ...     async with AsyncCongress(API_KEY, max_concurrency=200) as congress:
+    ...         return await asyncio.gather(
+    ...             congress.members.get('P000197'),
+    ...             congress.bills.get('hr1', 115))
+    >>> pelosi, hr1 = asyncio.run(main())
+
+Paginating ``iter_*`` methods return async iterators, used with ``async for``.
+
+Requires Python 3.6 or newer.
+"""
+import asyncio
+import collections
+import os
+import ssl
+import time
+import zlib
+
+import httplib2
+import six
+from six.moves.urllib.parse import urlsplit
+
+from .cache import normalize
+from .cassette import Cassette
+from .client import Client, Subclient
+from .metrics import HIT, Sample, route
+from .ratelimit import BULK
+from .utils import CongressError, PAGE_SIZE, loads, with_offset
+
+from .bills import BillsClient
+from .members import MembersClient
+from .committees import CommitteesClient
+from .votes import VotesClient
+from .nominations import NominationsClient
+from .communications import CommunicationsClient
+from .explanations import ExplanationsClient
+from .flooractions import FloorActionsClient
+from .lobbying import LobbyingClient
+from .officeexpenses import OfficeExpensesClient
+from .statements import StatementsClient
+
+DEFAULT_CONCURRENCY = 100
+
+# longest a task queued behind others at the rate limiter waits between checks
+WAKE_TIMEOUT = 1.0
+
+
+async def acquire(limiter, priority=None):
+    """
+    Wait for a ``RateLimiter`` without blocking the loop. Tasks queue in
+    the limiter's priority order, along with any blocking callers.
+    """
+    loop = asyncio.get_event_loop()
+    turn = [None]
+
+    def wake():
+        # called by the limiter, from any thread, when this ticket is next
+        def ready():
+            if turn[0] is not None and not turn[0].done():
+                turn[0].set_result(None)
+        loop.call_soon_threadsafe(ready)
+
+    ticket = limiter.join(priority, wake)
+    try:
+        while True:
+            delay = limiter.take(ticket)
+            if delay == 0:
+                return
+
+            # next in line: wait for a token; behind others: wait to be woken,
+            # checking back now and then
+            turn[0] = loop.create_future()
+            try:
+                await asyncio.wait_for(turn[0], WAKE_TIMEOUT if delay is None else delay)
+            except asyncio.TimeoutError:
+                pass
+    except BaseException:
+        limiter.leave(ticket)
+        raise
+
+
+class AsyncHttp(object):
+    """
+    A minimal HTTP/1.1 transport built on asyncio streams.
+
+    Connections are kept alive and reused, with up to ``pool_size`` idle
+    connections held per host. ``max_concurrency`` bounds the number of
+    requests in flight at once, across every client sharing the transport.
+
+    ``request`` has the same signature as ``httplib2.Http.request`` and
+    returns the same ``(response, content)`` pair, only awaitable.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, pool_size=None, timeout=None):
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size or max_concurrency
+        self.timeout = timeout
+        self.connections = {}
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # created lazily, so it binds to the loop that actually runs requests
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def request(self, uri, method='GET', body=None, headers=None):
+        parts = urlsplit(uri)
+        secure = parts.scheme == 'https'
+        port = parts.port or (443 if secure else 80)
+        key = (parts.scheme, parts.hostname, port)
+
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        headers = dict(headers or {})
+        headers.setdefault('Host', parts.netloc)
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        headers.setdefault('Connection', 'keep-alive')
+        if body is not None:
+            if not isinstance(body, bytes):
+                body = body.encode('utf-8')
+            headers['Content-Length'] = str(len(body))
+
+        async with self.semaphore:
+            idle = self.connections.setdefault(key, [])
+            while idle:
+                conn = idle.pop()
+                try:
+                    return await self._roundtrip(key, conn, method, target, headers, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # the server closed a kept-alive connection; try the next one
+                    self._close(conn)
+
+            conn = await self._connect(parts.hostname, port, secure)
+            return await self._roundtrip(key, conn, method, target, headers, body)
+
+    async def _connect(self, host, port, secure):
+        context = ssl.create_default_context() if secure else None
+        connect = asyncio.open_connection(host, port, ssl=context)
+        return await asyncio.wait_for(connect, self.timeout)
+
+    async def _roundtrip(self, key, conn, method, target, headers, body):
+        reader, writer = conn
+        lines = ["{0} {1} HTTP/1.1".format(method, target)]
+        lines.extend("{0}: {1}".format(k, v) for k, v in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        if body:
+            writer.write(body)
+
+        try:
+            await writer.drain()
+            resp, content, reusable = await asyncio.wait_for(
+                self._read_response(reader, method), self.timeout)
+        except BaseException:
+            self._close(conn)
+            raise
+
+        idle = self.connections.setdefault(key, [])
+        if reusable and len(idle) < self.pool_size:
+            idle.append(conn)
+        else:
+            self._close(conn)
+
+        return resp, content
+
+    async def _read_response(self, reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n') + '  ').split(' ', 2)
+        info = {'status': status, 'reason': reason.strip()}
+
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            info[name.strip().lower()] = value.strip()
+
+        status = int(status)
+        reusable = info.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            content = b''
+        elif info.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # skip trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b''.join(chunks)
+        elif 'content-length' in info:
+            content = await reader.readexactly(int(info['content-length']))
+        else:
+            content = await reader.read()
+            reusable = False
+
+        encoding = info.get('content-encoding', '').lower()
+        if encoding == 'gzip':
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+            info['-content-encoding'] = info.pop('content-encoding')
+        elif encoding == 'deflate':
+            content = zlib.decompress(content, -zlib.MAX_WBITS)
+            info['-content-encoding'] = info.pop('content-encoding')
+
+        resp = httplib2.Response(info)
+        resp.reason = info['reason']
+        return resp, content, reusable
+
+    def _close(self, conn):
+        reader, writer = conn
+        writer.close()
+
+    async def close(self):
+        "Close every idle connection"
+        for idle in self.connections.values():
+            while idle:
+                self._close(idle.pop())
+
+
+# what followers get when the call they're waiting on is cancelled
+RETRY = object()
+
+
+class AsyncSingleFlight(object):
+    "Coalesce concurrent calls by key, within one event loop"
+
+    def __init__(self):
+        self.calls = {}
+
+    async def do(self, key, fn):
+        """
+        Await ``fn()`` and return its result, unless a call for ``key`` is
+        already in flight, in which case wait for and share that result.
+        """
+        call = self.calls.get(key)
+        while call is not None:
+            result = await asyncio.shield(call)
+            if result is not RETRY:
+                return result
+            # the leader was cancelled, which its followers weren't; go again
+            call = self.calls.get(key)
+
+        call = self.calls[key] = asyncio.get_event_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.set_result(RETRY)
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            # mark it retrieved, in case nobody else was waiting
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
+
+
+class AsyncCassette(Cassette):
+    """
+    A ``congress.cassette.Cassette`` for async clients, passed as ``http``
+    to ``AsyncCongress``. Records through an ``AsyncHttp``, unless given
+    another transport with an awaitable ``request`` as ``http``.
+    """
+
+    def transport(self):
+        return AsyncHttp()
+
+    async def request(self, uri, method='GET', body=None, headers=None):
+        path, conditions, interaction = self.lookup(uri, method, headers)
+        if interaction is not None:
+            return interaction.response()
+
+        resp, content = await self.http.request(uri, method, body, headers)
+        self.store(method, path, conditions, resp, content)
+        return resp, content
+
+    async def close(self):
+        "Save, and close the recording transport"
+        self.save()
+        if self.http is not None:
+            await self.http.close()
+
+
+class AsyncClient(Client):
+    """
+    A client whose ``fetch`` is a coroutine.
+
+    Pass an ``AsyncHttp`` instance (or anything with an awaitable
+    ``request`` method) to share connections and the concurrency
+    limit between clients. ``cache`` takes a ``congress.cache.ResponseCache``,
+    ``limiter`` a ``congress.ratelimit.RateLimiter``, ``decoder`` a JSON
+    decoder for raw bytes, ``records`` turns on typed records and ``metrics``
+    takes a ``congress.metrics.MetricsSink``, as for ``Client``.
+    """
+
+    def __init__(self, apikey=None, http=None, max_concurrency=DEFAULT_CONCURRENCY,
+                 cache=None, limiter=None, decoder=None, records=False, metrics=None):
+        self.apikey = apikey
+        self.cache = cache
+        self.limiter = limiter
+        self.decoder = decoder or loads
+        self.records = records
+        self.metrics = metrics
+        self.flight = AsyncSingleFlight()
+
+        if http is None:
+            http = AsyncHttp(max_concurrency=max_concurrency)
+        self.http = http
+
+    async def fetch(self, path, parse=lambda r: r['results'][0], priority=None):
+        """
+        Make an API request, with authentication, without blocking the loop.
+
+        ::
+
+            >>> senate = await client.fetch('115/senate/members.json')
+
+        """
+        content = await self.load(path, priority)
+
+        if callable(parse):
+            content = parse(content)
+
+        return content
+
+    async def load(self, path, priority=None):
+        "Return the decoded response for a path. See ``Client.load``"
+        key = normalize(path)
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.get(key, self.decoder)
+            if entry is not None and entry.fresh:
+                if self.metrics is not None:
+                    self.metrics.record(Sample(route(key), path, HIT))
+                return entry.data
+
+        return await self.flight.do(key, lambda: self.download(path, key, priority, entry))
+
+    async def download(self, path, key, priority=None, entry=None):
+        "Request and decode a path from the API, storing it in the cache"
+        url, headers = self.prepare(path, entry)
+
+        if self.limiter is not None:
+            await acquire(self.limiter, priority)
+
+        start = time.time()
+        resp, body = await self.http.request(url, headers=headers)
+        return self.receive(path, key, url, resp, body, entry, time.time() - start)
+
+    async def fetch_many(self, requests, priority=BULK):
+        """
+        Fetch many API paths at once, returning results in request order.
+
+        Takes the same paths or ``(path, parse)`` pairs as ``Client.fetch_many``,
+        and likewise returns NotFound or CongressError in place of a failed result.
+        Concurrency is bounded by the transport.
+        """
+        requests = [(r,) if isinstance(r, six.string_types) else tuple(r) for r in requests]
+
+        async def fetch_one(request):
+            try:
+                return await self.fetch(*request, priority=priority)
+            except CongressError as e:
+                return e
+
+        return await asyncio.gather(*[fetch_one(r) for r in requests])
+
+    async def fetch_combined(self, requests, combine, priority=None):
+        "Fetch requests at once and combine their results. See ``Client.fetch_combined``"
+        requests = [(r,) if isinstance(r, six.string_types) else tuple(r) for r in requests]
+        if len(requests) == 1:
+            return combine([await self.fetch(*requests[0], priority=priority)])
+
+        results = await self.fetch_many(requests, priority=priority)
+        for result in results:
+            if isinstance(result, CongressError):
+                raise result
+        return combine(results)
+
+    async def paginate(self, path, items, max_items=None, prefetch=0, priority=BULK):
+        """
+        Async iterator over every result of an offset-paginated endpoint,
+        keeping up to ``prefetch`` pages in flight ahead of the consumer.
+        See ``Client.paginate``.
+        """
+        pending = collections.deque()
+        stop = max_items
+        count = offset = 0
+
+        try:
+            while True:
+                # a finished short page marks the end of the data
+                for page_offset, task in pending:
+                    if task.done() and not task.cancelled() and not task.exception() \
+                            and len(task.result()) < PAGE_SIZE:
+                        stop = page_offset + 1 if stop is None else min(stop, page_offset + 1)
+                        break
+
+                while pending and stop is not None and pending[-1][0] >= stop:
+                    pending.pop()[1].cancel()
+
+                while len(pending) <= prefetch and (stop is None or offset < stop):
+                    fetch = self.fetch(with_offset(path, offset), items, priority)
+                    pending.append((offset, asyncio.ensure_future(fetch)))
+                    offset += PAGE_SIZE
+
+                if not pending:
+                    return
+
+                page = await pending.popleft()[1]
+                for item in page:
+                    if max_items is not None and count >= max_items:
+                        return
+                    count += 1
+                    yield item
+
+                if len(page) < PAGE_SIZE:
+                    return
+        finally:
+            for page_offset, task in pending:
+                task.cancel()
+
+    async def close(self):
+        "Close pooled connections"
+        await self.http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncBillsClient(AsyncClient, BillsClient):
+    pass
+
+
+class AsyncMembersClient(AsyncClient, MembersClient):
+    pass
+
+
+class AsyncCommitteesClient(AsyncClient, CommitteesClient):
+    pass
+
+
+class AsyncVotesClient(AsyncClient, VotesClient):
+    pass
+
+
+class AsyncNominationsClient(AsyncClient, NominationsClient):
+    pass
+
+
+class AsyncCommunicationsClient(AsyncClient, CommunicationsClient):
+    pass
+
+
+class AsyncExplanationsClient(AsyncClient, ExplanationsClient):
+    pass
+
+
+class AsyncFloorActionsClient(AsyncClient, FloorActionsClient):
+    pass
+
+
+class AsyncLobbyingClient(AsyncClient, LobbyingClient):
+    pass
+
+
+class AsyncOfficeExpensesClient(AsyncClient, OfficeExpensesClient):
+    pass
+
+
+class AsyncStatementsClient(AsyncClient, StatementsClient):
+    pass
+
+
+class AsyncCongress(AsyncClient):
+    """
+    Asyncio counterpart to ``congress.Congress``.
+
+    Subclients share one ``AsyncHttp`` transport, so ``max_concurrency``
+    caps requests in flight across the whole instance.
+    """
+
+    def __init__(self, apikey=None, http=None, max_concurrency=DEFAULT_CONCURRENCY,
+                 cache=None, limiter=None, decoder=None, records=False, metrics=None):
+        if apikey is None:
+            apikey = os.environ.get('PROPUBLICA_API_KEY')
+
+        super(AsyncCongress, self).__init__(apikey, http, max_concurrency, cache, limiter, decoder,
+                                            records, metrics)
+
+    bills = Subclient(AsyncBillsClient)
+    committees = Subclient(AsyncCommitteesClient)
+    members = Subclient(AsyncMembersClient)
+    nominations = Subclient(AsyncNominationsClient)
+    votes = Subclient(AsyncVotesClient)
+
+    communications = Subclient(AsyncCommunicationsClient)
+    explanations = Subclient(AsyncExplanationsClient)
+    flooractions = Subclient(AsyncFloorActionsClient)
+    lobbying = Subclient(AsyncLobbyingClient)
+    officeexpenses = Subclient(AsyncOfficeExpensesClient)
+    statements = Subclient(AsyncStatementsClient)
+
+    def subclient(self, cls):
+        "Create a subclient sharing this client's transport, cache, limiter, metrics and in-flight requests"
+        client = cls(self.apikey, self.http, cache=self.cache, limiter=self.limiter,
+                     decoder=self.decoder, records=self.records, metrics=self.metrics)
+        client.flight = self.flight
+        return client
@@ -1,5 +1,6 @@
 from .client import Client
-from .utils import CURRENT_CONGRESS, check_chamber
+from .records import Bill
+from .utils import CURRENT_CONGRESS, check_chamber, get_offset, with_offset
 
     # Need to add offet querystring parameter check for account
     # for any offset with multiples of 20
@@ -15,7 +16,7 @@ class BillsClient(Client):
         """
         path = "members/{member_id}/bills/{type}.json".format(
             member_id=member_id, type=type)
-        return self.fetch(path)
+        return self.fetch(path, self.typed(Bill, at=('bills',)))
 
     def subject(self, subject, type=None):
         if type:
@@ -75,6 +76,7 @@ class BillsClient(Client):
             """
             path = "{congress}/bills/{bill_id}/{type}.json".format(
                 congress=congress, bill_id=bill_id, type=type)
+            return self.fetch(path)
         else:
             """
             #6 GET A SPECIFIC BILL
@@ -92,7 +94,7 @@ class BillsClient(Client):
             path = "{congress}/bills/{bill_id}.json".format(
                 congress=congress, bill_id=bill_id)
 
-        return self.fetch(path)
+        return self.lookup(path, self.typed(Bill))
 
     def amendments(self, bill_id, congress=CURRENT_CONGRESS):
         "#7"
@@ -110,7 +112,7 @@ class BillsClient(Client):
         "#11"
         return self.get(bill_id, congress, 'cosponsors')
 
-    def recent(self, chamber, congress=CURRENT_CONGRESS, type='introduced'):
+    def recent(self, chamber, congress=CURRENT_CONGRESS, type='introduced', **kwargs):
         """
         #2 GET RECENT BILLS
         Returns a list of recent bills. Recent means the last 
@@ -130,7 +132,17 @@ class BillsClient(Client):
         check_chamber(chamber)
         path = "{congress}/{chamber}/bills/{type}.json".format(
             congress=congress, chamber=chamber, type=type)
-        return self.fetch(path)
+        if 'page' in kwargs:
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Bill, at=('bills',)))
+
+    def iter_recent(self, chamber, congress=CURRENT_CONGRESS, type='introduced', max_items=None, prefetch=0):
+        "#2 Iterate over recent bills, fetching 20 at a time"
+        check_chamber(chamber)
+        path = "{congress}/{chamber}/bills/{type}.json".format(
+            congress=congress, chamber=chamber, type=type)
+        return self.paginate(path, self.typed(Bill, lambda r: r['results'][0]['bills']),
+                             max_items, prefetch)
 
     def introduced(self, chamber, congress=CURRENT_CONGRESS):
         "#2 Shortcut for getting introduced bills"
@@ -205,4 +217,4 @@ class BillsClient(Client):
         dir - asc or desc (default)
         """
         path = "bills/search.json?query={query}".format(query=query)
-        return self.fetch(path)
\ No newline at end of file
+        return self.fetch(path, self.typed(Bill, at=('bills',)))
\ No newline at end of file
@@ -0,0 +1,433 @@
+"""
+Response caches that Client.fetch consults before going to the network
+
+These sit in front of the HTTP layer and hold decoded responses, keyed by
+normalized API path, so a hit skips the request and the JSON parse entirely.
+How long a response stays fresh depends on the route: member and committee
+records change rarely and are kept for hours, while recent votes and floor
+updates expire within seconds.
+
+Once a response goes stale, it is kept if the API sent an ETag or
+Last-Modified header with it, so the client can revalidate it with a
+conditional request and, on a 304, reuse the stored response as is.
+
+Cached responses are shared between callers, so treat them as read-only.
+"""
+import collections
+import json
+import re
+import threading
+import time
+import zlib
+
+from .utils import loads
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+DEFAULT_TTL = 5 * MINUTE
+
+# (pattern, seconds), matched against normalized paths; the first match wins
+TTL_POLICIES = (
+    # hot feeds
+    (r'votes/recent\.json', 15),
+    (r'floor_updates', 15),
+    (r'^(statements|lobbying)/latest\.json', MINUTE),
+    (r'^communications/date/', MINUTE),
+    (r'^(house|senate|both)/votes/\d{4}-\d{2}-\d{2}/', MINUTE),
+
+    # long-lived records
+    (r'^members/[A-Z]\d{6}\.json$', 6 * HOUR),
+    (r'^\d+/(house|senate)/members\.json$', 6 * HOUR),
+    (r'^\d+/(house|senate|joint)/committees\.json$', 6 * HOUR),
+    (r'^\d+/(house|senate|joint)/committees/[^/]+\.json$', HOUR),
+    (r'^\d+/(house|senate)/sessions/\d/votes/\d+\.json$', DAY),
+    (r'^statements/subjects\.json$', DAY),
+    (r'^states/members/party\.json$', DAY),
+)
+
+
+def normalize(path):
+    """
+    Return a canonical cache key for an API path: no leading slash,
+    querystring parameters sorted, and a zero offset dropped.
+    """
+    path = path.lstrip('/')
+    if '?' not in path:
+        return path
+
+    path, query = path.split('?', 1)
+    params = sorted(p for p in query.split('&') if p and p != 'offset=0')
+    if params:
+        path = path + '?' + '&'.join(params)
+    return path
+
+
+class CacheEntry(object):
+    "A decoded response, when it was fetched, and its validators"
+
+    __slots__ = ('data', 'fetched', 'expires', 'etag', 'last_modified')
+
+    def __init__(self, data, fetched, expires, etag=None, last_modified=None):
+        self.data = data
+        self.fetched = fetched
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires
+
+    @property
+    def revalidatable(self):
+        "Whether a conditional request can check this entry once it's stale"
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self):
+        "Request headers asking the API to answer 304 if this entry is unchanged"
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """
+    Base class for response caches.
+
+    Pass an instance as the ``cache`` argument to ``Congress`` (or any client)
+    and it is used in place of httplib2's HTTP cache. Subclasses implement
+    ``get``, ``set``, ``touch``, ``delete``, ``invalidate`` and ``clear``.
+
+    ``policies`` is a sequence of ``(pattern, seconds)`` pairs; a response is
+    fresh for the seconds of the first pattern that matches its path, or
+    ``default_ttl`` if none do.
+    """
+
+    def __init__(self, policies=TTL_POLICIES, default_ttl=DEFAULT_TTL):
+        self.policies = [(re.compile(pattern), ttl) for pattern, ttl in policies]
+        self.default_ttl = default_ttl
+
+    def ttl(self, key):
+        "Seconds a response for this path stays fresh"
+        for pattern, ttl in self.policies:
+            if pattern.search(key):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key, decoder=None):
+        """
+        Return the CacheEntry for key, or None. Stale entries are only
+        returned if they can be revalidated; check ``entry.fresh``.
+
+        Caches that store raw bodies decode them with ``decoder``, the
+        client's, or ``congress.utils.loads`` if it's None.
+        """
+        raise NotImplementedError
+
+    def set(self, key, data, body=None, status=200, etag=None, last_modified=None):
+        """
+        Store a decoded response. Caches that persist responses store
+        ``body``, the raw response content, rather than re-encoding ``data``.
+        """
+        raise NotImplementedError
+
+    def touch(self, key, entry):
+        "Mark a revalidated entry as freshly fetched"
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def invalidate(self, prefix):
+        "Drop every entry whose key starts with prefix, such as ``116/house/``"
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """
+    An in-process LRU cache, holding at most ``maxsize`` responses.
+
+    ::
+
+        >>> from congress import Congress
+        >>> from congress.cache import MemoryCache
+        >>> congress = Congress(API_KEY, cache=MemoryCache(maxsize=5000))
+
+    """
+
+    def __init__(self, maxsize=1024, policies=TTL_POLICIES, default_ttl=DEFAULT_TTL):
+        super(MemoryCache, self).__init__(policies, default_ttl)
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, decoder=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            if not entry.fresh and not entry.revalidatable:
+                del self.entries[key]
+                return None
+
+            # move to the end, most recently used; move_to_end is Python 3 only
+            self.entries[key] = self.entries.pop(key)
+            return entry
+
+    def set(self, key, data, body=None, status=200, etag=None, last_modified=None):
+        now = time.time()
+        entry = CacheEntry(data, now, now + self.ttl(key), etag, last_modified)
+
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = entry
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def touch(self, key, entry):
+        now = time.time()
+        with self.lock:
+            entry.fetched = now
+            entry.expires = now + self.ttl(key)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate(self, prefix):
+        with self.lock:
+            for key in [k for k in self.entries if k.startswith(prefix)]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SQLiteCache(ResponseCache):
+    """
+    A persistent cache in a single SQLite file.
+
+    Each response is stored zlib-compressed, with its status, fetch time
+    and stored size, in a table indexed by path and by fetch time. The
+    oldest responses are evicted once the total stored size passes
+    ``max_size`` bytes. A response older than ``max_age`` seconds is a
+    miss, and these are purged from the file every ``purge_interval``
+    seconds as responses are stored. Because rows are keyed by API path, ``invalidate`` can
+    drop everything under a prefix with one indexed range delete.
+
+    ::
+
+        >>> from congress import Congress
+        >>> from congress.cache import SQLiteCache
+        >>> cache = SQLiteCache('congress.db', max_size=2 * 1024 ** 3)
+        >>> congress = Congress(API_KEY, cache=cache)
+        >>> cache.invalidate('116/house/')
+
+    The file can be shared between threads and processes.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            status INTEGER NOT NULL,
+            fetched REAL NOT NULL,
+            expires REAL NOT NULL,
+            size INTEGER NOT NULL,
+            etag TEXT,
+            last_modified TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS responses_fetched ON responses (fetched)",
+    )
+
+    # columns added since the first version of the schema
+    MIGRATIONS = (
+        ('etag', "ALTER TABLE responses ADD COLUMN etag TEXT"),
+        ('last_modified', "ALTER TABLE responses ADD COLUMN last_modified TEXT"),
+    )
+
+    def __init__(self, filename='.cache.sqlite', max_size=1024 ** 3, max_age=30 * DAY,
+                 policies=TTL_POLICIES, default_ttl=DEFAULT_TTL, compression=6,
+                 purge_interval=HOUR):
+        super(SQLiteCache, self).__init__(policies, default_ttl)
+        self.filename = filename
+        self.max_size = max_size
+        self.max_age = max_age
+        self.purge_interval = purge_interval
+        self.purged = 0
+        self.compression = compression
+        self.local = threading.local()
+        # guards size, this process's running total of stored bytes
+        self.lock = threading.Lock()
+
+        db = self.db
+        with db:
+            for statement in self.SCHEMA:
+                db.execute(statement)
+
+            columns = set(row[1] for row in db.execute("PRAGMA table_info(responses)"))
+            for column, statement in self.MIGRATIONS:
+                if column not in columns:
+                    db.execute(statement)
+
+        self.size = self.total_size()
+
+    @property
+    def db(self):
+        "A connection for the current thread"
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            import sqlite3
+            db = self.local.db = sqlite3.connect(self.filename, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def total_size(self):
+        "Total stored bytes"
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key, decoder=None):
+        row = self.db.execute(
+            "SELECT body, fetched, expires, etag, last_modified FROM responses WHERE key = ?",
+            (key,)).fetchone()
+        if row is None:
+            return None
+
+        body, fetched, expires, etag, last_modified = row
+        if self.max_age is not None and fetched < time.time() - self.max_age:
+            return None
+
+        entry = CacheEntry(None, fetched, expires, etag, last_modified)
+        if not entry.fresh and not entry.revalidatable:
+            return None
+
+        entry.data = (decoder or loads)(zlib.decompress(body))
+        return entry
+
+    def set(self, key, data, body=None, status=200, etag=None, last_modified=None):
+        import sqlite3
+
+        if body is None:
+            body = json.dumps(data)
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+
+        body = zlib.compress(body, self.compression)
+        now = time.time()
+
+        with self.db as db:
+            # a replaced row's bytes are freed, so only the difference is added
+            row = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, body, status, fetched, expires, size, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(body), status, now, now + self.ttl(key), len(body),
+                 etag, last_modified))
+
+        with self.lock:
+            self.size += len(body) - (row[0] if row else 0)
+            full = self.size > self.max_size
+            due = self.max_age is not None and now - self.purged > self.purge_interval
+            if due:
+                self.purged = now
+
+        if full:
+            self.evict()
+        elif due:
+            self.purge()
+
+    def touch(self, key, entry):
+        now = time.time()
+        entry.fetched = now
+        entry.expires = now + self.ttl(key)
+        with self.db as db:
+            db.execute("UPDATE responses SET fetched = ?, expires = ? WHERE key = ?",
+                       (entry.fetched, entry.expires, key))
+
+    def purge(self):
+        "Drop responses older than max_age"
+        if self.max_age is None:
+            return
+
+        with self.db as db:
+            db.execute("DELETE FROM responses WHERE fetched < ?", (time.time() - self.max_age,))
+            size = self.total_size()
+        with self.lock:
+            self.size = size
+
+    def evict(self):
+        "Drop responses older than max_age, then the oldest until under max_size"
+        self.purge()
+        with self.db as db:
+            size = self.total_size()
+            with self.lock:
+                self.size = size
+            if size <= self.max_size:
+                return
+
+            # walk from the oldest, summing sizes until enough is freed
+            excess = size - self.max_size
+            cutoff = None
+            for fetched, size in db.execute("SELECT fetched, size FROM responses ORDER BY fetched"):
+                excess -= size
+                cutoff = fetched
+                if excess <= 0:
+                    break
+
+            if cutoff is not None:
+                db.execute("DELETE FROM responses WHERE fetched <= ?", (cutoff,))
+            size = self.total_size()
+            with self.lock:
+                self.size = size
+
+    def delete(self, key):
+        with self.db as db:
+            row = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        if row:
+            with self.lock:
+                self.size -= row[0]
+
+    def invalidate(self, prefix):
+        if not prefix:
+            return self.clear()
+
+        # every key starting with prefix sorts between prefix and its successor
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self.db as db:
+            freed = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses "
+                               "WHERE key >= ? AND key < ?", (prefix, upper)).fetchone()[0]
+            db.execute("DELETE FROM responses WHERE key >= ? AND key < ?", (prefix, upper))
+        with self.lock:
+            self.size -= freed
+
+    def clear(self):
+        with self.db as db:
+            db.execute("DELETE FROM responses")
+        with self.lock:
+            self.size = 0
+
+    def close(self):
+        "Close this thread's connection"
+        db = getattr(self.local, 'db', None)
+        if db is not None:
+            db.close()
+            self.local.db = None
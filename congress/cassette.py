@@ -0,0 +1,250 @@
+"""
+A record/replay transport for network-free runs
+
+A ``Cassette`` stands in for the HTTP transport, passed as ``http`` to
+``Congress`` or any client. While recording, requests it has no response
+for go out through a real transport, and what comes back is kept. On
+replay, requests are answered from the cassette, with no network access
+and nothing counted against the key's quota::
+
+    >>> from congress import Congress
+    >>> from congress.cassette import Cassette
+    >>> with Cassette('votes.cassette', record=True) as http:
+    ...     congress = Congress(API_KEY, http=http)
+    ...     vote = congress.votes.get('house', 17, 1, 116)
+    >>> congress = Congress(http=Cassette('votes.cassette'))
+    >>> congress.votes.get('house', 17, 1, 116) == vote
+    True
+
+Responses are matched by method, path and querystring, with parameters
+in any order. The API key, sent as a header, is never recorded, and
+neither is the host, so a cassette recorded against the live API can be
+replayed against any ``BASE_URI``.
+
+In STRICT mode, a request must match a recorded one exactly, including any
+conditional headers, or it raises CassetteMiss. In PERMISSIVE mode, a
+request with no exact match gets a recorded response for the same route
+template (see ``congress.metrics.route``), so any roll call, say, answers
+for every other, which suits load and profiling runs. Conditional
+headers are only matched in STRICT mode.
+
+Cassettes are saved as gzipped JSON by ``save``, or on leaving a ``with``
+block. ``congress.aio.AsyncCassette`` does the same for async clients.
+"""
+import base64
+import json
+import os
+import threading
+
+from six.moves.urllib.parse import urlsplit
+
+from .cache import normalize
+from .metrics import route
+from .utils import CongressError
+
+STRICT = 'strict'
+PERMISSIVE = 'permissive'
+
+# request headers that change what the API answers, so are part of a match
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+# response headers that describe one request or connection, not the
+# response, and aren't recorded; httplib2 sets content-location to the
+# request URI, host and all
+PER_REQUEST_HEADERS = frozenset([
+    'status', 'content-location', '-x-permanent-redirect-url', 'date', 'set-cookie',
+    'connection', 'keep-alive', 'transfer-encoding', 'x-request-id',
+])
+
+VERSION = 1
+
+
+class CassetteMiss(CongressError):
+    "Raised for a request a cassette has no response for, when it isn't recording"
+
+
+def request_path(uri):
+    "The API path for a URI, without host or base path, and with a normalized querystring"
+    parts = urlsplit(uri)
+    path = parts.path.split('/congress/v1/', 1)[-1]
+    if parts.query:
+        path += '?' + parts.query
+    return normalize(path)
+
+
+def conditional(headers):
+    "Conditional request headers, by canonical name"
+    headers = dict((k.lower(), v) for k, v in (headers or {}).items())
+    return dict((name, headers[name.lower()]) for name in CONDITIONAL_HEADERS
+                if headers.get(name.lower()))
+
+
+def interaction_key(method, path, conditions):
+    return (method, path, tuple(sorted(conditions.items())))
+
+
+class Interaction(object):
+    "A recorded request and its response"
+
+    __slots__ = ('method', 'path', 'conditions', 'status', 'headers', 'body')
+
+    def __init__(self, method, path, conditions, status, headers, body):
+        self.method = method
+        self.path = path
+        self.conditions = conditions
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def key(self):
+        return interaction_key(self.method, self.path, self.conditions)
+
+    def response(self):
+        "An ``httplib2.Response`` and content, as the transport returned them"
+        import httplib2
+
+        info = dict(self.headers)
+        info['status'] = str(self.status)
+        return httplib2.Response(info), self.body
+
+    def as_dict(self):
+        data = {'method': self.method, 'path': self.path, 'conditions': self.conditions,
+                'status': self.status, 'headers': self.headers}
+        try:
+            data['body'] = self.body.decode('utf-8')
+        except UnicodeDecodeError:
+            data['body_base64'] = base64.b64encode(self.body).decode('ascii')
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        if 'body_base64' in data:
+            body = base64.b64decode(data['body_base64'])
+        else:
+            body = data['body'].encode('utf-8')
+        return cls(data['method'], data['path'], data.get('conditions') or {},
+                   data['status'], data['headers'], body)
+
+
+class Cassette(object):
+    """
+    Recorded responses, served through the same ``request`` method as
+    ``httplib2.Http``. Safe to share between threads.
+
+    ``mode`` is STRICT or PERMISSIVE. With ``record``, requests the cassette
+    can't answer go through ``http``, a ``PooledHttp`` unless given, and the
+    responses are added. Otherwise they raise CassetteMiss. Nothing is
+    written to ``filename`` until ``save``.
+    """
+
+    def __init__(self, filename, mode=STRICT, record=False, http=None):
+        if mode not in (STRICT, PERMISSIVE):
+            raise ValueError("mode must be {0!r} or {1!r}".format(STRICT, PERMISSIVE))
+
+        self.filename = filename
+        self.mode = mode
+        self.record = record
+        self.http = http
+        self.interactions = {}
+        self.routes = {}
+        self.lock = threading.Lock()
+        self.changed = False
+
+        if os.path.exists(filename):
+            self.load()
+
+        if record and self.http is None:
+            self.http = self.transport()
+
+    def transport(self):
+        "The transport used to record"
+        from .transport import PooledHttp
+        return PooledHttp()
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def load(self):
+        import gzip
+
+        with gzip.open(self.filename, 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+        for item in data['interactions']:
+            self.add(Interaction.from_dict(item), changed=False)
+
+    def save(self):
+        "Write the cassette, atomically, if anything was recorded"
+        import gzip
+
+        with self.lock:
+            if not self.changed:
+                return
+            data = {'version': VERSION,
+                    'interactions': [i.as_dict() for i in self.interactions.values()]}
+            self.changed = False
+
+        partial = self.filename + '.partial'
+        with gzip.open(partial, 'wb') as f:
+            f.write(json.dumps(data, sort_keys=True).encode('utf-8'))
+        os.rename(partial, self.filename)
+
+    def add(self, interaction, changed=True):
+        with self.lock:
+            self.interactions[interaction.key] = interaction
+            if not interaction.conditions:
+                # a full response, which can stand in for others on its route
+                self.routes.setdefault((interaction.method, route(interaction.path)), interaction)
+            self.changed = self.changed or changed
+
+    def find(self, method, path, conditions):
+        "The recorded interaction that answers a request, or None"
+        if self.mode == STRICT:
+            return self.interactions.get(interaction_key(method, path, conditions))
+
+        interaction = self.interactions.get(interaction_key(method, path, {}))
+        if interaction is None:
+            interaction = self.routes.get((method, route(path)))
+        return interaction
+
+    def lookup(self, uri, method, headers):
+        """
+        Match a request, returning its path, conditional headers and the
+        interaction that answers it, or None if it's to be recorded.
+        Raises CassetteMiss if there's no match and no recording.
+        """
+        path = request_path(uri)
+        conditions = conditional(headers)
+        interaction = self.find(method, path, conditions)
+
+        if interaction is None and not self.record:
+            raise CassetteMiss("No recorded response for {0} {1} in {2}".format(
+                method, path, self.filename))
+        return path, conditions, interaction
+
+    def store(self, method, path, conditions, resp, content):
+        "Record a response from the network"
+        headers = dict((k, v) for k, v in resp.items() if k.lower() not in PER_REQUEST_HEADERS)
+        self.add(Interaction(method, path, conditions, resp.status, headers, content))
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        "Same as ``httplib2.Http.request``, answered from the cassette if it can be"
+        path, conditions, interaction = self.lookup(uri, method, headers)
+        if interaction is not None:
+            return interaction.response()
+
+        resp, content = self.http.request(uri, method, body, headers, **kwargs)
+        self.store(method, path, conditions, resp, content)
+        return resp, content
+
+    def close(self):
+        "Save, and close the recording transport"
+        self.save()
+        if self.http is not None and hasattr(self.http, 'close'):
+            self.http.close()
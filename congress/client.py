@@ -1,14 +1,56 @@
 """
 Base client outlining how we fetch and parse responses
 """
-import json
+import collections
+import importlib
 import logging
-import httplib2
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from .utils import NotFound, CongressError, u
+import six
+
+from .cache import ResponseCache, normalize
+from .flight import SingleFlight
+from .metrics import HIT, MISS, REVALIDATED, Sample, route
+from .ratelimit import BULK, INTERACTIVE
+from .transport import PooledHttp
+from .utils import NotFound, CongressError, PAGE_SIZE, loads, with_offset
 
 log = logging.getLogger('congress')
 
+DEFAULT_WORKERS = 8
+
+
+class Subclient(object):
+    """
+    A subclient attribute, created by the parent's ``subclient`` method on
+    first access and kept on the instance after that. ``cls`` is a client
+    class, or its dotted path, so its module is imported only when needed.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        if isinstance(self.cls, six.string_types):
+            module, name = self.cls.rsplit('.', 1)
+            self.cls = getattr(importlib.import_module(module), name)
+
+        if self.name is None:
+            # no __set_name__ before Python 3.6
+            self.name = next(name for klass in owner.__mro__
+                             for name, value in vars(klass).items() if value is self)
+
+        client = instance.subclient(self.cls)
+        return instance.__dict__.setdefault(self.name, client)
+
 
 class Client(object):
     """
@@ -16,19 +58,53 @@ class Client(object):
     API and parsing what comes back. In addition to storing API credentials,
     a client can use a custom cache, or even a customized
     httplib2.Http instance.
+
+    By default, requests go through a ``PooledHttp`` transport, which is
+    safe to share between threads. Any object with the same ``request``
+    method as ``httplib2.Http`` can be passed as ``http``.
+
+    ``cache`` may also be a ``congress.cache.ResponseCache``, such as a
+    ``MemoryCache``. Decoded responses are then cached by API path, with
+    per-route freshness, in place of httplib2's HTTP cache.
+
+    A ``congress.ratelimit.RateLimiter``, passed as ``limiter``, is
+    consulted before every request that goes out to the network.
+
+    Concurrent fetches of the same path, from any thread, are coalesced
+    into one request whose decoded response they all share.
+
+    Responses are decoded from raw bytes by ``decoder``, which defaults
+    to ``congress.utils.loads`` (orjson if installed, else the json module).
+    Any function that takes bytes and returns decoded JSON will do.
+
+    With ``records`` set, subclient methods return the compact typed records
+    in ``congress.records`` (Member, Bill, RollCall and so on) in place of dicts.
+
+    ``metrics``, a ``congress.metrics.MetricsSink`` such as ``Metrics``, is sent
+    a ``Sample`` for every cache hit and every response from the API.
     """
 
     BASE_URI = "https://api.propublica.org/congress/v1/"
 
-    def __init__(self, apikey=None, cache='.cache', http=None):
+    def __init__(self, apikey=None, cache='.cache', http=None, limiter=None, decoder=None,
+                 records=False, metrics=None):
         self.apikey = apikey
+        self.limiter = limiter
+        self.decoder = decoder or loads
+        self.records = records
+        self.metrics = metrics
+        self.flight = SingleFlight()
 
-        if isinstance(http, httplib2.Http):
-            self.http = http
+        if isinstance(cache, ResponseCache):
+            self.cache, cache = cache, None
         else:
-            self.http = httplib2.Http(cache)
+            self.cache = None
+
+        if http is None:
+            http = PooledHttp(cache)
+        self.http = http
 
-    def fetch(self, path, parse=lambda r: r['results'][0]):
+    def fetch(self, path, parse=lambda r: r['results'][0], priority=None):
         """
         Make an API request, with authentication.
 
@@ -43,15 +119,269 @@ class Client(object):
             >>> print(senate['num_results'])
             101
 
+        ``priority`` is the rate limiter's priority class for this request.
+        """
+        content = self.load(path, priority)
+
+        if callable(parse):
+            content = parse(content)
+
+        return content
+
+    def lookup(self, path, parse=lambda r: r['results'][0]):
+        """
+        Fetch a single record, as ``get`` methods do. Someone is usually
+        waiting on these, so under a rate limiter they go ahead of bulk
+        requests, at INTERACTIVE priority, unless the thread has set one.
+        """
+        priority = INTERACTIVE
+        if self.limiter is not None:
+            priority = self.limiter.current(INTERACTIVE)
+        return self.fetch(path, parse, priority)
+
+    def typed(self, record, parse=lambda r: r['results'][0], at=()):
+        """
+        Return ``parse``, or if this client returns records, a parser that
+        goes on to convert the result, or the part of it under the keys in
+        ``at``, to ``record``. Subclient methods pass what this returns to
+        ``fetch`` as their ``parse``, so it works the same for async clients.
+        """
+        if not self.records:
+            return parse
+
+        def parse_records(response):
+            result = parse(response)
+            for key in at:
+                result = result[key]
+            return record.convert(result)
+
+        return parse_records
+
+    def load(self, path, priority=None):
+        """
+        Return the decoded response for a path, from the cache if it's fresh
+        there. A stale cached response with an ETag or Last-Modified date is
+        revalidated with a conditional request, and reused if unchanged.
         """
+        key = normalize(path)
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.get(key, self.decoder)
+            if entry is not None and entry.fresh:
+                if self.metrics is not None:
+                    self.metrics.record(Sample(route(key), path, HIT))
+                return entry.data
+
+        return self.flight.do(key, lambda: self.download(path, key, priority, entry))
+
+    def download(self, path, key, priority=None, entry=None):
+        "Request and decode a path from the API, storing it in the cache"
+        url, headers = self.prepare(path, entry)
+
+        if self.limiter is not None:
+            self.limiter.acquire(priority)
+
+        start = time.time()
+        resp, body = self.http.request(url, headers=headers)
+        return self.receive(path, key, url, resp, body, entry, time.time() - start)
+
+    def prepare(self, path, entry=None):
+        "Build the URL and headers for a request, conditional if there's a stale entry"
         url = self.BASE_URI + path
         headers = {'X-API-Key': self.apikey}
+        if entry is not None:
+            headers.update(entry.conditional_headers())
 
         log.debug(url)
+        return url, headers
+
+    def receive(self, path, key, url, resp, body, entry=None, seconds=None):
+        """
+        Handle a response: reuse a revalidated entry, or decode and cache it.
+        ``seconds`` is how long the request took, for metrics.
+        """
+        if self.limiter is not None and resp.status == 429:
+            self.limiter.throttled()
+
+        sample = None
+        if self.metrics is not None:
+            sample = Sample(route(key), path, MISS if self.cache is not None else None,
+                            resp.status, seconds, len(body or b''))
+
+        if resp.status == 304 and entry is not None:
+            # unchanged, so skip the body and the parse entirely
+            self.cache.touch(key, entry)
+            if sample is not None:
+                sample.cache = REVALIDATED
+                self.metrics.record(sample)
+            return entry.data
+
+        if sample is None:
+            content = self.decode(path, url, resp, body)
+        else:
+            content = self.observe(sample, path, url, resp, body)
 
-        resp, content = self.http.request(url, headers=headers)
-        content = u(content)
-        content = json.loads(content)
+        if self.cache is not None:
+            self.cache.set(key, content, body, resp.status,
+                           resp.get('etag'), resp.get('last-modified'))
+
+        return content
+
+    def fetch_many(self, requests, max_workers=DEFAULT_WORKERS, priority=BULK):
+        """
+        Fetch many API paths concurrently, on a pool of ``max_workers`` threads.
+
+        Each request is either a path or a ``(path, parse)`` pair. Results
+        come back in the same order as the requests. A request that raises
+        NotFound or CongressError returns the exception in its place,
+        instead of aborting the rest of the batch.
+
+        Requests run at BULK priority under a rate limiter, unless
+        ``priority`` says otherwise.
+
+        ::
+
+            >>> paths = ['115/bills/hr{0}.json'.format(n) for n in range(1, 501)]
+            >>> bills = client.fetch_many(paths)
+            >>> found = [b for b in bills if not isinstance(b, CongressError)]
+
+        """
+        requests = [(r,) if isinstance(r, six.string_types) else tuple(r) for r in requests]
+
+        def fetch_one(request):
+            try:
+                return self.fetch(*request, priority=priority)
+            except CongressError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            return list(pool.map(fetch_one, requests))
+
+    def fetch_combined(self, requests, combine, priority=None):
+        """
+        Fetch requests concurrently, as ``fetch_many`` does, and return
+        ``combine`` called with the list of results. Unlike ``fetch_many``,
+        the first error is raised. Runs at ``priority``, or this thread's.
+        A single request is fetched directly, without a thread pool.
+        """
+        requests = [(r,) if isinstance(r, six.string_types) else tuple(r) for r in requests]
+        if len(requests) == 1:
+            return combine([self.fetch(*requests[0], priority=priority)])
+
+        results = self.fetch_many(requests, priority=priority)
+        for result in results:
+            if isinstance(result, CongressError):
+                raise result
+        return combine(results)
+
+    def paginate(self, path, items, max_items=None, prefetch=0, priority=BULK):
+        """
+        Lazily iterate over every result of an offset-paginated endpoint.
+
+        Pages of PAGE_SIZE results are fetched as they're consumed.
+        ``items`` pulls the list of results out of a response. Iteration
+        stops at the first short page, or after ``max_items`` results.
+
+        With ``prefetch`` set, up to that many pages beyond the current one
+        are fetched in the background while the current page is consumed.
+        Once a short page shows where the data ends, nothing past it is
+        requested and any outstanding fetches beyond it are cancelled.
+
+        Pages are fetched at BULK priority under a rate limiter, unless
+        ``priority`` says otherwise.
+
+        ::
+
+            >>> filings = client.paginate('lobbying/latest.json',
+            ...     lambda r: r['results'][0]['lobbying_representations'],
+            ...     prefetch=4)
+            >>> for filing in filings:
+            ...     print(filing['id'])
+
+        """
+        # with max_items set, no page starting at or beyond it is needed
+        if prefetch:
+            pages = self.prefetch_pages(path, items, max_items, prefetch, priority)
+        else:
+            pages = self.pages(path, items, max_items, priority)
+
+        count = 0
+        for page in pages:
+            for item in page:
+                if max_items is not None and count >= max_items:
+                    return
+                count += 1
+                yield item
+
+    def pages(self, path, items, stop=None, priority=BULK):
+        "Fetch pages one at a time, until a short page or the ``stop`` offset"
+        offset = 0
+        while stop is None or offset < stop:
+            page = self.fetch(with_offset(path, offset), items, priority)
+            yield page
+
+            if len(page) < PAGE_SIZE:
+                return
+            offset += PAGE_SIZE
+
+    def prefetch_pages(self, path, items, stop=None, prefetch=1, priority=BULK):
+        "Fetch pages in order, keeping up to ``prefetch`` pages in flight ahead"
+        pool = ThreadPoolExecutor(prefetch)
+        pending = collections.deque()
+        offset = 0
+
+        def fetch_page(offset):
+            return self.fetch(with_offset(path, offset), items, priority)
+
+        try:
+            while True:
+                # a finished short page marks the end of the data
+                for page_offset, future in pending:
+                    if future.done() and not future.exception() and len(future.result()) < PAGE_SIZE:
+                        stop = page_offset + 1 if stop is None else min(stop, page_offset + 1)
+                        break
+
+                while pending and stop is not None and pending[-1][0] >= stop:
+                    pending.pop()[1].cancel()
+
+                while len(pending) <= prefetch and (stop is None or offset < stop):
+                    pending.append((offset, pool.submit(fetch_page, offset)))
+                    offset += PAGE_SIZE
+
+                if not pending:
+                    return
+
+                page_offset, future = pending.popleft()
+                page = future.result()
+                yield page
+
+                if len(page) < PAGE_SIZE:
+                    return
+        finally:
+            for page_offset, future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def observe(self, sample, path, url, resp, body):
+        "Decode a response, timing it and noting any error on the sample before it's recorded"
+        start = time.time()
+        try:
+            return self.decode(path, url, resp, body)
+        except Exception as e:
+            sample.error = e.__class__.__name__
+            raise
+        finally:
+            sample.decode_seconds = time.time() - start
+            self.metrics.record(sample)
+
+    def decode(self, path, url, resp, content):
+        """
+        Decode a raw API response, raising NotFound or CongressError
+        for anything that isn't OK.
+
+        This is shared by every transport, sync or async.
+        """
+        content = self.decoder(content)
 
         # handle errors
         if not content.get('status') == 'OK':
@@ -64,7 +394,4 @@ class Client(object):
 
             raise CongressError(content, resp, url)
 
-        if callable(parse):
-            content = parse(content)
-
         return content
@@ -1,5 +1,6 @@
 from .client import Client
-from .utils import CURRENT_CONGRESS, check_chamber, get_offset
+from .records import Committee
+from .utils import CURRENT_CONGRESS, check_chamber, get_offset, with_offset
 
 
 class CommitteesClient(Client):
@@ -15,7 +16,7 @@ class CommitteesClient(Client):
         check_chamber(chamber)
         path = "{congress}/{chamber}/committees.json".format(
             congress=congress, chamber=chamber)
-        return self.fetch(path)
+        return self.fetch(path, self.typed(Committee, at=('committees',)))
 
     def get(self, chamber, committee, congress=CURRENT_CONGRESS):
         """
@@ -32,7 +33,7 @@ class CommitteesClient(Client):
         check_chamber(chamber)
         path = "{congress}/{chamber}/committees/{committee}.json".format(
             congress=congress, chamber=chamber, committee=committee)
-        return self.fetch(path)
+        return self.lookup(path, self.typed(Committee))
 
     def hearings(self, congress=CURRENT_CONGRESS, **kwargs):
         """
@@ -47,8 +48,7 @@ class CommitteesClient(Client):
         path = "{congress}/committees/hearings.json".format(
             congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def hearing(self, chamber, committee, congress=CURRENT_CONGRESS, **kwargs):
@@ -68,10 +68,22 @@ class CommitteesClient(Client):
         path = "{congress}/{chamber}/committees/{committee}/hearings.json".format(
             congress=congress, chamber=chamber, committee=committee)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
+    def iter_hearings(self, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#3 Iterate over committee hearings, fetching 20 at a time"
+        path = "{congress}/committees/hearings.json".format(
+            congress=congress)
+        return self.paginate(path, lambda r: r['results'][0]['hearings'], max_items, prefetch)
+
+    def iter_hearing(self, chamber, committee, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#4 Iterate over hearings for a specific committee"
+        check_chamber(chamber)
+        path = "{congress}/{chamber}/committees/{committee}/hearings.json".format(
+            congress=congress, chamber=chamber, committee=committee)
+        return self.paginate(path, lambda r: r['results'][0]['hearings'], max_items, prefetch)
+
     def subcommittee(self, chamber, committee, subcommittee,  congress=CURRENT_CONGRESS):
         """
         #4 GET A SPECIFIC SUBCOMMITTEE
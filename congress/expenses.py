@@ -0,0 +1,236 @@
+"""
+Bulk crawl of House office expenses into one aggregated table
+
+Office expenses come one member, year and quarter per request. An
+``ExpenseCrawl`` lists House members for each Congress in the years
+asked for, then fans out across the member, year and quarter grid with
+``fetch_many``, with bounded concurrency and under the client's rate
+limiter. The amounts land in an ``ExpenseTable``: compact, coded
+columns of member, year, quarter, category and amount, which can be
+grouped and summed without any Python-level loop::
+
+    >>> from congress import Congress
+    >>> from congress.expenses import ExpenseCrawl
+    >>> crawl = ExpenseCrawl(Congress(API_KEY), years=range(2015, 2018))
+    >>> table = crawl.run()
+    >>> table.save('expenses.npz')
+    >>> table.group_by('year', 'category')
+    {(2015, 'travel'): 21404561.12, ...}
+
+Requires NumPy (``pip install python-congress[matrix]``).
+"""
+import datetime
+import logging
+
+from .matrix import require_numpy
+from .utils import CongressError, NotFound, QuotaExceeded, field, get_congress
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger('congress')
+
+# the House has published quarterly expenses since 2009
+FIRST_YEAR = 2009
+
+EXPENSES_PATH = "members/{member}/office_expenses/{year}/{quarter}.json"
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def quarters(years):
+    "Every (year, quarter) in years that has already ended"
+    today = datetime.date.today()
+    current = (today.year, (today.month - 1) // 3 + 1)
+    return [(year, quarter) for year in years for quarter in (1, 2, 3, 4)
+            if (year, quarter) < current]
+
+
+class ExpenseTable(object):
+    """
+    Office expenses as columns: ``member``, ``year``, ``quarter``,
+    ``category`` and ``amount``. Members and categories are stored as
+    codes into the ``members`` and ``categories`` lists.
+    """
+
+    COLUMNS = ('member', 'year', 'quarter', 'category', 'amount')
+
+    def __init__(self, member, year, quarter, category, amount, members, categories):
+        require_numpy()
+        self.member = member
+        self.year = year
+        self.quarter = quarter
+        self.category = category
+        self.amount = amount
+        self.members = list(members)
+        self.categories = list(categories)
+
+    @classmethod
+    def from_rows(cls, rows):
+        "Build a table from (member_id, year, quarter, category, amount) rows"
+        require_numpy()
+        rows = list(rows)
+        members = sorted(set(r[0] for r in rows))
+        categories = sorted(set(r[3] for r in rows))
+        member_codes = dict((m, i) for i, m in enumerate(members))
+        category_codes = dict((c, i) for i, c in enumerate(categories))
+
+        count = len(rows)
+        return cls(
+            np.fromiter((member_codes[r[0]] for r in rows), np.int32, count),
+            np.fromiter((r[1] for r in rows), np.int16, count),
+            np.fromiter((r[2] for r in rows), np.int8, count),
+            np.fromiter((category_codes[r[3]] for r in rows), np.int16, count),
+            np.fromiter((r[4] for r in rows), np.float64, count),
+            members, categories)
+
+    def __len__(self):
+        return len(self.amount)
+
+    def __repr__(self):
+        return '<ExpenseTable {0} rows>'.format(len(self))
+
+    def rows(self):
+        "Iterate over (member_id, year, quarter, category, amount) rows"
+        for m, y, q, c, a in zip(self.member.tolist(), self.year.tolist(), self.quarter.tolist(),
+                                 self.category.tolist(), self.amount.tolist()):
+            yield self.members[m], y, q, self.categories[c], a
+
+    def labels(self, column, codes):
+        if column == 'member':
+            return [self.members[c] for c in codes]
+        if column == 'category':
+            return [self.categories[c] for c in codes]
+        return codes
+
+    def group_by(self, *columns):
+        """
+        Total amounts grouped by one or more of member, year, quarter and
+        category. Returns a dict keyed by value, or by tuple of values when
+        grouping by more than one column.
+        """
+        for column in columns:
+            if column not in self.COLUMNS[:-1]:
+                raise ValueError("Can't group by {0}".format(column))
+        if not columns:
+            return float(self.amount.sum())
+
+        keys = np.stack([getattr(self, c).astype(np.int64) for c in columns], axis=1)
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=self.amount, minlength=len(groups))
+
+        labels = [self.labels(c, groups[:, i].tolist()) for i, c in enumerate(columns)]
+        if len(columns) == 1:
+            return dict(zip(labels[0], totals.tolist()))
+        return dict(zip(zip(*labels), totals.tolist()))
+
+    def save(self, filename):
+        "Write the table to a compressed .npz file"
+        np.savez_compressed(
+            filename, member=self.member, year=self.year, quarter=self.quarter,
+            category=self.category, amount=self.amount,
+            members=np.array(self.members, dtype='U'),
+            categories=np.array(self.categories, dtype='U'))
+
+    @classmethod
+    def load(cls, filename):
+        require_numpy()
+        with np.load(filename) as data:
+            return cls(data['member'], data['year'], data['quarter'], data['category'],
+                       data['amount'], data['members'].tolist(), data['categories'].tolist())
+
+
+class ExpenseCrawl(object):
+    """
+    Crawl office expenses for every House member, year and quarter.
+
+    ``congress`` is a ``Congress`` client; give it a rate limiter to keep
+    under the key's quota. Members are listed per Congress, so each member
+    is only asked about the years they served. Requests go out in batches
+    of ``batch_size``, on ``max_workers`` threads.
+
+    Reports already fetched are kept in ``fetched`` and skipped when the
+    crawl is run again, so a crawl stopped by the quota or by errors can
+    be resumed with another ``run``.
+    """
+
+    def __init__(self, congress, years=None, max_workers=8, batch_size=DEFAULT_BATCH_SIZE):
+        require_numpy()
+        if years is None:
+            years = range(FIRST_YEAR, datetime.date.today().year + 1)
+
+        self.congress = congress
+        self.years = sorted(years)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.rows = []
+        self.errors = []
+        # (member_id, year, quarter) of every report done, found or not
+        self.fetched = set()
+
+    def members(self):
+        "Member IDs serving in each Congress the crawl covers"
+        members = {}
+        for number in sorted(set(get_congress(year) for year in self.years)):
+            results = self.congress.members.filter('house', number)
+            if results and hasattr(results[0], 'get') and 'members' in results[0]:
+                # a plain response, not Member records
+                results = results[0]['members']
+            members[number] = [field(m, 'id') for m in results]
+        return members
+
+    def requests(self):
+        "(member_id, year, quarter) for every report still to fetch"
+        members = self.members()
+        return [(member_id, year, quarter)
+                for year, quarter in quarters(self.years)
+                for member_id in members.get(get_congress(year), ())
+                if (member_id, year, quarter) not in self.fetched]
+
+    def run(self):
+        """
+        Fetch every report and return an ExpenseTable. Reports the API
+        doesn't have are skipped, and other errors collected in ``errors``.
+        If the daily quota runs out, the crawl stops and QuotaExceeded is
+        raised; what was fetched so far stays in ``rows``, and ``table()``
+        builds a table from it. Running again fetches only what's left,
+        including reports that failed.
+        """
+        client = self.congress.officeexpenses
+        todo = self.requests()
+        self.errors = []
+        parse = lambda r: r['results']
+
+        for start in range(0, len(todo), self.batch_size):
+            batch = todo[start:start + self.batch_size]
+            paths = [(EXPENSES_PATH.format(member=m, year=y, quarter=q), parse) for m, y, q in batch]
+            results = client.fetch_many(paths, max_workers=self.max_workers)
+
+            quota = None
+            for (member_id, year, quarter), result in zip(batch, results):
+                key = (member_id, year, quarter)
+                if isinstance(result, QuotaExceeded):
+                    quota = quota or result
+                elif isinstance(result, NotFound):
+                    self.fetched.add(key)
+                elif isinstance(result, CongressError):
+                    self.errors.append((key, result))
+                elif key not in self.fetched:
+                    self.fetched.add(key)
+                    for item in result:
+                        category = field(item, 'category_slug') or field(item, 'category')
+                        amount = field(item, 'amount')
+                        if category and amount is not None:
+                            self.rows.append((member_id, year, quarter, category, float(amount)))
+
+            log.debug('Fetched %s of %s expense reports', start + len(batch), len(todo))
+            if quota is not None:
+                raise quota
+
+        return self.table()
+
+    def table(self):
+        "An ExpenseTable of the rows fetched so far"
+        return ExpenseTable.from_rows(self.rows)
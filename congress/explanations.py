@@ -1,5 +1,5 @@
 from .client import Client
-from .utils import CURRENT_CONGRESS, get_offset
+from .utils import CURRENT_CONGRESS, get_offset, with_offset
 
 
 class ExplanationsClient(Client):
@@ -22,8 +22,7 @@ class ExplanationsClient(Client):
         """
         path = "{congress}/explanations.json".format(congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def personal(self, congress=CURRENT_CONGRESS, **kwargs):
@@ -42,8 +41,7 @@ class ExplanationsClient(Client):
         """
         path = "{congress}/explanations/votes.json".format(congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def category(self, type, congress=CURRENT_CONGRESS, **kwargs):
@@ -79,10 +77,9 @@ class ExplanationsClient(Client):
         parameter with multiples of 20.
         """
         path = "{congress}/explanations/votes/{type}.json".format(
-            type=type)
+            congress=congress, type=type)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def recent_member(self, member_id, congress=CURRENT_CONGRESS, **kwargs):
@@ -103,8 +100,7 @@ class ExplanationsClient(Client):
         path = "members/{member_id}/explanations/{congress}.json".format(
             member_id=member_id, congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def personal_member(self, member_id, congress=CURRENT_CONGRESS, **kwargs):
@@ -127,8 +123,7 @@ class ExplanationsClient(Client):
         path = "members/{member_id}/explanations/{congress}/votes.json".format(
             member_id=member_id, congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def category_member(self, type, member_id, congress=CURRENT_CONGRESS, **kwargs):
@@ -169,6 +164,41 @@ class ExplanationsClient(Client):
         path = "members/{member_id}/explanations/{congress}/votes/{type}.json".format(
             member_id=member_id, congress=congress, type=type)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
\ No newline at end of file
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path)
+
+    # lazy iterators over every page
+
+    def iter_recent(self, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#1 Iterate over personal explanations, fetching 20 at a time"
+        path = "{congress}/explanations.json".format(congress=congress)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
+
+    def iter_personal(self, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#2 Iterate over personal explanation votes"
+        path = "{congress}/explanations/votes.json".format(congress=congress)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
+
+    def iter_category(self, type, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#3 Iterate over personal explanation votes in a category"
+        path = "{congress}/explanations/votes/{type}.json".format(
+            congress=congress, type=type)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
+
+    def iter_recent_member(self, member_id, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#4 Iterate over a member's personal explanations"
+        path = "members/{member_id}/explanations/{congress}.json".format(
+            member_id=member_id, congress=congress)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
+
+    def iter_personal_member(self, member_id, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#5 Iterate over a member's personal explanation votes"
+        path = "members/{member_id}/explanations/{congress}/votes.json".format(
+            member_id=member_id, congress=congress)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
+
+    def iter_category_member(self, type, member_id, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#6 Iterate over a member's personal explanation votes in a category"
+        path = "members/{member_id}/explanations/{congress}/votes/{type}.json".format(
+            member_id=member_id, congress=congress, type=type)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
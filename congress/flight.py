@@ -0,0 +1,44 @@
+"""
+Request coalescing: concurrent fetches of one path share one request
+
+When several callers ask for the same resource at once, the first goes
+out to the API and the rest wait for its result instead of sending
+requests of their own.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight(object):
+    "Coalesce concurrent calls by key, across threads"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """
+        Call ``fn`` and return its result, unless a call for ``key`` is
+        already in flight, in which case wait for and share that result
+        (or exception).
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
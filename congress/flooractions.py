@@ -1,5 +1,5 @@
 from .client import Client
-from .utils import CURRENT_CONGRESS, check_chamber, get_offset
+from .utils import CURRENT_CONGRESS, check_chamber, get_offset, with_offset
 
 
 class FloorActionsClient(Client):
@@ -22,8 +22,7 @@ class FloorActionsClient(Client):
         path = "{congress}/{chamber}/floor_updates.json".format(
             congress=congress, chamber=chamber)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def date(self, chamber, year, month, day, **kwargs):
@@ -38,6 +37,19 @@ class FloorActionsClient(Client):
         path = "{chamber}/floor_updates/{year}/{month}/{day}.json".format(
             chamber=chamber, year=year, month=month, day=day)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
+
+    def iter_recent(self, chamber, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#1 Iterate over recent floor actions, fetching 20 at a time"
+        check_chamber(chamber)
+        path = "{congress}/{chamber}/floor_updates.json".format(
+            congress=congress, chamber=chamber)
+        return self.paginate(path, lambda r: r['results'][0]['floor_actions'], max_items, prefetch)
+
+    def iter_date(self, chamber, year, month, day, max_items=None, prefetch=0):
+        "#2 Iterate over floor actions on a date"
+        check_chamber(chamber)
+        path = "{chamber}/floor_updates/{year}/{month}/{day}.json".format(
+            chamber=chamber, year=year, month=month, day=day)
+        return self.paginate(path, lambda r: r['results'][0]['floor_actions'], max_items, prefetch)
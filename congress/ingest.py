@@ -0,0 +1,258 @@
+"""
+Bulk, resumable ingest of every roll call in a session
+
+``RollCallIngest`` finds how many roll calls a session has from the
+chamber's monthly vote lists, then fetches them concurrently under the
+client's rate limiter, with ``VotesClient.get_many``. Each batch is
+written to the output directory as a compressed ``.npz`` chunk of
+columns: one set for the votes themselves, one for member positions.
+
+Chunks are written atomically, and a run skips every roll call already
+stored, so an interrupted ingest picks up where it left off::
+
+    >>> from congress import Congress
+    >>> from congress.ingest import RollCallIngest
+    >>> from congress.ratelimit import RateLimiter
+    >>> congress = Congress(API_KEY, limiter=RateLimiter())
+    >>> ingest = RollCallIngest(congress.votes, 'house-116-1', 'house', 116, 1)
+    >>> ingest.run()
+    701
+    >>> votes, positions = ingest.columns()
+    >>> matrix = ingest.matrix()
+
+Requires NumPy (``pip install python-congress[matrix]``).
+"""
+import datetime
+import glob
+import logging
+import os
+
+from .matrix import VoteMatrix, encode, unwrap, require_numpy, ROLLCALL_DTYPE
+from .utils import CongressError, NotFound, check_chamber, field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger('congress')
+
+DEFAULT_CHUNK_SIZE = 100
+
+# (column, dtype, field or function of the vote)
+VOTE_COLUMNS = (
+    ('congress', 'i2', 'congress'),
+    ('session', 'i1', 'session'),
+    ('roll_call', 'i4', 'roll_call'),
+    ('date', 'datetime64[D]', lambda v: field(v, 'date') or 'NaT'),
+    ('time', 'U', 'time'),
+    ('question', 'U', 'question'),
+    ('description', 'U', 'description'),
+    ('vote_type', 'U', 'vote_type'),
+    ('result', 'U', 'result'),
+    ('bill_id', 'U', lambda v: bill_id(field(v, 'bill') or field(v, 'bill_id'))),
+    ('yes', 'i2', lambda v: total(v, 'yes')),
+    ('no', 'i2', lambda v: total(v, 'no')),
+    ('present', 'i2', lambda v: total(v, 'present')),
+    ('not_voting', 'i2', lambda v: total(v, 'not_voting')),
+)
+
+POSITION_COLUMNS = ('roll_call', 'member_id', 'party', 'state', 'vote_position')
+
+
+def session_year(congress, session):
+    "The calendar year of a session of Congress"
+    return 1789 + 2 * (int(congress) - 1) + int(session) - 1
+
+
+def bill_id(bill):
+    if hasattr(bill, 'get'):
+        return bill.get('bill_id') or ''
+    return bill or ''
+
+
+def total(vote, key):
+    totals = field(vote, 'total') or {}
+    return totals.get(key) or 0
+
+
+def text(value):
+    return u'' if value is None else value
+
+
+class RollCallIngest(object):
+    """
+    Ingest every roll call of one chamber and session into ``directory``.
+
+    ``client`` is a ``VotesClient`` (or ``Congress().votes``); give it a
+    rate limiter to share the key's quota with other work. Roll calls are
+    fetched ``chunk_size`` at a time, on ``max_workers`` threads.
+    """
+
+    def __init__(self, client, directory, chamber, congress, session,
+                 chunk_size=DEFAULT_CHUNK_SIZE, max_workers=8):
+        require_numpy()
+        check_chamber(chamber)
+
+        self.client = client
+        self.directory = directory
+        self.chamber = chamber
+        self.congress = int(congress)
+        self.session = int(session)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def latest(self):
+        """
+        The session's highest roll-call number, from the chamber's monthly
+        vote lists, newest month first.
+        """
+        year = session_year(self.congress, self.session)
+        today = datetime.date.today()
+        last_month = today.month if year == today.year else 12
+        months = [(year, month) for month in range(last_month, 0, -1)]
+
+        # a session can run into the first days of the next January,
+        # as second sessions do until the new Congress starts on the 3rd
+        if (year + 1, 1) <= (today.year, today.month):
+            months.insert(0, (year + 1, 1))
+
+        for year, month in months:
+            try:
+                results = self.client.by_month(self.chamber, year, month)
+            except NotFound:
+                continue
+            votes = results['votes'] if hasattr(results, 'get') else results
+
+            numbers = [int(field(v, 'roll_call')) for v in votes
+                       if int(field(v, 'congress')) == self.congress
+                       and int(field(v, 'session')) == self.session]
+            if numbers:
+                return max(numbers)
+        return 0
+
+    def chunks(self):
+        "Paths of the chunks written so far, in order"
+        return sorted(glob.glob(os.path.join(self.directory, 'chunk-*.npz')))
+
+    def done(self):
+        "Roll-call numbers already stored, including any the API doesn't have"
+        numbers = set()
+        for path in self.chunks():
+            with np.load(path) as chunk:
+                numbers.update(chunk['vote_roll_call'].tolist())
+                numbers.update(chunk['missing'].tolist())
+        return numbers
+
+    def run(self, last=None):
+        """
+        Fetch and store every roll call not yet ingested, up to ``last``
+        (by default, the latest in the session). Returns how many were
+        stored by this run.
+
+        Roll calls the API doesn't have are recorded and skipped. Any other
+        error stops the run once the batch it happened in has been saved,
+        and is raised; run again to resume.
+        """
+        if last is None:
+            last = self.latest()
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        done = self.done()
+        todo = [n for n in range(1, last + 1) if n not in done]
+        stored = 0
+
+        for start in range(0, len(todo), self.chunk_size):
+            numbers = todo[start:start + self.chunk_size]
+            keys = [(self.congress, self.session, n) for n in numbers]
+            results = self.client.get_many(self.chamber, keys, max_workers=self.max_workers)
+
+            votes, missing, error = [], [], None
+            for number, result in zip(numbers, results):
+                if isinstance(result, NotFound):
+                    missing.append(number)
+                elif isinstance(result, CongressError):
+                    error = error or result
+                else:
+                    votes.append(unwrap(result))
+
+            if votes or missing:
+                self.write(votes, missing)
+                stored += len(votes)
+                log.debug('Stored %s roll calls for %s %s-%s', len(votes),
+                          self.chamber, self.congress, self.session)
+
+            if error is not None:
+                raise error
+
+        return stored
+
+    def write(self, votes, missing):
+        "Write one chunk, atomically"
+        columns = {}
+        for name, dtype, source in VOTE_COLUMNS:
+            values = [source(v) if callable(source) else text(field(v, source)) for v in votes]
+            columns['vote_' + name] = np.array(values, dtype=dtype)
+
+        positions = [(field(v, 'roll_call'), p) for v in votes for p in field(v, 'positions') or ()]
+        columns['position_roll_call'] = np.array([int(n) for n, p in positions], dtype='i4')
+        columns['position_member_id'] = np.array([field(p, 'member_id') for n, p in positions], dtype='U7')
+        columns['position_party'] = np.array([text(field(p, 'party')) for n, p in positions], dtype='U')
+        columns['position_state'] = np.array([text(field(p, 'state')) for n, p in positions], dtype='U2')
+        columns['position_vote_position'] = np.array(
+            [encode(field(p, 'vote_position')) for n, p in positions], dtype='i1')
+        columns['missing'] = np.array(missing, dtype='i4')
+
+        name = 'chunk-{0:05d}.npz'.format(len(self.chunks()))
+        path = os.path.join(self.directory, name)
+        partial = path + '.partial'
+
+        with open(partial, 'wb') as f:
+            np.savez_compressed(f, **columns)
+        os.rename(partial, path)
+
+    def columns(self):
+        """
+        Return every stored column, as two dicts of arrays: votes, keyed by
+        the names in VOTE_COLUMNS, and positions, keyed by POSITION_COLUMNS.
+        Votes are sorted by roll call.
+        """
+        chunks = []
+        for path in self.chunks():
+            with np.load(path) as chunk:
+                chunks.append(dict(chunk))
+
+        votes = {}
+        for name, dtype, source in VOTE_COLUMNS:
+            parts = [c['vote_' + name] for c in chunks]
+            votes[name] = np.concatenate(parts) if parts else np.array([], dtype=dtype)
+
+        positions = {}
+        for name in POSITION_COLUMNS:
+            parts = [c['position_' + name] for c in chunks]
+            positions[name] = np.concatenate(parts) if parts else np.array([])
+
+        order = np.argsort(votes['roll_call'], kind='stable')
+        for name in votes:
+            votes[name] = votes[name][order]
+
+        return votes, positions
+
+    def matrix(self):
+        "Build a VoteMatrix from the stored positions, without any parsing"
+        votes, positions = self.columns()
+
+        members, rows = np.unique(positions['member_id'], return_inverse=True)
+        numbers = votes['roll_call']
+        columns = np.searchsorted(numbers, positions['roll_call'])
+
+        matrix = np.zeros((len(members), len(numbers)), dtype=np.int8)
+        matrix[rows, columns] = positions['vote_position']
+
+        rollcalls = np.zeros(len(numbers), dtype=ROLLCALL_DTYPE)
+        rollcalls['congress'] = self.congress
+        rollcalls['session'] = self.session
+        rollcalls['roll_call'] = numbers
+        return VoteMatrix(matrix, members, rollcalls)
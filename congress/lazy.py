@@ -0,0 +1,272 @@
+"""
+Lazy, read-only views over raw JSON responses
+
+Decoding a large response builds every nested dict and list up front,
+even when the caller only reads a field or two. A view instead keeps the
+raw text and indexes objects and arrays incrementally, only as far as
+the fields actually read. Nested objects and arrays become views of
+their own, and values that are skipped over are never kept.
+
+Reading ``vote['result']`` from a roll call, for instance, stops before
+the ``positions`` list is ever looked at.
+
+Use ``view`` as a client's decoder to get views from every fetch::
+
+    >>> from congress import Congress
+    >>> from congress import lazy
+    >>> congress = Congress(API_KEY, decoder=lazy.view)
+    >>> vote = congress.votes.get('house', 17, 1, 116)
+    >>> vote['votes']['vote']['result']
+    'Passed'
+    >>> positions = lazy.materialize(vote['votes']['vote']['positions'])
+
+Views are read-only, and index under a lock, so they're safe to share
+between threads and through a response cache.
+"""
+import json
+import re
+import threading
+
+from six.moves.collections_abc import Mapping, Sequence
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# the json module's C scanner: decodes (or steps over) one value at an offset
+_scan_once = json.scanner.make_scanner(json.JSONDecoder())
+_scanstring = json.decoder.scanstring
+
+
+def view(content):
+    """
+    Return a lazy view over a JSON document: a read-only mapping for an
+    object, a sequence for an array, or the decoded value for a scalar.
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+
+    return _value(content, _WHITESPACE.match(content).end())
+
+
+def materialize(value):
+    "Fully decode a view into plain dicts and lists; anything else is returned as is"
+    if isinstance(value, LazyView):
+        return value.materialize()
+    return value
+
+
+def _scan(text, pos):
+    "Decode the value at pos, returning it and the position just past it"
+    if text[pos] == '"':
+        return _scanstring(text, pos + 1)
+    try:
+        return _scan_once(text, pos)
+    except StopIteration:
+        raise ValueError("Expected a JSON value at {0}".format(pos))
+
+
+def _value(text, pos):
+    char = text[pos]
+    if char == '{':
+        return LazyObject(text, pos)
+    if char == '[':
+        return LazyArray(text, pos)
+    return _scan(text, pos)[0]
+
+
+class LazyView(object):
+    """
+    An object or array in a JSON document, indexed as it's read.
+
+    ``cursor`` is how far indexing has got: the start of the last value
+    found, which hasn't been stepped over yet, or None once the closing
+    bracket has been reached and ``end`` is known. ``lock`` guards both it
+    and the index, so threads can read one view at once.
+    """
+
+    __slots__ = ('text', 'start', 'end', 'cursor', 'spans', 'values', 'lock')
+
+    CLOSE = None
+
+    def __init__(self, text, start):
+        self.text = text
+        self.start = start
+        self.end = None
+        self.cursor = start
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def child(self, pos):
+        "The value starting at pos, as a view if it's an object or array"
+        with self.lock:
+            if pos in self.values:
+                return self.values[pos]
+
+            value = _value(self.text, pos)
+            if isinstance(value, LazyView):
+                # keep views, so work indexing them isn't repeated
+                self.values[pos] = value
+            return value
+
+    def advance(self):
+        """
+        Step past the current value to the start of the next one. Returns
+        False once the container is exhausted.
+        """
+        if self.cursor is None:
+            return False
+
+        text = self.text
+        if self.cursor == self.start:
+            pos = self.cursor + 1
+        else:
+            child = self.values.get(self.cursor)
+            if child is not None and child.end is not None:
+                pos = child.end
+            else:
+                pos = _scan(text, self.cursor)[1]
+
+            pos = _WHITESPACE.match(text, pos).end()
+            if text[pos] == ',':
+                pos += 1
+
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos] == self.CLOSE:
+            self.end = pos + 1
+            self.cursor = None
+            return False
+
+        self.cursor = pos
+        return True
+
+    def finish(self):
+        "Index everything"
+        while self.step() is not None:
+            pass
+
+    def raw(self):
+        "The undecoded JSON text for this value"
+        if self.end is None:
+            self.end = _scan(self.text, self.start)[1]
+        return self.text[self.start:self.end]
+
+    def materialize(self):
+        "Decode this value completely, into plain dicts and lists"
+        return _scan(self.text, self.start)[0]
+
+    def __repr__(self):
+        raw = self.raw()
+        if len(raw) > 60:
+            raw = raw[:57] + '...'
+        return '<{0} {1}>'.format(self.__class__.__name__, raw)
+
+
+class LazyObject(LazyView, Mapping):
+    "A read-only mapping over a JSON object"
+
+    __slots__ = ()
+
+    CLOSE = '}'
+
+    def __init__(self, text, start):
+        super(LazyObject, self).__init__(text, start)
+        self.spans = {}
+
+    def step(self):
+        "Index the next member, returning its key, or None at the end"
+        with self.lock:
+            if not self.advance():
+                return None
+
+            text = self.text
+            key, pos = _scanstring(text, self.cursor + 1)
+            pos = _WHITESPACE.match(text, pos).end()
+            if text[pos] != ':':
+                raise ValueError("Expected ':' at {0}".format(pos))
+
+            self.cursor = _WHITESPACE.match(text, pos + 1).end()
+            self.spans[key] = self.cursor
+            return key
+
+    def __getitem__(self, key):
+        spans = self.spans
+        while key not in spans:
+            # another thread may have indexed it meanwhile
+            if self.step() is None and key not in spans:
+                raise KeyError(key)
+        return self.child(spans[key])
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        self.finish()
+        return iter(self.spans)
+
+    def __len__(self):
+        self.finish()
+        return len(self.spans)
+
+
+class LazyArray(LazyView, Sequence):
+    "A read-only sequence over a JSON array"
+
+    __slots__ = ()
+
+    CLOSE = ']'
+
+    def __init__(self, text, start):
+        super(LazyArray, self).__init__(text, start)
+        self.spans = []
+
+    def step(self):
+        "Index the next element, returning its position, or None at the end"
+        with self.lock:
+            if not self.advance():
+                return None
+
+            self.spans.append(self.cursor)
+            return self.cursor
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            self.finish()
+            i += len(self.spans)
+
+        spans = self.spans
+        while i >= len(spans):
+            if self.step() is None and i >= len(spans):
+                raise IndexError('list index out of range')
+        if i < 0:
+            raise IndexError('list index out of range')
+        return self.child(spans[i])
+
+    def __iter__(self):
+        i = 0
+        while True:
+            try:
+                yield self[i]
+            except IndexError:
+                return
+            i += 1
+
+    def __len__(self):
+        self.finish()
+        return len(self.spans)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazyArray)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
@@ -1,5 +1,5 @@
 from .client import Client
-from .utils import get_offset
+from .utils import get_offset, with_offset
 
 class LobbyingClient(Client):
 
@@ -13,8 +13,7 @@ class LobbyingClient(Client):
         """
         path = "lobbying/latest.json"
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
     def search(self, query, **kwargs):
@@ -28,10 +27,19 @@ class LobbyingClient(Client):
         path = "lobbying/search.json?query={query}".format(
             query=query)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
+    def iter_recent(self, max_items=None, prefetch=0):
+        "#1 Iterate over recent lobbying filings, fetching 20 at a time"
+        path = "lobbying/latest.json"
+        return self.paginate(path, lambda r: r['results'][0]['lobbying_representations'], max_items, prefetch)
+
+    def iter_search(self, query, max_items=None, prefetch=0):
+        "#2 Iterate over lobbying filings matching a search term"
+        path = "lobbying/search.json?query={query}".format(query=query)
+        return self.paginate(path, lambda r: r['results'][0]['lobbying_representations'], max_items, prefetch)
+
     def get(self, filing):
         """
         #3 GET A SPECIFIC LOBBYING REPRESENTATION FILING
@@ -40,4 +48,4 @@ class LobbyingClient(Client):
         """
         path = "lobbying/{filing}.json".format(
             filing=filing)
-        return self.fetch(path)
+        return self.lookup(path)
@@ -0,0 +1,186 @@
+"""
+A dense member-by-roll-call vote matrix
+
+Most analyses of voting start from the same table: one row per member,
+one column per roll call, and how each member voted. ``VoteMatrix``
+builds it once, as a NumPy ``int8`` array, from roll calls fetched with
+``VotesClient.get`` (as dicts or as records), and saves it as ``.npy``
+files that load back memory-mapped.
+
+::
+
+    >>> from congress import Congress
+    >>> from congress.matrix import VoteMatrix, YES
+    >>> congress = Congress(API_KEY)
+    >>> keys = [(116, 1, n) for n in range(1, 701)]
+    >>> matrix = VoteMatrix.fetch(congress.votes, 'house', keys)
+    >>> matrix.save('house-116-1')
+    >>> matrix = VoteMatrix.load('house-116-1')
+    >>> (matrix.row('P000197') == YES).sum()
+
+Requires NumPy (``pip install python-congress[matrix]``).
+"""
+import os
+
+from .utils import CongressError, field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# vote codes; MISSING means the member had no position on that roll call
+MISSING = 0
+YES = 1
+NO = -1
+PRESENT = 2
+NOT_VOTING = 3
+OTHER = 4
+
+CODES = {
+    'Yes': YES, 'Aye': YES, 'Yea': YES,
+    'No': NO, 'Nay': NO,
+    'Present': PRESENT,
+    'Not Voting': NOT_VOTING,
+}
+
+ROLLCALL_DTYPE = [('congress', 'i2'), ('session', 'i1'), ('roll_call', 'i4')]
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("VoteMatrix requires numpy: pip install python-congress[matrix]")
+
+
+def encode(position):
+    "The vote code for a position string, such as 'Yes' or 'Not Voting'"
+    return CODES.get(position, OTHER)
+
+
+def unwrap(vote):
+    "The vote itself, from a full VotesClient.get response or the vote alone"
+    if hasattr(vote, 'get') and 'votes' in vote:
+        return vote['votes']['vote']
+    return vote
+
+
+def rollcall_key(vote):
+    return (int(field(vote, 'congress')), int(field(vote, 'session')), int(field(vote, 'roll_call')))
+
+
+class VoteMatrix(object):
+    """
+    Member-by-roll-call votes.
+
+    ``votes`` is an ``int8`` array with one row per member and one column
+    per roll call, holding the codes YES, NO, PRESENT, NOT_VOTING, OTHER
+    (any other answer, such as a name in a Speaker election) or MISSING.
+    ``members`` holds each row's bioguide ID, and ``rollcalls`` each
+    column's ``(congress, session, roll_call)``. Rows are sorted by
+    member ID and columns by roll call.
+    """
+
+    def __init__(self, votes, members, rollcalls):
+        require_numpy()
+        self.votes = votes
+        self.members = members
+        self.rollcalls = rollcalls
+        self._rows = None
+        self._columns = None
+
+    @classmethod
+    def from_votes(cls, votes):
+        """
+        Build a matrix from roll calls: ``VotesClient.get`` responses, the
+        ``vote`` dicts inside them, or ``RollCall`` records. A roll call
+        that appears more than once is counted once.
+        """
+        require_numpy()
+
+        rollcalls = {}
+        for vote in votes:
+            vote = unwrap(vote)
+            rollcalls[rollcall_key(vote)] = vote
+
+        keys = sorted(rollcalls)
+        members = sorted(set(
+            field(p, 'member_id') for vote in rollcalls.values()
+            for p in field(vote, 'positions') or ()))
+
+        rows = dict((member_id, i) for i, member_id in enumerate(members))
+        matrix = np.zeros((len(members), len(keys)), dtype=np.int8)
+
+        for column, key in enumerate(keys):
+            positions = field(rollcalls[key], 'positions') or ()
+            count = len(positions)
+            if not count:
+                continue
+
+            index = np.fromiter((rows[field(p, 'member_id')] for p in positions), np.intp, count)
+            codes = np.fromiter((encode(field(p, 'vote_position')) for p in positions), np.int8, count)
+            matrix[index, column] = codes
+
+        return cls(matrix,
+                   np.array(members, dtype='U'),
+                   np.array(keys, dtype=ROLLCALL_DTYPE))
+
+    @classmethod
+    def fetch(cls, client, chamber, rollcalls, **kwargs):
+        """
+        Fetch roll calls concurrently with ``client.get_many`` and build
+        a matrix from them. ``rollcalls`` is an iterable of
+        ``(congress, session, roll_call)``. Raises the first error if any
+        roll call can't be fetched.
+        """
+        votes = client.get_many(chamber, rollcalls, **kwargs)
+        for vote in votes:
+            if isinstance(vote, CongressError):
+                raise vote
+        return cls.from_votes(votes)
+
+    @property
+    def shape(self):
+        return self.votes.shape
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return '<VoteMatrix {0} members x {1} roll calls>'.format(*self.votes.shape)
+
+    def row(self, member_id):
+        "One member's votes, across every roll call"
+        if self._rows is None:
+            self._rows = dict((m, i) for i, m in enumerate(self.members.tolist()))
+        try:
+            return self.votes[self._rows[member_id]]
+        except KeyError:
+            raise KeyError("No votes for member {0}".format(member_id))
+
+    def column(self, congress, session, roll_call):
+        "Every member's vote on one roll call"
+        if self._columns is None:
+            self._columns = dict((tuple(k), i) for i, k in enumerate(self.rollcalls.tolist()))
+        try:
+            return self.votes[:, self._columns[(congress, session, roll_call)]]
+        except KeyError:
+            raise KeyError("No roll call {0}-{1}-{2}".format(congress, session, roll_call))
+
+    def save(self, directory):
+        "Write votes.npy, members.npy and rollcalls.npy to a directory"
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        np.save(os.path.join(directory, 'votes.npy'), self.votes)
+        np.save(os.path.join(directory, 'members.npy'), self.members)
+        np.save(os.path.join(directory, 'rollcalls.npy'), self.rollcalls)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """
+        Load a saved matrix. The votes are memory-mapped unless ``mmap_mode``
+        is None, so opening even a very large matrix is instant.
+        """
+        require_numpy()
+        return cls(np.load(os.path.join(directory, 'votes.npy'), mmap_mode=mmap_mode),
+                   np.load(os.path.join(directory, 'members.npy')),
+                   np.load(os.path.join(directory, 'rollcalls.npy')))
@@ -1,4 +1,5 @@
 from .client import Client
+from .records import Member
 from .utils import CURRENT_CONGRESS, check_chamber
 
 
@@ -14,7 +15,7 @@ class MembersClient(Client):
         can be retrieved from a member list request.
         """
         path = "members/{0}.json".format(member_id)
-        return self.fetch(path)
+        return self.lookup(path, self.typed(Member))
 
     def filter(self, chamber, congress=CURRENT_CONGRESS, **kwargs):
         """
@@ -49,8 +50,9 @@ class MembersClient(Client):
             """
             path = ("{congress}/{chamber}/"
                     "members.json").format(**kwargs)
+            return self.fetch(path, parse=self.typed(Member, lambda r: r['results'], (0, 'members')))
 
-        return self.fetch(path, parse=lambda r: r['results'])
+        return self.fetch(path, parse=self.typed(Member, lambda r: r['results']))
 
     def bills(self, member_id, type='introduced'):
         """
@@ -80,7 +82,7 @@ class MembersClient(Client):
         """
         check_chamber(chamber)
         path = "{0}/{1}/members/leaving.json".format(congress, chamber)
-        return self.fetch(path)
+        return self.fetch(path, self.typed(Member, at=('members',)))
 
     def votes(self, member_id):
         """
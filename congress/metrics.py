@@ -0,0 +1,403 @@
+"""
+Per-endpoint metrics for API requests
+
+Pass a sink as ``metrics`` to ``Congress`` (or any client) and every cache
+hit and every response from the API is reported to it as a ``Sample``:
+the route, whether the cache answered, the HTTP status, latency, response
+size, how long decoding took, and any NotFound or CongressError raised.
+
+Samples are labeled by route template, such as
+``{congress}/{chamber}/sessions/{session}/votes/{n}.json``, rather than by
+raw path, so each endpoint is one series however many bills or roll calls
+are fetched from it.
+
+``Metrics`` is a sink that aggregates samples per route, with counters and
+latency histograms, and can export them in the Prometheus text format::
+
+    >>> from congress import Congress
+    >>> from congress.metrics import Metrics
+    >>> metrics = Metrics()
+    >>> congress = Congress(API_KEY, metrics=metrics)
+    >>> vote = congress.votes.get('house', 17, 1, 116)
+    >>> metrics.stats()['{congress}/{chamber}/sessions/{session}/votes/{n}.json']['requests']
+    1
+    >>> print(metrics.prometheus())
+
+Any object with a ``record(sample)`` method can be a sink. It's called on
+the requesting thread, or the event loop for async clients, so it should
+be quick.
+"""
+import bisect
+import re
+import threading
+
+from .cache import normalize
+
+# cache outcomes
+HIT = 'hit'
+MISS = 'miss'
+REVALIDATED = 'revalidated'
+
+# upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DECODE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+# what each route parameter looks like; anything else is one path segment
+PARAMETERS = {
+    'congress': r'\d+',
+    'chamber': r'house|senate|both|joint',
+    'session': r'\d',
+    'n': r'\d+',
+    'year': r'\d{4}',
+    'month': r'\d{1,2}',
+    'day': r'\d{1,2}',
+    'quarter': r'\d',
+    'date': r'\d{4}-\d{2}-\d{2}',
+    'member_id': r'[A-Z]\d{6}',
+}
+
+# route templates for every endpoint the clients call; the first match wins
+ROUTES = (
+    # votes
+    '{congress}/{chamber}/sessions/{session}/votes/{n}.json',
+    '{chamber}/votes/recent.json',
+    '{chamber}/votes/{start:date}/{end:date}.json',
+    '{chamber}/votes/{year}/{month}.json',
+    '{congress}/{chamber}/votes/{type}.json',
+    '{congress}/nominations.json',
+
+    # members
+    'members/{member_id}.json',
+    'members/{member_id}/votes.json',
+    'members/{member_id}/bills/{type}.json',
+    'members/{member_id}/statements/{congress}.json',
+    'members/{member_id}/explanations/{congress}.json',
+    'members/{member_id}/explanations/{congress}/votes.json',
+    'members/{member_id}/explanations/{congress}/votes/{type}.json',
+    'members/{member_id}/office_expenses/category/{category}.json',
+    'members/{member_id}/office_expenses/{year}/{quarter}.json',
+    'members/{first:member_id}/{type}/{second:member_id}/{congress}/{chamber}.json',
+    'members/new.json',
+    'members/{chamber}/{state}/current.json',
+    'members/{chamber}/{state}/{district}/current.json',
+    '{congress}/{chamber}/members.json',
+    '{congress}/{chamber}/members/leaving.json',
+    'states/members/party.json',
+
+    # bills
+    'bills/search.json',
+    'bills/subjects/search.json',
+    'bills/subjects/{subject}.json',
+    'bills/upcoming/{chamber}.json',
+    '{congress}/bills/{bill_id}.json',
+    '{congress}/bills/{bill_id}/statements.json',
+    '{congress}/bills/{bill_id}/{type}.json',
+    '{congress}/{chamber}/bills/{type}.json',
+
+    # committees
+    '{congress}/{chamber}/committees.json',
+    '{congress}/committees/hearings.json',
+    '{congress}/{chamber}/committees/{committee}.json',
+    '{congress}/{chamber}/committees/{committee}/hearings.json',
+    '{congress}/{chamber}/committees/{committee}/subcommittees/{subcommittee}.json',
+    '{congress}/{chamber}/committees/{committee}/subcommittes/{subcommittee}.json',
+
+    # nominations
+    '{congress}/nominees/state/{state}.json',
+    '{congress}/nominees/{nominee}.json',
+
+    # communications, explanations and floor actions
+    'communications/date/{date}.json',
+    '{congress}/communications.json',
+    '{congress}/communications/category/{category}.json',
+    '{congress}/communications/{chamber}.json',
+    '{congress}/explanations.json',
+    '{congress}/explanations/votes.json',
+    '{congress}/explanations/votes/{type}.json',
+    '{congress}/{chamber}/floor_updates.json',
+    '{chamber}/floor_updates/{year}/{month}/{day}.json',
+
+    # lobbying, office expenses and statements
+    'lobbying/latest.json',
+    'lobbying/search.json',
+    'lobbying/{filing}.json',
+    'office_expenses/category/{category}/{year}/{quarter}.json',
+    'statements/latest.json',
+    'statements/search.json',
+    'statements/subjects.json',
+    'statements/date/{date}.json',
+    'statements/subject/{subject}.json',
+)
+
+PARAMETER = re.compile(r'\{(\w+)(?::(\w+))?\}')
+
+# segments templated on paths that match no route
+GENERIC = (
+    (re.compile(r'^[A-Z]\d{6}$'), '{member_id}'),
+    (re.compile(r'^\d{4}-\d{2}-\d{2}$'), '{date}'),
+    (re.compile(r'^(house|senate|both|joint)$'), '{chamber}'),
+    (re.compile(r'^\d+$'), '{n}'),
+)
+
+# templates by path, cleared whenever it fills up
+ROUTE_MEMO = {}
+ROUTE_MEMO_SIZE = 10000
+
+
+def compile_route(template):
+    """
+    A regex for a route template. ``{name}`` matches the PARAMETERS pattern
+    for name, or any one path segment; ``{name:kind}`` matches the pattern
+    for kind.
+    """
+    pattern, end = [], 0
+    for match in PARAMETER.finditer(template):
+        name, kind = match.group(1), match.group(2) or match.group(1)
+        pattern.append(re.escape(template[end:match.start()]))
+        pattern.append('(?:{0})'.format(PARAMETERS.get(kind, r'[^/]+')))
+        end = match.end()
+    pattern.append(re.escape(template[end:]))
+    return re.compile('^' + ''.join(pattern) + '$')
+
+
+def display(template):
+    "A route template as it appears in labels, with ``{name:kind}`` shown as ``{name}``"
+    return PARAMETER.sub(r'{\1}', template)
+
+
+COMPILED_ROUTES = [(compile_route(t), display(t)) for t in ROUTES]
+
+
+def generic_route(path):
+    "Template a path no route matches, segment by segment"
+    segments = []
+    for segment in path.split('/'):
+        name, dot, extension = segment.partition('.')
+        for pattern, template in GENERIC:
+            if pattern.match(name):
+                name = template
+                break
+        segments.append(name + dot + extension)
+    return '/'.join(segments)
+
+
+def route(path):
+    """
+    The route template for an API path, ignoring its querystring::
+
+        >>> route('116/house/sessions/1/votes/17.json')
+        '{congress}/{chamber}/sessions/{session}/votes/{n}.json'
+
+    """
+    try:
+        return ROUTE_MEMO[path]
+    except KeyError:
+        pass
+
+    bare = normalize(path).split('?', 1)[0]
+    for pattern, template in COMPILED_ROUTES:
+        if pattern.match(bare):
+            break
+    else:
+        template = generic_route(bare)
+
+    if len(ROUTE_MEMO) >= ROUTE_MEMO_SIZE:
+        ROUTE_MEMO.clear()
+    ROUTE_MEMO[path] = template
+    return template
+
+
+class Sample(object):
+    """
+    One request, as reported to a sink.
+
+    ``cache`` is HIT, MISS, REVALIDATED (a stale entry the API confirmed
+    unchanged), or None for a client without a response cache. A cache hit
+    has no ``status``, ``seconds``, ``bytes`` or ``decode_seconds``.
+    ``seconds`` is time spent on the HTTP request, not counting any wait
+    for the rate limiter. ``error`` is the name of the exception raised
+    for the response, such as 'NotFound' or 'CongressError', or None.
+    """
+
+    __slots__ = ('route', 'path', 'cache', 'status', 'seconds', 'bytes', 'decode_seconds', 'error')
+
+    def __init__(self, route, path, cache=None, status=None, seconds=None, bytes=None,
+                 decode_seconds=None, error=None):
+        self.route = route
+        self.path = path
+        self.cache = cache
+        self.status = status
+        self.seconds = seconds
+        self.bytes = bytes
+        self.decode_seconds = decode_seconds
+        self.error = error
+
+    def __repr__(self):
+        return '<Sample {0} {1}>'.format(self.route, self.cache or self.status)
+
+
+class MetricsSink(object):
+    "Base class for sinks. Subclasses implement ``record``"
+
+    def record(self, sample):
+        raise NotImplementedError
+
+
+class Histogram(object):
+    "Counts of observations at or below each bucket's upper bound, with their sum"
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        "(upper bound, count at or below it) pairs, ending with +Inf"
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        "Estimate a quantile as the upper bound of the bucket it falls in"
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+
+
+class RouteMetrics(object):
+    "Counters and histograms for one route"
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, decode_buckets=DECODE_BUCKETS):
+        self.requests = 0
+        self.cache = dict((outcome, 0) for outcome in (HIT, MISS, REVALIDATED))
+        self.statuses = {}
+        self.errors = {}
+        self.bytes = 0
+        self.latency = Histogram(latency_buckets)
+        self.decode = Histogram(decode_buckets)
+
+    def add(self, sample):
+        self.requests += 1
+        if sample.cache is not None:
+            self.cache[sample.cache] = self.cache.get(sample.cache, 0) + 1
+        if sample.status is not None:
+            self.statuses[sample.status] = self.statuses.get(sample.status, 0) + 1
+        if sample.error is not None:
+            self.errors[sample.error] = self.errors.get(sample.error, 0) + 1
+        if sample.bytes is not None:
+            self.bytes += sample.bytes
+        if sample.seconds is not None:
+            self.latency.observe(sample.seconds)
+        if sample.decode_seconds is not None:
+            self.decode.observe(sample.decode_seconds)
+
+    def stats(self):
+        looked_up = sum(self.cache.values())
+        return {
+            'requests': self.requests,
+            'cache': dict(self.cache),
+            'hit_rate': float(self.cache[HIT]) / looked_up if looked_up else None,
+            'statuses': dict(self.statuses),
+            'errors': dict(self.errors),
+            'error_rate': float(sum(self.errors.values())) / self.requests if self.requests else 0.0,
+            'bytes': self.bytes,
+            'latency_mean': self.latency.sum / self.latency.count if self.latency.count else None,
+            'latency_p50': self.latency.quantile(0.5),
+            'latency_p99': self.latency.quantile(0.99),
+            'decode_mean': self.decode.sum / self.decode.count if self.decode.count else None,
+        }
+
+
+def escape(value):
+    "A Prometheus label value"
+    return u'{0}'.format(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def bound(value):
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+
+class Metrics(MetricsSink):
+    """
+    A sink that aggregates samples by route. Safe to share between
+    clients and threads.
+
+    ``stats()`` returns, for each route, its request count, cache outcomes
+    and hit rate, HTTP statuses, errors by name and error rate, bytes
+    received, and latency and decode time summaries. ``prometheus()``
+    exports the same in the Prometheus text format.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, decode_buckets=DECODE_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.decode_buckets = decode_buckets
+        self.routes = {}
+        self.lock = threading.Lock()
+
+    def record(self, sample):
+        with self.lock:
+            metrics = self.routes.get(sample.route)
+            if metrics is None:
+                metrics = self.routes[sample.route] = RouteMetrics(self.latency_buckets,
+                                                                   self.decode_buckets)
+            metrics.add(sample)
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+    def stats(self):
+        with self.lock:
+            return dict((route, metrics.stats()) for route, metrics in self.routes.items())
+
+    def prometheus(self, prefix='congress'):
+        "Every route's metrics, in the Prometheus text exposition format"
+        lines = []
+
+        def family(name, kind, help, samples):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, help))
+            lines.append('# TYPE {0}_{1} {2}'.format(prefix, name, kind))
+            for suffix, labels, value in samples:
+                labels = ','.join(u'{0}="{1}"'.format(k, escape(v)) for k, v in labels)
+                lines.append(u'{0}_{1}{2}{{{3}}} {4}'.format(prefix, name, suffix, labels, value))
+
+        def histogram(route, histogram):
+            labels = [('route', route)]
+            for upper, total in histogram.cumulative():
+                yield '_bucket', labels + [('le', bound(upper))], total
+            yield '_sum', labels, repr(histogram.sum)
+            yield '_count', labels, histogram.count
+
+        with self.lock:
+            routes = sorted(self.routes.items())
+
+            family('requests_total', 'counter', 'Requests, including cache hits, by route.',
+                   [('', [('route', r)], m.requests) for r, m in routes])
+            family('cache_total', 'counter', 'Response cache lookups by route and result.',
+                   [('', [('route', r), ('result', result)], count)
+                    for r, m in routes for result, count in sorted(m.cache.items())])
+            family('responses_total', 'counter', 'API responses by route and HTTP status.',
+                   [('', [('route', r), ('status', status)], count)
+                    for r, m in routes for status, count in sorted(m.statuses.items())])
+            family('errors_total', 'counter', 'Errors raised for responses, by route and error.',
+                   [('', [('route', r), ('error', error)], count)
+                    for r, m in routes for error, count in sorted(m.errors.items())])
+            family('response_bytes_total', 'counter', 'Response body bytes received, by route.',
+                   [('', [('route', r)], m.bytes) for r, m in routes])
+            family('request_seconds', 'histogram', 'HTTP request latency by route.',
+                   [s for r, m in routes for s in histogram(r, m.latency)])
+            family('decode_seconds', 'histogram', 'Response decode time by route.',
+                   [s for r, m in routes for s in histogram(r, m.decode)])
+
+        return u'\n'.join(lines) + u'\n'
@@ -18,7 +18,7 @@ class NominationsClient(Client):
         """
         path = "{congress}/nominees/{nominee}.json".format(congress=congress,
                                                            nominee=nominee)
-        return self.fetch(path)
+        return self.lookup(path)
 
     def by_state(self, state, congress=CURRENT_CONGRESS):
         """
@@ -1,5 +1,5 @@
 from .client import Client
-from .utils import check_quarter, check_category, get_offset
+from .utils import check_quarter, check_category, get_offset, with_offset
 
 
 class OfficeExpensesClient(Client):
@@ -59,6 +59,11 @@ class OfficeExpensesClient(Client):
         path = "office_expenses/category/{category}/{year}/{quarter}.json".format(
             category=category, year=year, quarter=quarter)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
+
+    def iter_category(self, category, year, quarter, max_items=None, prefetch=0):
+        "#3 Iterate over office expenses for a category, fetching 20 at a time"
+        path = "office_expenses/category/{category}/{year}/{quarter}.json".format(
+            category=category, year=year, quarter=quarter)
+        return self.paginate(path, lambda r: r['results'], max_items, prefetch)
@@ -0,0 +1,253 @@
+"""
+Client-side rate limiting for a shared API key
+
+ProPublica limits each key to a daily quota and a short burst rate. A
+RateLimiter shared by every client using the key keeps requests under
+both, queueing callers in priority order so interactive lookups go
+ahead of bulk crawls waiting on the same key.
+"""
+import contextlib
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+from .utils import QuotaExceeded
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
+
+# priority classes; lower goes first
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+
+PRIORITIES = {INTERACTIVE: 'interactive', NORMAL: 'normal', BULK: 'bulk'}
+
+
+class RateLimiter(object):
+    """
+    A token bucket with a daily quota and a priority queue in front of it.
+
+    Tokens refill at ``rate`` per second, up to ``burst``. Each request takes
+    one token and counts against ``daily_quota``, which resets at midnight UTC.
+    When no token is free, callers wait in order of priority, then arrival,
+    whether they block in ``acquire`` or wait in an event loop.
+
+    ::
+
+        >>> from congress import Congress
+        >>> from congress.ratelimit import RateLimiter, BULK
+        >>> limiter = RateLimiter(rate=5, burst=10, daily_quota=5000)
+        >>> congress = Congress(API_KEY, limiter=limiter)
+        >>> with limiter.priority(BULK):
+        ...     votes = [congress.votes.get('house', n, 1, 115) for n in range(1, 700)]
+        >>> limiter.remaining
+        4301
+
+    Single-record lookups, like ``members.get``, run at INTERACTIVE priority,
+    and ``Client.fetch_many`` and the ``iter_*`` paginators at BULK;
+    everything else defaults to NORMAL. Inside a ``priority`` block, the
+    block's priority applies to all but explicit ``priority`` arguments.
+    """
+
+    def __init__(self, rate=5, burst=10, daily_quota=5000):
+        self.rate = float(rate)
+        self.burst = burst
+        self.daily_quota = daily_quota
+
+        self.tokens = float(burst)
+        self.updated = time.time()
+        self.day = datetime.datetime.utcnow().date()
+        self.used = 0
+
+        self.condition = threading.Condition()
+        self.queue = []
+        self.counter = itertools.count()
+        # queued tickets' arrival times and wakers
+        self.joined = {}
+
+        if ContextVar is not None:
+            # per thread, and per asyncio task
+            self.context = ContextVar('congress_priority', default=None)
+        else:
+            self.context = None
+            self.local = threading.local()
+
+        self.waits = dict((p, [0, 0.0, 0.0]) for p in PRIORITIES)
+
+    @contextlib.contextmanager
+    def priority(self, priority):
+        """
+        Run requests made inside the block at a priority. The priority holds
+        for this thread, or in async code for this task, and isn't seen by
+        others.
+        """
+        if self.context is not None:
+            token = self.context.set(priority)
+            try:
+                yield self
+            finally:
+                self.context.reset(token)
+            return
+
+        previous = getattr(self.local, 'priority', None)
+        self.local.priority = priority
+        try:
+            yield self
+        finally:
+            self.local.priority = previous
+
+    def current(self, default=NORMAL):
+        "The priority set by an enclosing ``priority`` block, or default"
+        if self.context is not None:
+            priority = self.context.get()
+        else:
+            priority = getattr(self.local, 'priority', None)
+        return default if priority is None else priority
+
+    def refill(self, now):
+        # caller holds the condition
+        today = datetime.datetime.utcfromtimestamp(now).date()
+        if today != self.day:
+            self.day, self.used = today, 0
+
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority=None):
+        """
+        Block until this request may go out. Raises QuotaExceeded once the
+        daily quota is spent.
+        """
+        ticket = self.join(priority)
+        try:
+            with self.condition:
+                while True:
+                    delay = self.admit(ticket)
+                    if delay == 0:
+                        return
+                    self.condition.wait(delay)
+        except BaseException:
+            self.leave(ticket)
+            raise
+
+    def join(self, priority=None, waker=None):
+        """
+        Queue a request, returning its ticket. For callers that can't block
+        on ``acquire``, like event loops: ``waker`` is called, from any
+        thread, when the ticket reaches the head of the queue, and the
+        caller then tries ``take`` again. Every ticket must end in a
+        successful ``take`` or in ``leave``.
+        """
+        if priority is None:
+            priority = self.current()
+
+        ticket = (priority, next(self.counter))
+        with self.condition:
+            heapq.heappush(self.queue, ticket)
+            self.joined[ticket] = (time.time(), waker)
+        return ticket
+
+    def take(self, ticket):
+        """
+        Take a token for a queued ticket, if it's its turn. Returns 0 on
+        success, the seconds until a token is free if the ticket is next,
+        or None if it's behind others. Raises QuotaExceeded once the daily
+        quota is spent.
+        """
+        with self.condition:
+            return self.admit(ticket)
+
+    def leave(self, ticket):
+        "Give up a queued ticket"
+        with self.condition:
+            self.joined.pop(ticket, None)
+            if ticket in self.queue:
+                self.queue.remove(ticket)
+                heapq.heapify(self.queue)
+                self.handoff()
+
+    def admit(self, ticket):
+        # caller holds the condition; see take
+        now = time.time()
+        self.refill(now)
+
+        if self.daily_quota is not None and self.used >= self.daily_quota:
+            raise QuotaExceeded(
+                "Daily quota of {0} requests used".format(self.daily_quota))
+
+        if self.queue[0] != ticket:
+            return None
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+
+        heapq.heappop(self.queue)
+        self.tokens -= 1
+        self.used += 1
+        start, waker = self.joined.pop(ticket)
+        self.record_wait(ticket[0], now - start)
+        self.handoff()
+        return 0
+
+    def handoff(self):
+        # caller holds the condition: let whoever is now first know
+        self.condition.notify_all()
+        if self.queue:
+            waker = self.joined[self.queue[0]][1]
+            if waker is not None:
+                waker()
+
+    def throttled(self):
+        "Back off after the API answers 429, by emptying the bucket"
+        with self.condition:
+            self.refill(time.time())
+            self.tokens = min(self.tokens, 0)
+
+    def record_wait(self, priority, seconds):
+        stats = self.waits.setdefault(priority, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+    @property
+    def remaining(self):
+        "Requests left in today's quota, or None without one"
+        if self.daily_quota is None:
+            return None
+        with self.condition:
+            self.refill(time.time())
+            return max(0, self.daily_quota - self.used)
+
+    @property
+    def queued(self):
+        "Callers currently waiting for a token"
+        return len(self.queue)
+
+    def stats(self):
+        """
+        Return counters: quota used and remaining, the current queue length,
+        and request count and total, mean and max queue wait per priority.
+        """
+        with self.condition:
+            self.refill(time.time())
+            waits = {}
+            for priority, (count, total, longest) in self.waits.items():
+                name = PRIORITIES.get(priority, priority)
+                waits[name] = {
+                    'requests': count,
+                    'wait_total': total,
+                    'wait_mean': total / count if count else 0.0,
+                    'wait_max': longest,
+                }
+
+            return {
+                'used': self.used,
+                'remaining': None if self.daily_quota is None else max(0, self.daily_quota - self.used),
+                'tokens': self.tokens,
+                'queued': len(self.queue),
+                'waits': waits,
+            }
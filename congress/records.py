@@ -0,0 +1,291 @@
+"""
+Compact, typed records for the main result shapes
+
+Plain dicts are convenient, but holding hundreds of thousands of vote
+positions or bills as dicts costs several times the memory of an object
+with ``__slots__``. These records keep only the fields listed for each
+type, intern the small, repetitive ones (party, state, chamber, vote
+position) so every record shares one string, and parse dates.
+
+Clients return records in place of dicts when created with
+``records=True``::
+
+    >>> from congress import Congress
+    >>> congress = Congress(API_KEY, records=True)
+    >>> vote = congress.votes.get('house', 17, 1, 116)
+    >>> vote.result
+    'Passed'
+    >>> vote.positions[0].vote_position
+    'Yes'
+    >>> vote.date
+    datetime.date(2019, 1, 9)
+
+Any decoded response can also be converted directly, with ``convert``::
+
+    >>> from congress.records import Member
+    >>> members = Member.convert(response['results'][0]['members'])
+
+"""
+import datetime
+
+import six
+
+from .utils import parse_date
+
+
+def intern(value):
+    "Intern a short, repetitive string, so equal values share one object"
+    return six.moves.intern(str(value))
+
+
+def date(value):
+    "Parse a date, or return None for an empty one"
+    if not value:
+        return None
+    value = parse_date(value)
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value
+
+
+def number(value):
+    "Parse an integer, or return None for an empty one"
+    if value == '':
+        return None
+    return int(value)
+
+
+def decimal(value):
+    "Parse a float, or return None for an empty one"
+    if value == '':
+        return None
+    return float(value)
+
+
+def boolean(value):
+    if isinstance(value, six.string_types):
+        return value.lower() == 'true'
+    return bool(value)
+
+
+class Record(object):
+    """
+    Base class for records.
+
+    ``FIELDS`` is a sequence of ``(attribute, keys, convert)``: a record's
+    attribute is read from the first of ``keys`` present in the response,
+    converted by ``convert`` if it isn't None, and missing fields are None.
+    Subclasses list the same attributes in ``__slots__``.
+    """
+
+    __slots__ = ()
+
+    FIELDS = ()
+
+    def __init__(self, **kwargs):
+        for name, keys, convert in self.FIELDS:
+            setattr(self, name, kwargs.get(name))
+
+    @classmethod
+    def from_dict(cls, data):
+        "Build a record from one decoded result"
+        record = cls.__new__(cls)
+        for name, keys, convert in cls.FIELDS:
+            value = None
+            for key in keys:
+                value = data.get(key)
+                if value is not None:
+                    break
+
+            if value is not None and convert is not None:
+                value = convert(value)
+            setattr(record, name, value)
+
+        return record
+
+    @classmethod
+    def convert(cls, value):
+        "Convert a decoded result, or a list of them, to records"
+        if value is None or isinstance(value, cls):
+            return value
+        if isinstance(value, (list, tuple)) or not hasattr(value, 'get'):
+            return [cls.convert(v) for v in value]
+        return cls.from_dict(value)
+
+    def as_dict(self):
+        "The record's fields as a plain dict"
+        return dict((name, getattr(self, name)) for name, keys, convert in self.FIELDS)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name, keys, convert in self.FIELDS)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        name, keys, convert = self.FIELDS[0]
+        return '<{0} {1}>'.format(self.__class__.__name__, getattr(self, name))
+
+
+def fields(*specs):
+    """
+    Build ``FIELDS`` from ``(attribute, convert)`` or ``(attribute, keys, convert)``
+    specs, where an attribute is read from its own key unless ``keys`` says otherwise
+    """
+    result = []
+    for spec in specs:
+        if len(spec) == 2:
+            name, convert = spec
+            keys = (name,)
+        else:
+            name, keys, convert = spec
+        result.append((name, tuple(keys), convert))
+    return tuple(result)
+
+
+class Member(Record):
+    "A member of Congress, from member lists and lookups"
+
+    FIELDS = fields(
+        ('id', ('id', 'member_id'), None),
+        ('first_name', None),
+        ('middle_name', None),
+        ('last_name', None),
+        ('party', ('party', 'current_party'), intern),
+        ('state', intern),
+        ('district', None),
+        ('chamber', intern),
+        ('gender', intern),
+        ('date_of_birth', date),
+        ('in_office', boolean),
+        ('next_election', None),
+        ('seniority', number),
+        ('total_votes', number),
+        ('missed_votes_pct', decimal),
+        ('votes_with_party_pct', decimal),
+        ('twitter_account', None),
+        ('url', None),
+    )
+
+    __slots__ = tuple(name for name, keys, convert in FIELDS)
+
+    @property
+    def name(self):
+        return ' '.join(n for n in (self.first_name, self.middle_name, self.last_name) if n)
+
+
+class Bill(Record):
+    "A bill, from bill lookups and lists"
+
+    FIELDS = fields(
+        ('bill_id', None),
+        ('bill_type', intern),
+        ('number', None),
+        ('congress', number),
+        ('title', None),
+        ('short_title', None),
+        ('sponsor_id', None),
+        ('sponsor_party', intern),
+        ('sponsor_state', intern),
+        ('introduced_date', date),
+        ('committees', None),
+        ('primary_subject', intern),
+        ('cosponsors', number),
+        ('active', boolean),
+        ('house_passage', date),
+        ('senate_passage', date),
+        ('enacted', date),
+        ('vetoed', date),
+        ('latest_major_action_date', date),
+        ('latest_major_action', None),
+    )
+
+    __slots__ = tuple(name for name, keys, convert in FIELDS)
+
+
+class Position(Record):
+    "How one member voted on a roll call"
+
+    FIELDS = fields(
+        ('member_id', None),
+        ('name', None),
+        ('party', intern),
+        ('state', intern),
+        ('district', None),
+        ('vote_position', intern),
+        ('dw_nominate', decimal),
+    )
+
+    __slots__ = tuple(name for name, keys, convert in FIELDS)
+
+
+def positions(value):
+    return tuple(Position.convert(value))
+
+
+def bill_id(value):
+    return value.get('bill_id') if hasattr(value, 'get') else value
+
+
+class RollCall(Record):
+    "A roll-call vote, with member positions when the response includes them"
+
+    FIELDS = fields(
+        ('roll_call', number),
+        ('congress', number),
+        ('session', number),
+        ('chamber', intern),
+        ('date', date),
+        ('time', None),
+        ('question', None),
+        ('description', None),
+        ('vote_type', intern),
+        ('result', intern),
+        ('bill_id', ('bill',), bill_id),
+        ('positions', positions),
+    )
+
+    __slots__ = tuple(name for name, keys, convert in FIELDS)
+
+
+class Committee(Record):
+    "A committee, from committee lists and lookups"
+
+    FIELDS = fields(
+        ('id', None),
+        ('name', None),
+        ('chamber', intern),
+        ('url', None),
+        ('chair', None),
+        ('chair_id', None),
+        ('chair_party', intern),
+        ('chair_state', intern),
+        ('ranking_member_id', None),
+    )
+
+    __slots__ = tuple(name for name, keys, convert in FIELDS)
+
+
+class Statement(Record):
+    "A congressional statement"
+
+    FIELDS = fields(
+        ('url', None),
+        ('date', date),
+        ('title', None),
+        ('statement_type', intern),
+        ('member_id', None),
+        ('congress', number),
+        ('name', None),
+        ('chamber', intern),
+        ('state', intern),
+        ('party', intern),
+    )
+
+    __slots__ = tuple(name for name, keys, convert in FIELDS)
@@ -0,0 +1,246 @@
+"""
+A local full-text index for statements and lobbying filings
+
+The API's statement and lobbying searches cost a request per 20 results.
+``Index`` keeps an in-process inverted index instead: a positional
+postings list for every token, built from statements and filings as
+they're fetched, and updated as new ones arrive. Queries are answered
+without touching the API.
+
+::
+
+    >>> from congress import Congress
+    >>> from congress.search import Index
+    >>> congress = Congress(API_KEY)
+    >>> index = Index()
+    >>> index.add_statements(congress.statements.iter_recent(max_items=2000))
+    >>> index.add_filings(congress.lobbying.iter_recent(max_items=2000))
+    >>> index.search('"health care" medicare', since='2019-01-01', member_id='P000197')
+
+A query matches documents containing every term and every quoted phrase.
+Results are ranked by TF-IDF, newest first among equals.
+
+An index can be saved to JSON and loaded back with ``save`` and ``load``.
+"""
+import collections
+import datetime
+import json
+import math
+import os
+import re
+import threading
+
+from .utils import field
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+PHRASE = re.compile(r'"([^"]*)"')
+
+STATEMENT = 'statement'
+FILING = 'filing'
+
+
+def tokenize(text):
+    "Lowercased word tokens"
+    return TOKEN.findall(text.lower()) if text else []
+
+
+def isodate(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()[:10]
+    return value[:10] if value else None
+
+
+def serialize(value):
+    "JSON for records, lazy views and dates stored with documents"
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    if hasattr(value, 'materialize'):
+        return value.materialize()
+    return isodate(value)
+
+
+def parse_query(query):
+    "Split a query into loose terms and quoted phrases (lists of terms)"
+    phrases = [tokenize(p) for p in PHRASE.findall(query)]
+    terms = tokenize(PHRASE.sub(' ', query))
+    return terms, [p for p in phrases if p]
+
+
+class Document(object):
+    "An indexed item: its kind, date, member and the original record"
+
+    __slots__ = ('id', 'kind', 'date', 'member_id', 'text', 'record', 'length')
+
+    def __init__(self, id, kind, date, member_id, text, record):
+        self.id = id
+        self.kind = kind
+        self.date = date
+        self.member_id = member_id
+        self.text = text
+        self.record = record
+        self.length = 0
+
+    def __repr__(self):
+        return '<Document {0} {1}>'.format(self.kind, self.id)
+
+
+class Index(object):
+    """
+    A positional inverted index. Each document has an ``id``, searchable
+    ``text``, and optionally a ``date`` (YYYY-MM-DD), ``member_id`` and
+    ``kind`` to filter on. Adding a document with an existing id
+    replaces it. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        # term -> {document id -> [positions]}
+        self.postings = collections.defaultdict(dict)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, id):
+        return id in self.documents
+
+    def add(self, id, text, date=None, member_id=None, kind=None, record=None):
+        "Index one document"
+        document = Document(id, kind, isodate(date), member_id, text, record)
+        tokens = tokenize(text)
+        document.length = len(tokens)
+
+        positions = collections.defaultdict(list)
+        for position, token in enumerate(tokens):
+            positions[token].append(position)
+
+        with self.lock:
+            self.remove(id)
+            self.documents[id] = document
+            for token, found in positions.items():
+                self.postings[token][id] = found
+
+    def remove(self, id):
+        "Drop a document from the index, if it's there"
+        with self.lock:
+            document = self.documents.pop(id, None)
+            if document is None:
+                return
+            for token in set(tokenize(document.text)):
+                postings = self.postings.get(token)
+                if postings is not None:
+                    postings.pop(id, None)
+                    if not postings:
+                        del self.postings[token]
+
+    def add_statements(self, statements):
+        "Index statements, as dicts or records, keyed by URL"
+        count = 0
+        for statement in statements:
+            subjects = field(statement, 'subjects') or ()
+            text = ' '.join([field(statement, 'title') or ''] +
+                            [field(s, 'name') or '' for s in subjects if hasattr(s, 'get')])
+            self.add(field(statement, 'url'), text, field(statement, 'date'),
+                     field(statement, 'member_id'), STATEMENT, statement)
+            count += 1
+        return count
+
+    def add_filings(self, filings):
+        "Index lobbying representation filings, keyed by filing ID"
+        count = 0
+        for filing in filings:
+            client = field(filing, 'lobbying_client') or {}
+            registrant = field(filing, 'lobbying_registrant') or {}
+            issues = field(filing, 'specific_issues') or ()
+            text = ' '.join([
+                client.get('name') or '', client.get('general_description') or '',
+                registrant.get('name') or '', registrant.get('general_description') or '',
+            ] + [issue for issue in issues if issue])
+            self.add(u'filing:{0}'.format(field(filing, 'id')), text,
+                     field(filing, 'signed_date') or field(filing, 'effective_date'),
+                     None, FILING, filing)
+            count += 1
+        return count
+
+    def search(self, query, since=None, until=None, member_id=None, kind=None, limit=20):
+        """
+        Return up to ``limit`` matching documents, best first. ``since`` and
+        ``until`` bound the date, inclusively; ``member_id`` and ``kind``
+        ('statement' or 'filing') must match exactly if given.
+        """
+        terms, phrases = parse_query(query)
+        required = set(terms)
+        for phrase in phrases:
+            required.update(phrase)
+        if not required:
+            return []
+
+        since, until = isodate(since), isodate(until)
+
+        with self.lock:
+            postings = [self.postings.get(term) for term in required]
+            if not all(postings):
+                return []
+
+            # intersect, starting from the rarest term
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for p in postings[1:]:
+                candidates.intersection_update(p)
+                if not candidates:
+                    return []
+
+            total = len(self.documents)
+            idf = dict((term, math.log(float(total) / len(self.postings[term])) + 1)
+                       for term in required)
+
+            results = []
+            for id in candidates:
+                document = self.documents[id]
+                if kind is not None and document.kind != kind:
+                    continue
+                if member_id is not None and document.member_id != member_id:
+                    continue
+                if since is not None and (document.date is None or document.date < since):
+                    continue
+                if until is not None and (document.date is None or document.date > until):
+                    continue
+                if not all(self.contains_phrase(id, phrase) for phrase in phrases):
+                    continue
+
+                score = sum(len(self.postings[term][id]) * idf[term] for term in required)
+                score /= math.sqrt(document.length or 1)
+                results.append((score, document.date or '', document))
+
+        results.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        return [document for score, date, document in results[:limit]]
+
+    def contains_phrase(self, id, phrase):
+        "Whether a document has the phrase's terms at consecutive positions"
+        starts = set(self.postings[phrase[0]][id])
+        for offset, term in enumerate(phrase[1:], 1):
+            starts.intersection_update(p - offset for p in self.postings[term][id])
+            if not starts:
+                return False
+        return True
+
+    def save(self, filename):
+        "Write the indexed documents to a JSON file"
+        with self.lock:
+            documents = [{'id': d.id, 'kind': d.kind, 'date': d.date, 'member_id': d.member_id,
+                          'text': d.text, 'record': d.record}
+                         for d in self.documents.values()]
+
+        partial = filename + '.partial'
+        with open(partial, 'w') as f:
+            json.dump(documents, f, default=serialize)
+        os.rename(partial, filename)
+
+    @classmethod
+    def load(cls, filename):
+        "Rebuild an index saved with ``save``"
+        index = cls()
+        with open(filename) as f:
+            for document in json.load(f):
+                index.add(**document)
+        return index
@@ -1,5 +1,6 @@
 from .client import Client
-from .utils import CURRENT_CONGRESS, check_chamber, get_offset
+from .records import Statement
+from .utils import CURRENT_CONGRESS, check_chamber, get_offset, with_offset
 
 
 class StatementsClient(Client):
@@ -17,9 +18,8 @@ class StatementsClient(Client):
         """
         path = "statements/latest.json"
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Statement))
 
     def date(self, date, **kwargs):
         """
@@ -34,9 +34,8 @@ class StatementsClient(Client):
         path = "statements/date/{date}.json".format(
             date=date)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Statement))
 
     def search(self, query, **kwargs):
         """
@@ -51,9 +50,8 @@ class StatementsClient(Client):
         path = "statements/search.json?query={query}".format(
             query=query)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Statement))
 
     def subjects(self):
         """
@@ -88,9 +86,8 @@ class StatementsClient(Client):
         path = "statements/subject/{subject}.json".format(
             subject=subject)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Statement))
 
     # need to define a function in util to validate member id
 
@@ -107,9 +104,8 @@ class StatementsClient(Client):
         path = "members/{member}/statements/{congress}.json".format(
             member=member, congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Statement))
 
     # need to define a function in util to validate bill id
 
@@ -127,7 +123,39 @@ class StatementsClient(Client):
         path = "{congress}/bills/{bill}/statements.json".format(
             bill=bill, congress=congress)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
-        return self.fetch(path)
+            path = with_offset(path, get_offset(kwargs['page']))
+        return self.fetch(path, self.typed(Statement))
+
+    # lazy iterators over every page
+
+    def iter_recent(self, max_items=None, prefetch=0):
+        "#1 Iterate over recent statements, fetching 20 at a time"
+        path = "statements/latest.json"
+        return self.paginate(path, self.typed(Statement, lambda r: r['results']), max_items, prefetch)
 
+    def iter_date(self, date, max_items=None, prefetch=0):
+        "#2 Iterate over statements published on a date"
+        path = "statements/date/{date}.json".format(date=date)
+        return self.paginate(path, self.typed(Statement, lambda r: r['results']), max_items, prefetch)
+
+    def iter_search(self, query, max_items=None, prefetch=0):
+        "#3 Iterate over statements matching a search term"
+        path = "statements/search.json?query={query}".format(query=query)
+        return self.paginate(path, self.typed(Statement, lambda r: r['results']), max_items, prefetch)
+
+    def iter_subject(self, subject, max_items=None, prefetch=0):
+        "#5 Iterate over statements for a subject"
+        path = "statements/subject/{subject}.json".format(subject=subject)
+        return self.paginate(path, self.typed(Statement, lambda r: r['results']), max_items, prefetch)
+
+    def iter_member(self, member, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#6 Iterate over statements by a member"
+        path = "members/{member}/statements/{congress}.json".format(
+            member=member, congress=congress)
+        return self.paginate(path, self.typed(Statement, lambda r: r['results']), max_items, prefetch)
+
+    def iter_bill(self, bill, congress=CURRENT_CONGRESS, max_items=None, prefetch=0):
+        "#7 Iterate over statements that mention a bill"
+        path = "{congress}/bills/{bill}/statements.json".format(
+            bill=bill, congress=congress)
+        return self.paginate(path, self.typed(Statement, lambda r: r['results']), max_items, prefetch)
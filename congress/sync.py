@@ -0,0 +1,184 @@
+"""
+Incremental sync of the recent-items feeds
+
+The recent bills, votes and statements feeds list the newest items first.
+A ``Sync`` remembers, per feed, a watermark: the newest date (or date and
+time) it has seen, and which items carried it. Each run pages through a
+feed only until it reaches items at or below the watermark (for bills,
+which can change without moving, a page past it), and returns just the
+items that are new or changed since the last run, so a daily sync
+usually costs a page or two per feed::
+
+    >>> from congress import Congress
+    >>> from congress.sync import Sync
+    >>> sync = Sync(Congress(API_KEY), 'sync.json')
+    >>> for bill in sync.bills('both'):
+    ...     update(bill)
+    >>> new_votes = sync.votes('house')
+    >>> new_statements = sync.statements()
+
+Watermarks are saved to ``filename`` as JSON after each feed is synced.
+"""
+import datetime
+import json
+import os
+import threading
+
+from .utils import CURRENT_CONGRESS, PAGE_SIZE, field
+
+
+def text(value):
+    "Dates and strings alike, as comparable text"
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return u'' if value is None else u'{0}'.format(value)
+
+
+class Feed(object):
+    """
+    How to sync one kind of feed: ``mark`` returns an item's watermark
+    value, and ``key`` its identity. Both must be JSON-serializable.
+
+    An item in some feeds can change without its mark moving. For those,
+    ``version`` returns what identifies a version of an item, and each
+    sync reads on past the watermark through ``overlap`` more items,
+    returning any whose version it hasn't seen.
+    """
+
+    def __init__(self, mark, key, version=None, overlap=0):
+        self.mark = mark
+        self.key = key
+        self.version = version
+        self.overlap = overlap
+
+
+# bill fields that change as a bill moves, with or without a new major action
+BILL_VERSION_FIELDS = ('latest_major_action_date', 'latest_major_action', 'cosponsors', 'active',
+                       'house_passage', 'senate_passage', 'enacted', 'vetoed')
+
+# the updated feed is ordered by major action date, and has no update
+# timestamp, so bills updated since are looked for in a page past the mark
+BILLS = Feed(
+    mark=lambda bill: text(field(bill, 'latest_major_action_date')),
+    key=lambda bill: field(bill, 'bill_id'),
+    version=lambda bill: u'|'.join(text(field(bill, name)) for name in BILL_VERSION_FIELDS),
+    overlap=PAGE_SIZE,
+)
+
+VOTES = Feed(
+    mark=lambda vote: u'{0} {1}'.format(text(field(vote, 'date')), text(field(vote, 'time'))),
+    key=lambda vote: u'{0}-{1}-{2}-{3}'.format(
+        field(vote, 'chamber'), field(vote, 'congress'), field(vote, 'session'), field(vote, 'roll_call')),
+)
+
+STATEMENTS = Feed(
+    mark=lambda statement: text(field(statement, 'date')),
+    key=lambda statement: field(statement, 'url'),
+)
+
+
+class Sync(object):
+    """
+    Watermark-based sync over a ``Congress`` client's feeds.
+
+    A feed with no watermark yet starts with its newest ``backfill`` items.
+    """
+
+    def __init__(self, congress, filename='.sync.json', backfill=PAGE_SIZE):
+        self.congress = congress
+        self.filename = filename
+        self.backfill = backfill
+        self.lock = threading.Lock()
+        self.state = self.read()
+
+    def read(self):
+        if not os.path.exists(self.filename):
+            return {}
+        with open(self.filename) as f:
+            return json.load(f)
+
+    def save(self):
+        "Write watermarks, atomically"
+        partial = self.filename + '.partial'
+        with open(partial, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.rename(partial, self.filename)
+
+    def watermark(self, name):
+        "The newest mark seen on a feed, or None"
+        return self.state.get(name, {}).get('watermark')
+
+    def reset(self, name=None):
+        "Forget a feed's watermark, or every feed's"
+        with self.lock:
+            if name is None:
+                self.state.clear()
+            else:
+                self.state.pop(name, None)
+            self.save()
+
+    def sync(self, name, items, feed):
+        """
+        Sync one feed: consume ``items``, a newest-first iterator such as
+        an ``iter_*`` paginator, up to the watermark stored under ``name``,
+        and return the items that are new or changed since the last sync.
+        """
+        with self.lock:
+            state = self.state.get(name, {})
+            watermark = state.get('watermark')
+            seen = set(state.get('seen', ()))
+            versions = state.get('versions', {})
+
+            found = []
+            read = {}
+            past = 0
+            for item in items:
+                mark = feed.mark(item)
+                if feed.version is not None:
+                    if watermark is not None and mark < watermark:
+                        past += 1
+                        if past > feed.overlap:
+                            break
+
+                    key, version = feed.key(item), feed.version(item)
+                    read[key] = version
+                    if watermark is not None and versions.get(key) == version:
+                        continue
+
+                elif watermark is not None:
+                    if mark < watermark:
+                        break
+                    if mark == watermark and feed.key(item) in seen:
+                        continue
+
+                found.append(item)
+                if watermark is None and len(found) >= self.backfill:
+                    break
+
+            if found:
+                # items changed under the mark leave it where it is
+                newest = max(feed.mark(item) for item in found)
+                if watermark is None or newest > watermark:
+                    watermark, seen = newest, set()
+                seen.update(feed.key(item) for item in found if feed.mark(item) == watermark)
+
+                self.state[name] = {'watermark': watermark, 'seen': sorted(seen)}
+                if feed.version is not None:
+                    # only what this run read, so the state stays small
+                    self.state[name]['versions'] = read
+                self.save()
+
+            return found
+
+    def bills(self, chamber='both', congress=CURRENT_CONGRESS):
+        "Bills with major actions or other updates since the last sync, newest first"
+        return self.sync('bills/{0}/{1}'.format(congress, chamber),
+                         self.congress.bills.iter_recent(chamber, congress, 'updated'), BILLS)
+
+    def votes(self, chamber='both'):
+        "Roll-call votes since the last sync, newest first"
+        return self.sync('votes/{0}'.format(chamber), self.congress.votes.iter_recent(chamber), VOTES)
+
+    def statements(self):
+        "Statements published since the last sync, newest first"
+        return self.sync('statements', self.congress.statements.iter_recent(), STATEMENTS)
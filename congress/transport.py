@@ -0,0 +1,97 @@
+"""
+HTTP transports that can be shared between clients and threads
+"""
+import threading
+
+import six
+from six.moves import queue
+from six.moves.urllib.parse import urlsplit
+
+DEFAULT_POOL_SIZE = 10
+
+
+class PooledHttp(object):
+    """
+    A thread-safe, drop-in replacement for ``httplib2.Http``.
+
+    ``httplib2.Http`` keeps its connections on the instance, so sharing one
+    between threads lets requests interleave on the same socket. PooledHttp
+    keeps a pool of ``httplib2.Http`` objects per host instead. Each request
+    checks one out, so a connection is only ever used by one thread at a
+    time and is kept alive for the next request once it's returned.
+
+    ``pool_size`` caps concurrent connections to any one host; further
+    requests block until a connection is free.
+
+    The cache argument works the way it does for ``httplib2.Http``: a
+    directory name for a ``FileCache``, or any object with the same
+    interface. It is shared by every pooled connection.
+
+    httplib2 itself is only imported once the first request goes out.
+    """
+
+    def __init__(self, cache=None, pool_size=DEFAULT_POOL_SIZE, timeout=None, **kwargs):
+        self._cache = cache
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.kwargs = kwargs
+
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        "The shared HTTP cache; a directory name becomes a FileCache on first use"
+        if isinstance(self._cache, six.string_types):
+            import httplib2
+
+            with self._lock:
+                if isinstance(self._cache, six.string_types):
+                    self._cache = httplib2.FileCache(self._cache)
+        return self._cache
+
+    def pool(self, host):
+        "Return the (idle connections, slots) pair for a host, creating it if needed"
+        with self._lock:
+            if host not in self._pools:
+                self._pools[host] = (queue.LifoQueue(), threading.BoundedSemaphore(self.pool_size))
+            return self._pools[host]
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        "Same as ``httplib2.Http.request``, but safe to call from any thread"
+        idle, slots = self.pool(urlsplit(uri).netloc)
+
+        with slots:
+            try:
+                http = idle.get_nowait()
+            except queue.Empty:
+                import httplib2
+                http = httplib2.Http(self.cache, timeout=self.timeout, **self.kwargs)
+
+            try:
+                return http.request(uri, method, body, headers, **kwargs)
+            finally:
+                idle.put(http)
+
+    def pooled(self):
+        "Yield every idle pooled httplib2.Http instance"
+        with self._lock:
+            pools = list(self._pools.values())
+
+        for idle, slots in pools:
+            for http in list(idle.queue):
+                yield http
+
+    @property
+    def connections(self):
+        "Open connections across the pool, keyed like ``httplib2.Http.connections``"
+        connections = {}
+        for i, http in enumerate(self.pooled()):
+            for key, conn in http.connections.items():
+                connections[(i, key)] = conn
+        return connections
+
+    def close(self):
+        "Close every idle connection"
+        for http in self.pooled():
+            http.close()
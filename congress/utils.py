@@ -2,9 +2,18 @@
 Utility functions and error classes used throughout client classes
 """
 import datetime
+import json
 import math
+import sys
 import six
 
+# resolved on the first call to loads, to keep imports fast
+UNRESOLVED = object()
+orjson = UNRESOLVED
+
+# every paginated endpoint returns results in pages of this size
+PAGE_SIZE = 20
+
 
 class CongressError(Exception):
     """
@@ -23,6 +32,12 @@ class NotFound(CongressError):
     """
 
 
+class QuotaExceeded(CongressError):
+    """
+    Exception for requests over the API key's daily quota
+    """
+
+
 def check_chamber(chamber):
     "Validate that chamber is house or senate or both or joint"
     if str(chamber).lower() not in ('house', 'senate', 'both', 'joint'):
@@ -64,21 +79,142 @@ def get_congress(year):
 def get_offset(page):
     if page < 1:
         raise CongressError('Page number must be at least 1.')
-    return (page - 1) * 20
-    
+    return (page - 1) * PAGE_SIZE
+
+
+def with_offset(path, offset):
+    "Add an offset querystring parameter to an API path"
+    separator = '&' if '?' in path else '?'
+    return "{path}{separator}offset={offset}".format(
+        path=path, separator=separator, offset=offset)
+
+
+def field(record, name):
+    "Read a field from a decoded response, a lazy view or a record"
+    if hasattr(record, 'get'):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+# parsed dates, by string; cleared whenever it fills up
+DATE_MEMO = {}
+DATE_MEMO_SIZE = 10000
+
+# the general-purpose parser, resolved on first use
+fallback_parser = None
+
+
+def get_fallback_parser():
+    "dateutil.parser.parse if available, or strptime for YYYY-MM-DD"
+    global fallback_parser
+    if fallback_parser is None:
+        try:
+            from dateutil.parser import parse
+        except ImportError:
+            parse = lambda d: datetime.datetime.strptime(d, "%Y-%m-%d")
+        fallback_parser = parse
+    return fallback_parser
+
+
+def parse_iso(s):
+    """
+    Parse an ISO date or timestamp quickly, returning a datetime,
+    or None if s isn't in ISO format
+    """
+    if len(s) == 10 and s[4] == '-' and s[7] == '-':
+        try:
+            return datetime.datetime(int(s[:4]), int(s[5:7]), int(s[8:]))
+        except ValueError:
+            return None
+
+    if hasattr(datetime.datetime, 'fromisoformat') and s[:4].isdigit():
+        try:
+            return datetime.datetime.fromisoformat(s)
+        except ValueError:
+            return None
+
+    return None
+
 
 def parse_date(s):
     """
     Parse a date using dateutil.parser.parse if available,
-    falling back to datetime.datetime.strptime if not
+    falling back to datetime.datetime.strptime if not.
+
+    ISO dates and timestamps take a fast path that skips the general
+    parser, and parsed strings are memoized, since the same few dates
+    repeat across thousands of votes and statements.
     """
     if isinstance(s, (datetime.datetime, datetime.date)):
         return s
+
     try:
-        from dateutil.parser import parse
-    except ImportError:
-        parse = lambda d: datetime.datetime.strptime(d, "%Y-%m-%d")
-    return parse(s)
+        return DATE_MEMO[s]
+    except KeyError:
+        pass
+
+    value = parse_iso(s)
+    if value is None:
+        value = get_fallback_parser()(s)
+
+    if len(DATE_MEMO) >= DATE_MEMO_SIZE:
+        DATE_MEMO.clear()
+    DATE_MEMO[s] = value
+    return value
+
+
+def naive_utc(value):
+    "A naive datetime in UTC, for NumPy, which has no time zones; dates are returned as is"
+    if isinstance(value, datetime.datetime) and value.utcoffset() is not None:
+        value = (value - value.utcoffset()).replace(tzinfo=None)
+    return value
+
+
+def parse_dates(values, array=False):
+    """
+    Parse a column of dates at once, parsing each distinct string once.
+
+    With ``array``, return a NumPy ``datetime64`` array instead of a list.
+    A column of ISO strings is then converted by NumPy in one pass; empty
+    values become NaT.
+    """
+    values = list(values)
+    if array:
+        import numpy as np
+
+        try:
+            return np.array([v or 'NaT' for v in values], dtype='datetime64[s]')
+        except ValueError:
+            # not all ISO; parse, then convert
+            parsed = [naive_utc(v) if v is not None else 'NaT' for v in parse_dates(values)]
+            return np.array(parsed, dtype='datetime64[s]')
+
+    parsed = dict((v, parse_date(v)) for v in set(values) if v)
+    return [parsed.get(v) if v else None for v in values]
+
+
+def loads(content):
+    """
+    Decode a JSON response straight from raw bytes.
+
+    Uses orjson when it's installed, and the standard library otherwise.
+    Either way the body is parsed as-is, without first copying it into
+    a normalized text string.
+    """
+    global orjson
+    if orjson is UNRESOLVED:
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+
+    if orjson is not None:
+        return orjson.loads(content)
+
+    if isinstance(content, six.binary_type) and six.PY3 and sys.version_info < (3, 6):
+        # json only takes bytes from 3.6 on
+        content = content.decode('utf-8')
+    return json.loads(content)
 
 
 def u(text, encoding='utf-8'):
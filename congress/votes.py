@@ -1,7 +1,65 @@
 import datetime
+import functools
 
 from .client import Client
-from .utils import CURRENT_CONGRESS, check_chamber, parse_date, get_offset, get_congress
+from .records import RollCall
+from .utils import CURRENT_CONGRESS, check_chamber, field, parse_date, get_offset, with_offset, get_congress
+
+ROLLCALL_PATH = "{congress}/{chamber}/sessions/{session}/votes/{rollcall_num}.json"
+
+RANGE_PATH = "{chamber}/votes/{start:%Y-%m-%d}/{end:%Y-%m-%d}.json"
+
+# the longest span, in days, the API takes in one date-range request
+MAX_RANGE_DAYS = 30
+
+
+def windows(start, end, days=MAX_RANGE_DAYS):
+    "Split the span from start to end, inclusive, into windows of at most ``days`` days"
+    step = datetime.timedelta(days=days - 1)
+    while start <= end:
+        yield start, min(start + step, end)
+        start = start + step + datetime.timedelta(days=1)
+
+
+def vote_order(vote):
+    "Sort key for votes, by date, then time, then roll call"
+    date = field(vote, 'date')
+    if isinstance(date, (datetime.date, datetime.datetime)):
+        date = date.isoformat()
+    return (date or '', field(vote, 'time') or '', int(field(vote, 'roll_call') or 0))
+
+
+def vote_key(vote):
+    return (field(vote, 'chamber'), field(vote, 'congress'), field(vote, 'session'), field(vote, 'roll_call'))
+
+
+def merge_votes(results, start=None, end=None):
+    """
+    Merge by_range results for consecutive windows: lists of records, or
+    responses whose ``votes`` are combined. Votes are deduplicated and
+    sorted newest first, as the API sorts them. A merged response covers
+    the whole span, so its ``start_date`` and ``end_date`` are set to
+    ``start`` and ``end`` when they're given.
+    """
+    if results and hasattr(results[0], 'get'):
+        votes = [vote for result in results for vote in result['votes']]
+    else:
+        votes = [vote for result in results for vote in result]
+
+    unique = {}
+    for vote in votes:
+        unique.setdefault(vote_key(vote), vote)
+    votes = sorted(unique.values(), key=vote_order, reverse=True)
+
+    if results and hasattr(results[0], 'get'):
+        merged = dict(results[0])
+        merged.update(votes=votes, num_results=len(votes))
+        if start is not None:
+            merged['start_date'] = start.strftime('%Y-%m-%d')
+        if end is not None:
+            merged['end_date'] = end.strftime('%Y-%m-%d')
+        return merged
+    return votes
 
 
 class VotesClient(Client):
@@ -28,12 +86,15 @@ class VotesClient(Client):
 
         path = "{chamber}/votes/{year}/{month}.json".format(
             chamber=chamber, year=year, month=month)
-        return self.fetch(path, parse=lambda r: r['results'])
+        return self.fetch(path, parse=self.typed(RollCall, lambda r: r['results'], ('votes',)))
 
     def by_range(self, chamber, start, end):
         """
-        #4 Return votes cast in a chamber between two dates,
-        up to one month apart.
+        #4 Return votes cast in a chamber between two dates.
+
+        The API takes spans of up to a month. A longer span is split into
+        windows that are fetched concurrently, and their votes merged and
+        deduplicated. Either way, votes come back newest first.
 
         chamber (house or senate)
         start - YYYY-MM-DD format
@@ -45,9 +106,13 @@ class VotesClient(Client):
         if start > end:
             start, end = end, start
 
-        path = "{chamber}/votes/{start:%Y-%m-%d}/{end:%Y-%m-%d}.json".format(
-            chamber=chamber, start=start, end=end)
-        return self.fetch(path, parse=lambda r: r['results'])
+        parse = self.typed(RollCall, lambda r: r['results'], ('votes',))
+        paths = [RANGE_PATH.format(chamber=chamber, start=first, end=last)
+                 for first, last in windows(start, end)]
+
+        # one window goes through the same merge, so both come back alike
+        merge = functools.partial(merge_votes, start=start, end=end)
+        return self.fetch_combined([(path, parse) for path in paths], merge)
 
     def by_date(self, chamber, date):
         "#4 Return votes cast in a chamber on a single day"
@@ -72,11 +137,27 @@ class VotesClient(Client):
         """
         check_chamber(chamber)
 
-        path = ("{congress}/{chamber}/sessions/{session}"
-                "/votes/{rollcall_num}.json")
-        path = path.format(congress=congress, chamber=chamber,
-                           session=session, rollcall_num=rollcall_num)
-        return self.fetch(path, parse=lambda r: r['results'])
+        path = ROLLCALL_PATH.format(congress=congress, chamber=chamber,
+                                    session=session, rollcall_num=rollcall_num)
+        return self.lookup(path, self.typed(RollCall, lambda r: r['results'], ('votes', 'vote')))
+
+    def get_many(self, chamber, rollcalls, **kwargs):
+        """
+        #2 Fetch many roll-call votes concurrently, through ``fetch_many``
+
+        rollcalls - (congress, session, roll-call-number) triples
+
+        Results come back in order, with a NotFound or CongressError in
+        place of any vote that couldn't be fetched. Extra keyword arguments
+        go to ``fetch_many``.
+        """
+        check_chamber(chamber)
+
+        parse = self.typed(RollCall, lambda r: r['results'], ('votes', 'vote'))
+        requests = [(ROLLCALL_PATH.format(congress=congress, chamber=chamber,
+                                          session=session, rollcall_num=rollcall_num), parse)
+                    for congress, session, rollcall_num in rollcalls]
+        return self.fetch_many(requests, **kwargs)
 
     # votes by type
     def by_type(self, chamber, type, congress=CURRENT_CONGRESS):
@@ -132,10 +213,16 @@ class VotesClient(Client):
         path = "{chamber}/votes/recent.json".format(
             chamber=chamber)
         if 'page' in kwargs:
-            offset = get_offset(kwargs.get('page'))
-            path = path.join("?offset={offset}".format(offset))
+            path = with_offset(path, get_offset(kwargs['page']))
         return self.fetch(path)
 
+    def iter_recent(self, chamber, max_items=None, prefetch=0):
+        "#1 Iterate over recent votes, fetching 20 at a time"
+        check_chamber(chamber)
+        path = "{chamber}/votes/recent.json".format(chamber=chamber)
+        return self.paginate(path, self.typed(RollCall, lambda r: r['results']['votes']),
+                             max_items, prefetch)
+
     def nominations(self, congress=CURRENT_CONGRESS):
         """
         #5 GET SENATE NOMINATION VOTES
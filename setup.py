@@ -17,7 +17,11 @@ setup(
     author = "WebCandy, LLC",
     author_email = "webcandyllc@gmail.com",
     url = 'https://github.com/WebCandyLLC/propublica-congress',
-    install_requires = ['httplib2', 'six'],
+    install_requires = ['httplib2', 'six', 'futures; python_version < "3"'],
+    extras_require = {
+        'fast': ['orjson'],
+        'matrix': ['numpy'],
+    },
     classifiers = [
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
@@ -4,6 +4,11 @@ import datetime
 import json
 import logging
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import time
 import urllib
 import unittest
@@ -11,9 +16,9 @@ import unittest
 import httplib2
 
 from congress import Congress
-from congress.utils import CongressError, NotFound, get_congress, u
+from congress.utils import CongressError, NotFound, get_congress, parse_date, parse_dates, u
 
-API_KEY = os.environ['PROPUBLICA_API_KEY']
+from test_support import API_KEY, CassetteCase, PaginationCase, RangeCase, StubTest
 LOG_LEVEL = getattr(logging, os.environ.get('CONGRESS_LOG_LEVEL', 'INFO').upper(), logging.INFO)
 
 logging.basicConfig(level=LOG_LEVEL)
@@ -243,6 +248,1184 @@ class UtilTest(unittest.TestCase):
         self.assertEqual(get_congress(2009), 111)
         self.assertEqual(get_congress(2010), 111)
 
+    def test_parse_date(self):
+        self.assertEqual(parse_date('2019-01-09'), datetime.datetime(2019, 1, 9))
+        self.assertEqual(parse_date('2019-01-09 10:20:00'), datetime.datetime(2019, 1, 9, 10, 20))
+        self.assertEqual(parse_date('January 9, 2019'), datetime.datetime(2019, 1, 9))
+        self.assertIs(parse_date('2019-01-09'), parse_date('2019-01-09'))
+        with self.assertRaises(ValueError):
+            parse_date('2019-02-30')
+
+    def test_parse_dates(self):
+        self.assertEqual(parse_dates(['2019-01-09', '', '2019-01-09']),
+                         [datetime.datetime(2019, 1, 9), None, datetime.datetime(2019, 1, 9)])
+        try:
+            import numpy
+        except ImportError:
+            return
+        dates = parse_dates(['2019-01-09', None, 'January 10, 2019'], array=True)
+        self.assertEqual(dates.dtype, numpy.dtype('datetime64[s]'))
+        self.assertEqual(str(dates[2])[:10], '2019-01-10')
+        self.assertTrue(numpy.isnat(dates[1]))
+
+        # dates, date-only strings and other formats mixed in one column
+        dates = parse_dates([datetime.date(2019, 1, 8), '2019-01-09', 'January 10, 2019', ''], array=True)
+        self.assertEqual([str(d)[:10] for d in dates[:3]], ['2019-01-08', '2019-01-09', '2019-01-10'])
+        self.assertTrue(numpy.isnat(dates[3]))
+
+class TransportTest(StubTest):
+
+    def test_pooled_http_threads(self):
+        from congress.transport import PooledHttp
+
+        for i in range(20):
+            self.respond('members/M{0:06d}.json'.format(i), [{'id': i}])
+
+        http = PooledHttp(pool_size=4)
+        congress = Congress(API_KEY, http=http)
+        congress.members.BASE_URI = self.base_uri
+        self.assertIs(congress.members.http, http)
+
+        results = {}
+
+        def worker(n):
+            for i in range(n, 20, 5):
+                results[i] = congress.members.get('M{0:06d}'.format(i))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, dict((i, {'id': i}) for i in range(20)))
+        self.assertLessEqual(len(list(http.pooled())), 4)
+        http.close()
+
+
+class FetchManyTest(StubTest):
+
+    def test_fetch_many_ordered(self):
+        for i in range(1, 30):
+            self.respond('115/bills/hr{0}.json'.format(i), [{'number': i}])
+
+        congress = Congress(API_KEY, cache=None)
+        congress.BASE_URI = self.base_uri
+
+        paths = ['115/bills/hr{0}.json'.format(i) for i in range(1, 30)]
+        paths.insert(5, '115/bills/hr0.json')
+        paths.append(('115/bills/hr3.json', lambda r: r['results']))
+
+        results = congress.fetch_many(paths, max_workers=4)
+
+        self.assertEqual(len(results), 31)
+        self.assertIsInstance(results[5], NotFound)
+        self.assertEqual(results[0], {'number': 1})
+        self.assertEqual(results[29], {'number': 29})
+        self.assertEqual(results[30], [{'number': 3}])
+
+
+class PaginationTest(PaginationCase):
+
+    def test_with_offset(self):
+        from congress.utils import with_offset
+        self.assertEqual(with_offset('statements/latest.json', 20), 'statements/latest.json?offset=20')
+        self.assertEqual(with_offset('lobbying/search.json?query=oil', 40), 'lobbying/search.json?query=oil&offset=40')
+
+    def test_page_kwarg(self):
+        self.respond('statements/latest.json?offset=40', [{'n': 40}])
+        congress = Congress(API_KEY, cache=None)
+        congress.statements.BASE_URI = self.base_uri
+        self.assertEqual(congress.statements.recent(page=3), {'n': 40})
+
+    def test_iter_stops_at_end(self):
+        self.respond_pages('statements/latest.json', 45)
+        congress = Congress(API_KEY, cache=None)
+        congress.statements.BASE_URI = self.base_uri
+
+        statements = list(congress.statements.iter_recent())
+        self.assertEqual([s['n'] for s in statements], list(range(45)))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_iter_max_items(self):
+        self.respond_pages('statements/latest.json', 100)
+        congress = Congress(API_KEY, cache=None)
+        congress.statements.BASE_URI = self.base_uri
+
+        statements = list(congress.statements.iter_recent(max_items=25))
+        self.assertEqual(len(statements), 25)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_prefetch(self):
+        for offset in range(0, 200, 20):
+            page = [{'n': n} for n in range(offset, min(offset + 20, 95))]
+            self.respond('lobbying/latest.json?offset={0}'.format(offset), [{'lobbying_representations': page}])
+
+        congress = Congress(API_KEY, cache=None)
+        congress.lobbying.BASE_URI = self.base_uri
+
+        filings = list(congress.lobbying.iter_recent(prefetch=3))
+        self.assertEqual([f['n'] for f in filings], list(range(95)))
+
+        # the window never runs more than prefetch pages past the end
+        offsets = sorted(int(p.rsplit('=', 1)[1]) for p in self.server.requests)
+        self.assertEqual(offsets[:5], [0, 20, 40, 60, 80])
+        self.assertLessEqual(max(offsets), 80 + 3 * 20)
+
+        filings = list(congress.lobbying.iter_recent(max_items=30, prefetch=3))
+        self.assertEqual(len(filings), 30)
+
+
+class MemoryCacheTest(StubTest):
+
+    def test_normalize(self):
+        from congress.cache import normalize
+        self.assertEqual(normalize('/members/P000197.json'), 'members/P000197.json')
+        self.assertEqual(normalize('lobbying/search.json?query=oil&offset=0'), 'lobbying/search.json?query=oil')
+        self.assertEqual(normalize('a.json?offset=20&query=x'), 'a.json?offset=20&query=x')
+        self.assertEqual(normalize('a.json?query=x&offset=20'), 'a.json?offset=20&query=x')
+
+    def test_ttl_policies(self):
+        from congress.cache import MemoryCache, HOUR
+        cache = MemoryCache()
+        self.assertGreaterEqual(cache.ttl('members/P000197.json'), HOUR)
+        self.assertGreaterEqual(cache.ttl('116/house/committees.json'), HOUR)
+        self.assertLess(cache.ttl('house/votes/recent.json'), 60)
+        self.assertLess(cache.ttl('116/senate/floor_updates.json'), 60)
+
+    def test_cached_fetch(self):
+        from congress.cache import MemoryCache
+
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        congress = Congress(API_KEY, cache=MemoryCache())
+        congress.members.BASE_URI = congress.BASE_URI = self.base_uri
+
+        self.assertEqual(congress.members.get('P000197'), {'id': 'P000197'})
+        self.assertEqual(congress.fetch('/members/P000197.json'), {'id': 'P000197'})
+        self.assertEqual(len(self.server.requests), 1)
+
+        congress.cache.invalidate('members/')
+        congress.members.get('P000197')
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_expiry_and_eviction(self):
+        from congress.cache import MemoryCache
+
+        cache = MemoryCache(maxsize=2, policies=[('recent', 0)])
+        cache.set('house/votes/recent.json', {})
+        self.assertIsNone(cache.get('house/votes/recent.json'))
+
+        cache.set('a.json', 1)
+        cache.set('b.json', 2)
+        cache.get('a.json')
+        cache.set('c.json', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b.json'))
+        self.assertEqual(cache.get('a.json').data, 1)
+
+
+class SQLiteCacheTest(StubTest):
+
+    def setUp(self):
+        super(SQLiteCacheTest, self).setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp, 'cache.sqlite')
+
+    def tearDown(self):
+        super(SQLiteCacheTest, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def test_persistent_fetch(self):
+        from congress.cache import SQLiteCache
+
+        self.respond('116/house/committees.json', [{'committees': []}])
+        congress = Congress(API_KEY, cache=SQLiteCache(self.filename))
+        congress.committees.BASE_URI = self.base_uri
+        congress.committees.filter('house', 116)
+
+        # a new cache on the same file sees the stored response
+        congress = Congress(API_KEY, cache=SQLiteCache(self.filename))
+        congress.committees.BASE_URI = self.base_uri
+        self.assertEqual(congress.committees.filter('house', 116), {'committees': []})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_client_decoder(self):
+        from congress import lazy
+        from congress.cache import SQLiteCache
+
+        self.respond('116/house/committees.json', [{'committees': []}])
+        congress = Congress(API_KEY, cache=SQLiteCache(self.filename), decoder=lazy.view)
+        congress.committees.BASE_URI = self.base_uri
+        self.assertIsInstance(congress.committees.filter('house', 116), lazy.LazyObject)
+
+        # stored bodies are decoded by the client reading them
+        congress = Congress(API_KEY, cache=SQLiteCache(self.filename), decoder=lazy.view)
+        congress.committees.BASE_URI = self.base_uri
+        self.assertIsInstance(congress.committees.filter('house', 116), lazy.LazyObject)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_prefix_invalidation(self):
+        from congress.cache import SQLiteCache
+
+        cache = SQLiteCache(self.filename)
+        for key in ('116/house/committees.json', '116/house/members.json',
+                    '116/housing.json', '116/senate/members.json'):
+            cache.set(key, {'key': key})
+
+        cache.invalidate('116/house/')
+        self.assertIsNone(cache.get('116/house/members.json'))
+        self.assertEqual(cache.get('116/housing.json').data, {'key': '116/housing.json'})
+        self.assertEqual(len(cache), 2)
+
+    def test_size_eviction(self):
+        from congress.cache import SQLiteCache
+
+        cache = SQLiteCache(self.filename, max_size=2000, compression=0)
+        for i in range(10):
+            cache.set('{0}.json'.format(i), {'padding': 'x' * 500})
+
+        self.assertLessEqual(cache.total_size(), 2000)
+        self.assertIsNone(cache.get('0.json'))
+        self.assertIsNotNone(cache.get('9.json'))
+
+    def test_size_counts_replaced_rows_once(self):
+        from congress.cache import SQLiteCache
+
+        cache = SQLiteCache(self.filename, max_size=2000, compression=0)
+        for i in range(10):
+            cache.set('0.json', {'padding': 'x' * 500})
+        cache.set('1.json', {'padding': 'x' * 500})
+
+        # overwriting one path never pushed the other out
+        self.assertEqual(cache.size, cache.total_size())
+        self.assertIsNotNone(cache.get('0.json'))
+
+        cache.delete('0.json')
+        cache.invalidate('1')
+        self.assertEqual(cache.size, 0)
+
+    def test_max_age(self):
+        from congress.cache import SQLiteCache
+
+        cache = SQLiteCache(self.filename, max_age=60, purge_interval=0)
+        cache.set('old.json', {'old': True}, etag='"1"')
+        cache.db.execute("UPDATE responses SET fetched = fetched - 120")
+        cache.db.commit()
+
+        # too old to serve, even though it could be revalidated
+        self.assertIsNone(cache.get('old.json'))
+        self.assertEqual(len(cache), 1)
+
+        # and purged when the next response is stored
+        cache.set('new.json', {'new': True})
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, cache.total_size())
+
+
+class RateLimitTest(StubTest):
+
+    def test_burst_and_rate(self):
+        from congress.ratelimit import RateLimiter
+
+        limiter = RateLimiter(rate=20, burst=5, daily_quota=None)
+        start = time.time()
+        for i in range(10):
+            limiter.acquire()
+
+        # five from the burst, then five more at 20 per second
+        self.assertGreaterEqual(time.time() - start, 0.2)
+        self.assertIsNone(limiter.remaining)
+
+    def test_priority_order(self):
+        from congress.ratelimit import RateLimiter, INTERACTIVE, BULK
+
+        limiter = RateLimiter(rate=10, burst=1, daily_quota=None)
+        limiter.acquire()
+        order = []
+
+        def request(name, priority):
+            limiter.acquire(priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=request, args=('bulk', BULK)) for i in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.02)
+        threads.append(threading.Thread(target=request, args=('interactive', INTERACTIVE)))
+        threads[-1].start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(order, ['interactive', 'bulk', 'bulk', 'bulk'])
+        stats = limiter.stats()
+        self.assertEqual(stats['waits']['bulk']['requests'], 3)
+        self.assertGreater(stats['waits']['bulk']['wait_max'], stats['waits']['interactive']['wait_max'])
+
+    def test_lookup_during_sweep(self):
+        from congress.ratelimit import RateLimiter, BULK
+
+        limiter = RateLimiter(rate=20, burst=1, daily_quota=None)
+        congress = Congress(API_KEY, cache=None, limiter=limiter)
+        congress.votes.BASE_URI = congress.members.BASE_URI = self.base_uri
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        for n in range(1, 9):
+            self.respond('116/house/sessions/1/votes/{0}.json'.format(n), {'votes': {'vote': {'roll_call': n}}})
+
+        sweep = threading.Thread(target=congress.votes.get_many,
+                                 args=('house', [(116, 1, n) for n in range(1, 9)]))
+        sweep.start()
+        time.sleep(0.08)
+        self.assertEqual(congress.members.get('P000197'), {'id': 'P000197'})
+        sweep.join()
+
+        # the lookup went ahead of the bulk requests still queued
+        member = self.server.requests.index('/congress/v1/members/P000197.json')
+        self.assertLess(member, 4)
+        self.assertEqual(limiter.stats()['waits']['interactive']['requests'], 1)
+
+        # unless the thread asks for a priority of its own
+        with limiter.priority(BULK):
+            congress.members.get('P000197')
+        self.assertEqual(limiter.stats()['waits']['bulk']['requests'], 9)
+
+    def test_quota(self):
+        from congress import QuotaExceeded
+        from congress.ratelimit import RateLimiter
+
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        limiter = RateLimiter(rate=100, burst=100, daily_quota=2)
+        congress = Congress(API_KEY, cache=None, limiter=limiter)
+        congress.members.BASE_URI = self.base_uri
+        self.assertIs(congress.members.limiter, limiter)
+
+        congress.members.get('P000197')
+        congress.members.get('P000197')
+        self.assertEqual(limiter.remaining, 0)
+        with self.assertRaises(QuotaExceeded):
+            congress.members.get('P000197')
+
+
+class SingleFlightTest(StubTest):
+
+    def test_threads_share_one_request(self):
+        self.respond('members/house/RI/current.json', [{'id': 'C001084'}])
+        self.server.delay = 0.2
+
+        congress = Congress(API_KEY, cache=None)
+        congress.members.BASE_URI = self.base_uri
+        self.assertIs(congress.members.flight, congress.flight)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            congress.members.filter('house', state='RI'))) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [[{'id': 'C001084'}]] * 10)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_errors_are_shared(self):
+        from congress.flight import SingleFlight
+
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise NotFound('hr0')
+
+        def follow():
+            started.wait()
+            try:
+                flight.do('key', lambda: 'not called')
+            except NotFound as e:
+                errors.append(e)
+
+        follower = threading.Thread(target=follow)
+        follower.start()
+        with self.assertRaises(NotFound):
+            flight.do('key', fail)
+        follower.join()
+        self.assertEqual(len(errors), 1)
+
+
+class RevalidationTest(StubTest):
+
+    def check_revalidation(self, cache):
+        path = '116/senate/sessions/1/votes/17.json'
+        self.respond(path, {'votes': {'vote': {'roll_call': 17}}})
+        self.server.etags['/congress/v1/' + path] = '"v1"'
+
+        congress = Congress(API_KEY, cache=cache)
+        congress.votes.BASE_URI = self.base_uri
+
+        first = congress.votes.get('senate', 17, 1, 116)
+        second = congress.votes.get('senate', 17, 1, 116)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.server.requests), 2)
+        return first, second
+
+    def test_memory_304_reuses_parsed_response(self):
+        from congress.cache import MemoryCache
+
+        # everything goes stale at once, so every fetch revalidates
+        first, second = self.check_revalidation(MemoryCache(policies=[('', 0)]))
+        self.assertIs(first, second)
+
+    def test_sqlite_304(self):
+        from congress.cache import SQLiteCache
+
+        tmp = tempfile.mkdtemp()
+        try:
+            cache = SQLiteCache(os.path.join(tmp, 'cache.sqlite'), policies=[('', 0)])
+            self.check_revalidation(cache)
+            entry = cache.get('116/senate/sessions/1/votes/17.json')
+            self.assertEqual(entry.etag, '"v1"')
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_stale_without_validators_is_dropped(self):
+        from congress.cache import MemoryCache
+
+        cache = MemoryCache(policies=[('', 0)])
+        cache.set('a.json', 1)
+        self.assertIsNone(cache.get('a.json'))
+        cache.set('b.json', 2, etag='"b"')
+        self.assertFalse(cache.get('b.json').fresh)
+
+
+class DecoderTest(StubTest):
+
+    def test_loads_bytes(self):
+        from congress import utils
+
+        body = b'{"status": "OK", "results": [{"name": "Nanette Barrag\\u00e1n", "note": "a\\r\\nb"}]}'
+        expected = {'status': 'OK', 'results': [{'name': u'Nanette Barrag\xe1n', 'note': 'a\r\nb'}]}
+        self.assertEqual(utils.loads(body), expected)
+
+        fast, utils.orjson = utils.orjson, None
+        try:
+            self.assertEqual(utils.loads(body), expected)
+        finally:
+            utils.orjson = fast
+
+    def test_custom_decoder(self):
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        bodies = []
+
+        def decoder(body):
+            bodies.append(body)
+            return json.loads(body.decode('utf-8'))
+
+        congress = Congress(API_KEY, cache=None, decoder=decoder)
+        congress.members.BASE_URI = self.base_uri
+        self.assertEqual(congress.members.get('P000197'), {'id': 'P000197'})
+        self.assertIsInstance(bodies[0], bytes)
+
+
+class LazyTest(StubTest):
+
+    DOCUMENT = {
+        'status': 'OK',
+        'results': [{
+            'votes': {'vote': {
+                'roll_call': 17,
+                'question': 'On Passage "of the [bill]" {as amended}',
+                'total': {'yes': 230, 'no': 197.5, 'present': None, 'tie': False},
+                'positions': [
+                    {'member_id': 'A000374', 'vote_position': 'Yes', 'note': u'caf\xe9 \\ \n'},
+                    {'member_id': 'A000370', 'vote_position': 'No', 'note': ''},
+                ],
+                'empty': [], 'nothing': {},
+            }},
+        }],
+    }
+
+    def test_view_matches_json(self):
+        from congress import lazy
+
+        raw = json.dumps(self.DOCUMENT, indent=1).encode('utf-8')
+        doc = lazy.view(raw)
+        vote = doc['results'][0]['votes']['vote']
+
+        self.assertEqual(vote['roll_call'], 17)
+        self.assertEqual(vote['question'], self.DOCUMENT['results'][0]['votes']['vote']['question'])
+        self.assertEqual(vote['total']['no'], 197.5)
+        self.assertIsNone(vote['total']['present'])
+        self.assertEqual(vote['positions'][-1]['member_id'], 'A000370')
+        self.assertEqual(vote['positions'][0]['note'], u'caf\xe9 \\ \n')
+        self.assertEqual(len(vote['empty']), 0)
+        self.assertEqual(dict(vote['nothing']), {})
+        self.assertIn('positions', vote)
+        self.assertEqual(doc, self.DOCUMENT)
+        self.assertEqual(lazy.materialize(doc), self.DOCUMENT)
+        self.assertIsInstance(lazy.materialize(vote['positions']), list)
+
+        with self.assertRaises(TypeError):
+            vote['roll_call'] = 18
+
+    def test_view_shared_between_threads(self):
+        from congress import lazy
+
+        members = [{'member_id': 'M{0:06d}'.format(i), 'votes': [i] * 5} for i in range(500)]
+        raw = json.dumps({'members': members, 'last': 'done'})
+        errors = []
+
+        # switch threads often, so they interleave inside indexing
+        if hasattr(sys, 'setswitchinterval'):
+            interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+            self.addCleanup(sys.setswitchinterval, interval)
+
+        for attempt in range(20):
+            doc = lazy.view(raw)
+
+            def worker(n):
+                try:
+                    for i in range(n, 500, 7):
+                        self.assertEqual(doc['members'][i]['member_id'], members[i]['member_id'])
+                    self.assertEqual(doc['last'], 'done')
+                    self.assertEqual(len(doc['members']), 500)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(7)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(errors, [])
+
+    def test_lazy_decoder(self):
+        from congress import lazy
+
+        self.server.responses['/congress/v1/116/house/sessions/1/votes/17.json'] = self.DOCUMENT
+        congress = Congress(API_KEY, cache=None, decoder=lazy.view)
+        congress.votes.BASE_URI = self.base_uri
+
+        vote = congress.votes.get('house', 17, 1, 116)
+        self.assertIsInstance(vote, lazy.LazyArray)
+        self.assertEqual(vote[0]['votes']['vote']['total']['yes'], 230)
+
+        with self.assertRaises(NotFound):
+            congress.votes.get('house', 18, 1, 116)
+
+
+class RecordsTest(StubTest):
+
+    VOTE = {
+        'votes': {'vote': {
+            'congress': 116, 'session': 1, 'chamber': 'House', 'roll_call': 17,
+            'date': '2019-01-09', 'question': 'On Passage', 'result': 'Passed',
+            'bill': {'bill_id': 'hr264-116'},
+            'positions': [
+                {'member_id': 'A000374', 'party': 'R', 'state': 'LA', 'vote_position': 'No',
+                 'dw_nominate': 0.493},
+                {'member_id': 'A000370', 'party': 'D', 'state': 'NC', 'vote_position': 'Yes',
+                 'dw_nominate': -0.465},
+            ],
+        }},
+    }
+
+    def test_vote_records(self):
+        from congress.records import RollCall, Position
+
+        self.respond('116/house/sessions/1/votes/17.json', self.VOTE)
+        congress = Congress(API_KEY, cache=None, records=True)
+        congress.votes.BASE_URI = self.base_uri
+
+        vote = congress.votes.get('house', 17, 1, 116)
+        self.assertIsInstance(vote, RollCall)
+        self.assertEqual((vote.congress, vote.roll_call, vote.result), (116, 17, 'Passed'))
+        self.assertEqual(vote.date, datetime.date(2019, 1, 9))
+        self.assertEqual(vote.bill_id, 'hr264-116')
+        self.assertEqual([p.vote_position for p in vote.positions], ['No', 'Yes'])
+        self.assertIsInstance(vote.positions[0], Position)
+        self.assertIs(vote.positions[0].vote_position, congress.votes.get('house', 17, 1, 116).positions[0].vote_position)
+        self.assertFalse(hasattr(vote, '__dict__'))
+
+        # without records, the same call returns dicts as before
+        plain = Congress(API_KEY, cache=None)
+        plain.votes.BASE_URI = self.base_uri
+        self.assertEqual(plain.votes.get('house', 17, 1, 116), self.VOTE)
+
+    def test_member_records(self):
+        from congress.records import Member
+
+        self.respond('116/house/members.json', [{'members': [
+            {'id': 'P000197', 'first_name': 'Nancy', 'last_name': 'Pelosi', 'party': 'D',
+             'date_of_birth': '1940-03-26', 'in_office': True, 'seniority': '32'}]}])
+        congress = Congress(API_KEY, cache=None, records=True)
+        congress.members.BASE_URI = self.base_uri
+
+        pelosi, = congress.members.filter('house', 116)
+        self.assertEqual(pelosi.name, 'Nancy Pelosi')
+        self.assertEqual(pelosi.date_of_birth, datetime.date(1940, 3, 26))
+        self.assertEqual(pelosi.seniority, 32)
+        self.assertIsNone(pelosi.district)
+        self.assertEqual(pelosi, Member.from_dict(pelosi.as_dict()))
+
+
+class MatrixTest(StubTest):
+
+    def vote(self, roll_call, positions):
+        return {'votes': {'vote': {
+            'congress': 116, 'session': 1, 'chamber': 'House', 'roll_call': roll_call,
+            'positions': [{'member_id': m, 'vote_position': p} for m, p in positions],
+        }}}
+
+    def setUp(self):
+        super(MatrixTest, self).setUp()
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+
+        self.respond('116/house/sessions/1/votes/1.json',
+                     self.vote(1, [('B000001', 'Yes'), ('A000001', 'No')]))
+        self.respond('116/house/sessions/1/votes/2.json',
+                     self.vote(2, [('A000001', 'Present'), ('C000001', 'Not Voting')]))
+
+    def test_build_save_load(self):
+        from congress.matrix import VoteMatrix, YES, NO, PRESENT, NOT_VOTING, MISSING
+
+        for records in (False, True):
+            congress = Congress(API_KEY, cache=None, records=records)
+            congress.votes.BASE_URI = self.base_uri
+            matrix = VoteMatrix.fetch(congress.votes, 'house', [(116, 1, 2), (116, 1, 1)])
+
+            self.assertEqual(matrix.shape, (3, 2))
+            self.assertEqual(matrix.members.tolist(), ['A000001', 'B000001', 'C000001'])
+            self.assertEqual(matrix.rollcalls.tolist(), [(116, 1, 1), (116, 1, 2)])
+            self.assertEqual(matrix.row('A000001').tolist(), [NO, PRESENT])
+            self.assertEqual(matrix.column(116, 1, 1).tolist(), [NO, YES, MISSING])
+            self.assertEqual(matrix.votes.dtype.name, 'int8')
+
+        directory = tempfile.mkdtemp()
+        try:
+            matrix.save(directory)
+            loaded = VoteMatrix.load(directory)
+            self.assertEqual(loaded.votes.tolist(), matrix.votes.tolist())
+            self.assertEqual(loaded.column(116, 1, 2).tolist(), [PRESENT, MISSING, NOT_VOTING])
+            del loaded
+        finally:
+            shutil.rmtree(directory)
+
+    def test_mapping_responses(self):
+        from congress import lazy
+        from congress.matrix import VoteMatrix, YES, NO
+
+        # any mapping will do, such as the views from the lazy decoder
+        matrix = VoteMatrix.from_votes([
+            lazy.view(json.dumps(self.vote(1, [('B000001', 'Yes'), ('A000001', 'No')]))),
+        ])
+        self.assertEqual(matrix.column(116, 1, 1).tolist(), [NO, YES])
+
+    def test_missing_rollcall(self):
+        from congress.matrix import VoteMatrix
+
+        congress = Congress(API_KEY, cache=None)
+        congress.votes.BASE_URI = self.base_uri
+        with self.assertRaises(NotFound):
+            VoteMatrix.fetch(congress.votes, 'house', [(116, 1, 1), (116, 1, 3)])
+
+
+class IngestTest(StubTest):
+
+    def setUp(self):
+        super(IngestTest, self).setUp()
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+
+        self.directory = tempfile.mkdtemp()
+        self.respond('house/votes/2019/12.json', {'votes': [
+            {'congress': 116, 'session': 1, 'roll_call': 4},
+            {'congress': 116, 'session': 1, 'roll_call': 3},
+        ]})
+        for n, positions in ((1, [('A000001', 'Yes'), ('B000001', 'No')]),
+                             (2, [('B000001', 'Present')]),
+                             (4, [('A000001', 'Not Voting')])):
+            self.respond('116/house/sessions/1/votes/{0}.json'.format(n), {'votes': {'vote': {
+                'congress': 116, 'session': 1, 'roll_call': n, 'date': '2019-01-0{0}'.format(n),
+                'question': 'On Passage', 'bill': {'bill_id': 'hr{0}-116'.format(n)},
+                'total': {'yes': 1, 'no': 1},
+                'positions': [{'member_id': m, 'party': 'D', 'state': 'CA', 'vote_position': p}
+                              for m, p in positions],
+            }}})
+
+        # roll call 3 fails with an error that isn't a 404
+        self.server.responses['/congress/v1/116/house/sessions/1/votes/3.json'] = {'status': 'ERROR'}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(IngestTest, self).tearDown()
+
+    def test_latest_in_next_january(self):
+        from congress.ingest import RollCallIngest
+
+        self.respond('house/votes/2019/1.json', {'votes': [
+            {'congress': 116, 'session': 1, 'roll_call': 1},
+            {'congress': 115, 'session': 2, 'roll_call': 710},
+        ]})
+        self.respond('house/votes/2018/12.json', {'votes': [{'congress': 115, 'session': 2, 'roll_call': 709}]})
+
+        congress = Congress(API_KEY, cache=None)
+        congress.votes.BASE_URI = self.base_uri
+        ingest = RollCallIngest(congress.votes, self.directory, 'house', 115, 2)
+        self.assertEqual(ingest.latest(), 710)
+
+    def test_resumable_ingest(self):
+        from congress.ingest import RollCallIngest
+        from congress.matrix import YES, NO, PRESENT, NOT_VOTING, MISSING
+
+        congress = Congress(API_KEY, cache=None)
+        congress.votes.BASE_URI = self.base_uri
+        ingest = RollCallIngest(congress.votes, self.directory, 'house', 116, 1, chunk_size=2)
+        self.assertEqual(ingest.latest(), 4)
+
+        # the second batch hits roll call 3, but keeps roll call 4
+        with self.assertRaises(CongressError):
+            ingest.run()
+        self.assertEqual(ingest.done(), set([1, 2, 4]))
+
+        self.server.responses['/congress/v1/116/house/sessions/1/votes/3.json'] = {'status': '404'}
+        del self.server.requests[:]
+        self.assertEqual(ingest.run(4), 0)
+        self.assertEqual(self.server.requests, ['/congress/v1/116/house/sessions/1/votes/3.json'])
+        self.assertEqual(ingest.run(4), 0)
+
+        votes, positions = ingest.columns()
+        self.assertEqual(votes['roll_call'].tolist(), [1, 2, 4])
+        self.assertEqual(votes['bill_id'].tolist(), ['hr1-116', 'hr2-116', 'hr4-116'])
+        self.assertEqual(str(votes['date'][-1]), '2019-01-04')
+        self.assertEqual(len(positions['member_id']), 4)
+
+        matrix = ingest.matrix()
+        self.assertEqual(matrix.members.tolist(), ['A000001', 'B000001'])
+        self.assertEqual(matrix.votes.tolist(), [[YES, MISSING, NOT_VOTING], [NO, PRESENT, MISSING]])
+        self.assertEqual(matrix.column(116, 1, 4).tolist(), [NOT_VOTING, MISSING])
+
+
+class AgreementTest(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+
+    def test_vote_agreement(self):
+        import numpy as np
+        from congress.agreement import vote_agreement
+        from congress.matrix import VoteMatrix, YES, NO, NOT_VOTING, MISSING
+
+        matrix = VoteMatrix.from_votes([
+            {'congress': 116, 'session': 1, 'roll_call': n,
+             'positions': [{'member_id': m, 'vote_position': p} for m, p in positions]}
+            for n, positions in enumerate([
+                [('A', 'Yes'), ('B', 'Yes'), ('C', 'No'), ('D', 'Not Voting')],
+                [('A', 'No'), ('B', 'Yes'), ('C', 'No'), ('D', 'Not Voting')],
+                [('A', 'Yes'), ('B', 'Yes'), ('C', 'Yes')],
+                [('A', 'No'), ('B', 'No'), ('C', 'Yes')],
+            ], 1)])
+
+        agreement = vote_agreement(matrix)
+        self.assertEqual(agreement.pair('A', 'B'), 75.0)
+        self.assertEqual(agreement.pair('A', 'C'), 50.0)
+        self.assertIsNone(agreement.pair('A', 'D'))
+        self.assertTrue(np.allclose(agreement.values, agreement.values.T, equal_nan=True))
+        self.assertEqual(agreement.top('A', 5), [('B', 75.0), ('C', 50.0)])
+        self.assertEqual(agreement.counts[0, 1], 4)
+
+    def test_cosponsor_overlap(self):
+        from congress.agreement import cosponsor_overlap
+
+        overlap = cosponsor_overlap([
+            {'bill_id': 'hr1-116', 'sponsor_id': 'A', 'cosponsors': [{'cosponsor_id': 'B'}]},
+            {'bill_id': 'hr2-116', 'sponsor_id': 'B', 'cosponsors': [{'cosponsor_id': 'C'}]},
+            {'bill_id': 'hr3-116', 'sponsor_id': 'C', 'cosponsors': [{'cosponsor_id': 'A'}, {'cosponsor_id': 'B'}]},
+        ])
+        self.assertAlmostEqual(overlap.pair('A', 'B'), 200.0 / 3)
+        self.assertEqual(overlap.pair('A', 'C'), 100.0 / 3)
+        self.assertEqual(overlap.top('B', 1), [('A', overlap.pair('A', 'B'))])
+
+
+class SyncTest(StubTest):
+
+    def statements(self, dates):
+        "Serve statements, newest first, one per (date, n)"
+        items = [{'url': 'http://example.com/{0}/{1}'.format(d, n), 'date': d}
+                 for d, n in sorted(dates, reverse=True)]
+        self.server.responses.clear()
+        for offset in range(0, len(items) + 20, 20):
+            self.respond('statements/latest.json?offset={0}'.format(offset), items[offset:offset + 20])
+
+    def test_watermark_sync(self):
+        from congress.sync import Sync
+
+        filename = os.path.join(tempfile.mkdtemp(), 'sync.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(filename))
+
+        dates = [('2019-01-{0:02d}'.format(day), n) for day in range(1, 21) for n in range(3)]
+        self.statements(dates)
+        congress = Congress(API_KEY, cache=None)
+        congress.statements.BASE_URI = self.base_uri
+
+        first = Sync(congress, filename, backfill=5).statements()
+        self.assertEqual(len(first), 5)
+        self.assertEqual(len(self.server.requests), 1)
+
+        # two more on the newest day already seen, and one on a new day
+        dates += [('2019-01-20', 3), ('2019-01-20', 4), ('2019-01-21', 0)]
+        self.statements(dates)
+        del self.server.requests[:]
+
+        sync = Sync(congress, filename)
+        self.assertEqual(sync.watermark('statements'), '2019-01-20')
+        new = sync.statements()
+        self.assertEqual(sorted(s['url'] for s in new), [
+            'http://example.com/2019-01-20/3', 'http://example.com/2019-01-20/4',
+            'http://example.com/2019-01-21/0'])
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.assertEqual(sync.statements(), [])
+        self.assertEqual(sync.watermark('statements'), '2019-01-21')
+
+    def test_bill_updated_under_mark(self):
+        from congress.sync import Sync
+
+        filename = os.path.join(tempfile.mkdtemp(), 'sync.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(filename))
+        congress = Congress(API_KEY, cache=None)
+        congress.bills.BASE_URI = self.base_uri
+
+        def serve(bills):
+            self.respond('116/both/bills/updated.json?offset=0', [{'bills': bills}])
+
+        bills = [{'bill_id': 'hr{0}-116'.format(n), 'latest_major_action_date': '2019-01-{0:02d}'.format(n),
+                  'cosponsors': 1} for n in range(9, 0, -1)]
+        serve(bills)
+        sync = Sync(congress, filename)
+        self.assertEqual(len(sync.bills('both', 116)), 9)
+        self.assertEqual(sync.bills('both', 116), [])
+
+        # a new cosponsor, but no new major action, so it stays under the mark
+        bills[3] = dict(bills[3], cosponsors=2)
+        serve(bills)
+        self.assertEqual([b['bill_id'] for b in sync.bills('both', 116)], ['hr6-116'])
+        self.assertEqual(sync.watermark('bills/116/both'), '2019-01-09')
+        self.assertEqual(sync.bills('both', 116), [])
+
+
+class SearchTest(unittest.TestCase):
+
+    STATEMENTS = [
+        {'url': 'http://example.com/1', 'date': '2019-01-02', 'member_id': 'P000197',
+         'title': 'Pelosi statement on health care for all'},
+        {'url': 'http://example.com/2', 'date': '2019-02-10', 'member_id': 'M000355',
+         'title': 'McConnell: care about health, not the care act'},
+        {'url': 'http://example.com/3', 'date': '2019-03-01', 'member_id': 'P000197',
+         'title': 'Pelosi on infrastructure and health care funding'},
+    ]
+
+    FILINGS = [
+        {'id': 7, 'signed_date': '2019-02-01',
+         'lobbying_client': {'name': 'Acme Health', 'general_description': 'Health care provider'},
+         'lobbying_registrant': {'name': 'K Street LLP'},
+         'specific_issues': ['Medicare reimbursement rates']},
+    ]
+
+    def setUp(self):
+        from congress.search import Index
+        self.index = Index()
+        self.assertEqual(self.index.add_statements(self.STATEMENTS), 3)
+        self.index.add_filings(self.FILINGS)
+
+    def ids(self, results):
+        return [d.id for d in results]
+
+    def test_terms_and_phrases(self):
+        self.assertEqual(sorted(self.ids(self.index.search('health care'))),
+                         ['filing:7', 'http://example.com/1', 'http://example.com/2', 'http://example.com/3'])
+        self.assertEqual(sorted(self.ids(self.index.search('"health care"'))),
+                         ['filing:7', 'http://example.com/1', 'http://example.com/3'])
+        self.assertEqual(self.ids(self.index.search('medicare')), ['filing:7'])
+        self.assertEqual(self.index.search('nonexistent'), [])
+        self.assertEqual(self.index.search(''), [])
+
+    def test_filters(self):
+        results = self.index.search('"health care"', member_id='P000197', since='2019-02-01')
+        self.assertEqual(self.ids(results), ['http://example.com/3'])
+        self.assertEqual(self.ids(self.index.search('health', kind='filing')), ['filing:7'])
+        self.assertEqual(self.ids(self.index.search('health', until=datetime.date(2019, 1, 31))),
+                         ['http://example.com/1'])
+
+    def test_update_and_save(self):
+        from congress.search import Index
+
+        self.index.add_statements([dict(self.STATEMENTS[0], title='Pelosi on the budget')])
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.ids(self.index.search('budget')), ['http://example.com/1'])
+        self.assertNotIn('http://example.com/1', self.ids(self.index.search('health')))
+        self.assertNotIn('all', self.index.postings)
+
+        filename = os.path.join(tempfile.mkdtemp(), 'index.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(filename))
+        self.index.save(filename)
+        loaded = Index.load(filename)
+        self.assertEqual(self.ids(loaded.search('"health care" funding')), ['http://example.com/3'])
+        self.assertEqual(loaded.search('medicare')[0].record, self.FILINGS[0])
+
+
+class RangeTest(RangeCase):
+
+    def test_windows(self):
+        from congress.votes import windows
+
+        spans = list(windows(datetime.date(2019, 1, 1), datetime.date(2019, 3, 11)))
+        self.assertEqual(spans[0], (datetime.date(2019, 1, 1), datetime.date(2019, 1, 30)))
+        self.assertEqual(spans[-1], (datetime.date(2019, 3, 2), datetime.date(2019, 3, 11)))
+        self.assertEqual(list(windows(datetime.date(2019, 1, 1), datetime.date(2019, 1, 1))),
+                         [(datetime.date(2019, 1, 1), datetime.date(2019, 1, 1))])
+
+    def test_long_range(self):
+        congress = Congress(API_KEY, cache=None)
+        congress.votes.BASE_URI = self.base_uri
+
+        votes = congress.votes.by_range('house', '2019-03-11', '2019-01-01')
+        self.assertEqual([v['roll_call'] for v in votes['votes']], [4, 3, 1])
+        self.assertEqual(votes['num_results'], 3)
+        self.assertEqual((votes['start_date'], votes['end_date']), ('2019-01-01', '2019-03-11'))
+        self.assertEqual(len(self.server.requests), 3)
+
+        # one window comes back in the same order, with the same range,
+        # and is fetched without a thread pool
+        congress.votes.fetch_many = lambda *args, **kwargs: self.fail('fetched through fetch_many')
+        votes = congress.votes.by_range('house', '2019-01-01', '2019-01-30')
+        self.assertEqual([v['roll_call'] for v in votes['votes']], [3, 1])
+        self.assertEqual((votes['start_date'], votes['end_date']), ('2019-01-01', '2019-01-30'))
+
+        records = Congress(API_KEY, cache=None, records=True)
+        records.votes.BASE_URI = self.base_uri
+        self.assertEqual([v.roll_call for v in records.votes.by_range('house', '2019-01-01', '2019-03-11')],
+                         [4, 3, 1])
+
+
+class ExpensesTest(StubTest):
+
+    def setUp(self):
+        super(ExpensesTest, self).setUp()
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+
+        self.respond('115/house/members.json', [{'members': [{'id': 'A000001'}, {'id': 'B000001'}]}])
+        for member, quarter, travel in (('A000001', 1, 100.0), ('A000001', 2, 50.5), ('B000001', 1, 10.0)):
+            self.respond('members/{0}/office_expenses/2017/{1}.json'.format(member, quarter), [
+                {'category': 'Travel', 'category_slug': 'travel', 'amount': travel},
+                {'category': 'Personnel', 'category_slug': 'personnel', 'amount': 1000.0},
+            ])
+
+    def test_crawl_and_group(self):
+        from congress.expenses import ExpenseCrawl, ExpenseTable
+
+        congress = Congress(API_KEY, cache=None)
+        congress.members.BASE_URI = congress.officeexpenses.BASE_URI = self.base_uri
+
+        crawl = ExpenseCrawl(congress, years=[2017], max_workers=4, batch_size=3)
+        table = crawl.run()
+
+        # two members, four quarters; the missing reports are skipped
+        self.assertEqual(len(self.server.requests), 1 + 8)
+        self.assertEqual(len(table), 6)
+        self.assertEqual(crawl.errors, [])
+
+        self.assertEqual(table.group_by('category'), {'travel': 160.5, 'personnel': 3000.0})
+        self.assertEqual(table.group_by('member', 'quarter')[('A000001', 2)], 1050.5)
+        self.assertEqual(table.group_by(), 3160.5)
+
+        filename = os.path.join(tempfile.mkdtemp(), 'expenses.npz')
+        self.addCleanup(shutil.rmtree, os.path.dirname(filename))
+        table.save(filename)
+        loaded = ExpenseTable.load(filename)
+        self.assertEqual(sorted(loaded.rows()), sorted(table.rows()))
+
+    def test_resume(self):
+        from congress.expenses import ExpenseCrawl
+
+        congress = Congress(API_KEY, cache=None)
+        congress.members.BASE_URI = congress.officeexpenses.BASE_URI = self.base_uri
+
+        path = '/congress/v1/members/A000001/office_expenses/2017/2.json'
+        report = self.server.responses[path]
+        self.server.responses[path] = {'status': 'ERROR'}
+
+        crawl = ExpenseCrawl(congress, years=[2017], max_workers=4, batch_size=3)
+        self.assertEqual(len(crawl.run()), 4)
+        self.assertEqual([key for key, error in crawl.errors], [('A000001', 2017, 2)])
+
+        # a rerun only asks for the report that failed, and adds it once
+        self.server.responses[path] = report
+        del self.server.requests[:]
+        table = crawl.run()
+        self.assertEqual(self.server.requests[1:], [path])
+        self.assertEqual(crawl.errors, [])
+        self.assertEqual(len(table), 6)
+        self.assertEqual(table.group_by(), 3160.5)
+
+
+class MetricsTest(StubTest):
+
+    def test_routes(self):
+        from congress.metrics import route
+
+        self.assertEqual(route('116/house/sessions/1/votes/17.json'),
+                         '{congress}/{chamber}/sessions/{session}/votes/{n}.json')
+        self.assertEqual(route('115/bills/hr1/cosponsors.json'), '{congress}/bills/{bill_id}/{type}.json')
+        self.assertEqual(route('statements/search.json?query=tax&offset=20'), 'statements/search.json')
+        self.assertEqual(route('/members/P000197.json'), 'members/{member_id}.json')
+        self.assertEqual(route('new/123/thing.json'), 'new/{n}/thing.json')
+
+    def test_client_metrics(self):
+        from congress.cache import MemoryCache
+        from congress.metrics import Metrics
+
+        self.respond('116/house/sessions/1/votes/17.json', {'votes': {'vote': {'roll_call': 17}}})
+        self.respond('116/house/sessions/1/votes/18.json', {'votes': {'vote': {'roll_call': 18}}})
+
+        metrics = Metrics()
+        congress = Congress(API_KEY, cache=MemoryCache(), metrics=metrics)
+        congress.votes.BASE_URI = self.base_uri
+
+        congress.votes.get('house', 17, 1, 116)
+        congress.votes.get('house', 17, 1, 116)
+        congress.votes.get('house', 18, 1, 116)
+        with self.assertRaises(NotFound):
+            congress.votes.get('house', 19, 1, 116)
+
+        stats = metrics.stats()['{congress}/{chamber}/sessions/{session}/votes/{n}.json']
+        self.assertEqual(stats['requests'], 4)
+        self.assertEqual(stats['cache'], {'hit': 1, 'miss': 3, 'revalidated': 0})
+        self.assertEqual(stats['errors'], {'NotFound': 1})
+        self.assertEqual(stats['statuses'], {200: 3})
+        self.assertGreater(stats['bytes'], 0)
+        self.assertIsNotNone(stats['latency_p99'])
+
+        text = metrics.prometheus()
+        label = 'route="{congress}/{chamber}/sessions/{session}/votes/{n}.json"'
+        self.assertIn('congress_requests_total{%s} 4' % label, text)
+        self.assertIn('congress_errors_total{%s,error="NotFound"} 1' % label, text)
+        self.assertIn('congress_request_seconds_bucket{%s,le="+Inf"} 3' % label, text)
+        self.assertIn('congress_request_seconds_count{%s} 3' % label, text)
+        self.assertIn('# TYPE congress_decode_seconds histogram', text)
+
+
+class CassetteTest(CassetteCase):
+
+    def test_record_and_replay(self):
+        from congress.cassette import Cassette, CassetteMiss
+
+        self.record()
+
+        congress = self.congress(Cassette(self.filename))
+        self.assertEqual(congress.votes.get('house', 17, 1, 116), {'votes': {'vote': {'roll_call': 17}}})
+        self.assertEqual(congress.members.get('P000197')['name'], u'Nanette Barrag\xe1n')
+
+        with self.assertRaises(CassetteMiss):
+            congress.votes.get('house', 18, 1, 116)
+        self.assertEqual(len(self.server.requests), 2)
+
+        import gzip
+        with gzip.open(self.filename, 'rb') as f:
+            content = f.read()
+        self.assertNotIn(b'X-API-Key', content)
+
+        # nor the host, which httplib2 puts in content-location
+        host = self.base_uri.split('/')[2].encode('ascii')
+        self.assertNotIn(host, content)
+        self.assertNotIn(b'content-location', content)
+
+    def test_permissive(self):
+        from congress.cassette import Cassette, CassetteMiss, PERMISSIVE
+
+        self.record()
+        congress = self.congress(Cassette(self.filename, mode=PERMISSIVE))
+        self.assertEqual(congress.votes.get('house', 18, 1, 116), {'votes': {'vote': {'roll_call': 17}}})
+        with self.assertRaises(CassetteMiss):
+            congress.bills.get('hr1', 116)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+class BenchTest(unittest.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, 4), 'bench.py needs Python 3.4')
+    def test_bench_smoke(self):
+        import bench
+
+        # one call, to check the harness works; run bench.py itself to measure
+        options = bench.parse_args(['--calls', '1', '--latency', '0', '--memory-calls', '1',
+                                    '--threads', '1', '--batch', '1', '--scenarios', 'serial'])
+        results = bench.run(options, log=lambda line: None)
+        self.assertEqual(list(results['results']), ['serial'])
+        result = results['results']['serial']
+        self.assertEqual(result['calls'], 1)
+        self.assertGreater(result['throughput'], 0)
+
+        lines, regressions = bench.compare(results, results, 10)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(regressions, [])
+
+
+class ImportTest(unittest.TestCase):
+
+    # modules ``import congress`` leaves for later
+    DEFERRED = ('congress.bills', 'congress.members', 'congress.committees', 'congress.votes',
+                'congress.nominations', 'congress.communications', 'congress.explanations',
+                'congress.flooractions', 'congress.lobbying', 'congress.officeexpenses',
+                'congress.statements', 'congress.aio', 'httplib2', 'asyncio', 'sqlite3',
+                'numpy', 'dateutil', 'orjson')
+
+    def run_python(self, code):
+        return subprocess.check_output([sys.executable, '-X', 'importtime', '-c', code],
+                                       stderr=subprocess.STDOUT, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'subclients are imported up front before Python 3.7')
+    def test_import_is_light(self):
+        output = self.run_python('import sys, congress\n'
+                                 'print(sorted(m for m in {0!r} if m in sys.modules))'.format(self.DEFERRED))
+        lines = [l for l in output.decode('utf-8').splitlines() if not l.startswith('import time:')]
+        self.assertEqual(lines, ['[]'])
+
+    @unittest.skipUnless(os.environ.get('CONGRESS_IMPORT_BUDGET'),
+                         'set CONGRESS_IMPORT_BUDGET to a budget in microseconds to time imports')
+    def test_import_budget(self):
+        # wall-clock, so it depends on the machine; opt-in only
+        output = self.run_python('import congress').decode('utf-8')
+        times = [line.split('|') for line in output.splitlines() if line.startswith('import time:')]
+        cumulative = dict((name.strip(), int(total)) for self_time, total, name in times[1:])
+        self.assertLess(cumulative['congress'], int(os.environ['CONGRESS_IMPORT_BUDGET']))
+
+    def test_deferred_imports(self):
+        output = self.run_python(
+            'import sys, congress\n'
+            'c = congress.Congress("key")\n'
+            'print(sorted(m for m in ("httplib2", "asyncio", "sqlite3", "numpy", "congress.bills", '
+            '"congress.votes") if m in sys.modules))\n'
+            'c.votes\n'
+            'print("congress.votes" in sys.modules, c.votes is c.votes, c.votes.http is c.http)\n'
+            'print(congress.BillsClient.__name__)\n')
+        lines = [l for l in output.decode('utf-8').splitlines() if not l.startswith('import time:')]
+        self.assertEqual(lines, ['[]', 'True True True', 'BillsClient'])
+
+
 class DjangoTest(unittest.TestCase):
     
     def test_django_cache(self):
@@ -267,5 +1450,10 @@ class DjangoTest(unittest.TestCase):
             self.fail(e)
         
 
+if sys.version_info >= (3, 7):
+    # the asyncio tests use async syntax and asyncio.run, which is new in Python 3.7
+    from test_aio import AsyncTest, AsyncPaginationTest, AsyncRangeTest, AsyncCassetteTest
+
+
 if __name__ == "__main__":
     unittest.main()
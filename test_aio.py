@@ -0,0 +1,192 @@
+"""
+asyncio tests, kept apart from test.py because they use async syntax and
+asyncio.run, which is new in Python 3.7. test.py imports them where they
+can run.
+"""
+import asyncio
+import datetime
+
+from congress.utils import NotFound
+
+from test_support import API_KEY, CassetteCase, PaginationCase, RangeCase, StubTest
+
+
+class AsyncTest(StubTest):
+
+    def test_async_subclients(self):
+        from congress.aio import AsyncCongress
+
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        self.respond('115/bills/hr1.json', [{'bill_id': 'hr1-115'}])
+
+        async def main():
+            async with AsyncCongress(API_KEY, max_concurrency=2) as congress:
+                congress.members.BASE_URI = congress.bills.BASE_URI = self.base_uri
+                return await asyncio.gather(
+                    congress.members.get('P000197'),
+                    congress.bills.get('hr1', 115),
+                    congress.members.get('P000197'))
+
+        pelosi, hr1, again = asyncio.run(main())
+        self.assertEqual(pelosi, {'id': 'P000197'})
+        self.assertEqual(hr1, {'bill_id': 'hr1-115'})
+        self.assertEqual(again, pelosi)
+
+    def test_async_not_found(self):
+        from congress.aio import AsyncCongress
+
+        async def main():
+            async with AsyncCongress(API_KEY) as congress:
+                congress.members.BASE_URI = self.base_uri
+                return await congress.members.get('notamember')
+
+        with self.assertRaises(NotFound):
+            asyncio.run(main())
+
+    def test_async_share_one_request(self):
+        from congress.aio import AsyncCongress
+
+        self.respond('115/bills/hr1.json', [{'bill_id': 'hr1-115'}])
+        self.server.delay = 0.1
+
+        async def main():
+            async with AsyncCongress(API_KEY) as congress:
+                congress.bills.BASE_URI = self.base_uri
+                return await asyncio.gather(*[congress.bills.get('hr1', 115) for i in range(10)])
+
+        self.assertEqual(asyncio.run(main()), [{'bill_id': 'hr1-115'}] * 10)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_async_priority(self):
+        from congress.aio import AsyncCongress
+        from congress.ratelimit import RateLimiter, BULK, NORMAL
+
+        limiter = RateLimiter(rate=20, burst=1, daily_quota=None)
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        for n in range(1, 7):
+            self.respond('116/house/sessions/1/votes/{0}.json'.format(n), {'votes': {'vote': {'roll_call': n}}})
+
+        async def sweep(congress):
+            with limiter.priority(BULK):
+                await asyncio.sleep(0)
+                return await asyncio.gather(*[congress.votes.get('house', n, 1, 116) for n in range(1, 7)])
+
+        async def lookup(congress):
+            await asyncio.sleep(0.08)
+            # the sweep's priority block doesn't reach this task
+            self.assertEqual(limiter.current(), NORMAL)
+            return await congress.members.get('P000197')
+
+        async def main():
+            async with AsyncCongress(API_KEY, limiter=limiter) as congress:
+                congress.votes.BASE_URI = congress.members.BASE_URI = self.base_uri
+                return await asyncio.gather(sweep(congress), lookup(congress))
+
+        votes, member = asyncio.run(main())
+        self.assertEqual(member, {'id': 'P000197'})
+
+        # the lookup went ahead of the bulk requests still queued
+        self.assertLess(self.server.requests.index('/congress/v1/members/P000197.json'), 4)
+        waits = limiter.stats()['waits']
+        self.assertEqual((waits['bulk']['requests'], waits['interactive']['requests']), (6, 1))
+        self.assertEqual(limiter.queued, 0)
+
+    def test_async_leader_cancelled(self):
+        from congress.aio import AsyncCongress
+
+        self.respond('115/bills/hr1.json', [{'bill_id': 'hr1-115'}])
+        self.server.delay = 0.2
+
+        async def main():
+            async with AsyncCongress(API_KEY) as congress:
+                congress.bills.BASE_URI = self.base_uri
+                leader = asyncio.ensure_future(congress.bills.get('hr1', 115))
+                await asyncio.sleep(0.05)
+                followers = [asyncio.ensure_future(congress.bills.get('hr1', 115)) for i in range(3)]
+                await asyncio.sleep(0.05)
+                leader.cancel()
+                return await asyncio.gather(*followers)
+
+        # the followers weren't cancelled, so they fetch it again themselves
+        self.assertEqual(asyncio.run(main()), [{'bill_id': 'hr1-115'}] * 3)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_async_records(self):
+        from congress.aio import AsyncCongress
+        from congress.records import Bill
+
+        self.respond('115/bills/hr1.json', [{'bill_id': 'hr1-115', 'introduced_date': '2017-11-02'}])
+
+        async def main():
+            async with AsyncCongress(API_KEY, records=True) as congress:
+                congress.bills.BASE_URI = self.base_uri
+                return await congress.bills.get('hr1', 115)
+
+        bill = asyncio.run(main())
+        self.assertIsInstance(bill, Bill)
+        self.assertEqual(bill.introduced_date, datetime.date(2017, 11, 2))
+
+    def test_async_metrics(self):
+        from congress.aio import AsyncCongress
+        from congress.metrics import Metrics
+
+        self.respond('members/P000197.json', [{'id': 'P000197'}])
+        metrics = Metrics()
+
+        async def main():
+            async with AsyncCongress(API_KEY, metrics=metrics) as congress:
+                congress.members.BASE_URI = self.base_uri
+                return await congress.members.get('P000197')
+
+        asyncio.run(main())
+        stats = metrics.stats()['members/{member_id}.json']
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['statuses'], {200: 1})
+
+
+class AsyncPaginationTest(PaginationCase):
+
+    def test_async_iter(self):
+        from congress.aio import AsyncCongress
+
+        self.respond_pages('statements/latest.json', 30)
+
+        async def main():
+            async with AsyncCongress(API_KEY) as congress:
+                congress.statements.BASE_URI = self.base_uri
+                serial = [s['n'] async for s in congress.statements.iter_recent()]
+                ahead = [s['n'] async for s in congress.statements.iter_recent(prefetch=2)]
+                return serial, ahead
+
+        serial, ahead = asyncio.run(main())
+        self.assertEqual(serial, list(range(30)))
+        self.assertEqual(ahead, list(range(30)))
+
+
+class AsyncRangeTest(RangeCase):
+
+    def test_async_long_range(self):
+        from congress.aio import AsyncCongress
+
+        async def main():
+            async with AsyncCongress(API_KEY) as congress:
+                congress.votes.BASE_URI = self.base_uri
+                return await congress.votes.by_range('house', '2019-01-01', '2019-03-11')
+
+        self.assertEqual([v['roll_call'] for v in asyncio.run(main())['votes']], [4, 3, 1])
+
+
+class AsyncCassetteTest(CassetteCase):
+
+    def test_async_replay(self):
+        from congress.aio import AsyncCassette, AsyncCongress
+
+        self.record()
+
+        async def main():
+            async with AsyncCongress(API_KEY, http=AsyncCassette(self.filename)) as congress:
+                congress.votes.BASE_URI = self.base_uri
+                return await congress.votes.get('house', 17, 1, 116)
+
+        self.assertEqual(asyncio.run(main()), {'votes': {'vote': {'roll_call': 17}}})
+        self.assertEqual(len(self.server.requests), 2)
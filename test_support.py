@@ -0,0 +1,128 @@
+"""
+Stub server and base test cases shared by test.py and test_aio.py
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from six.moves import BaseHTTPServer, socketserver
+
+from congress import Congress
+
+API_KEY = os.environ['PROPUBLICA_API_KEY']
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    "Serve canned JSON from the server's ``responses`` dict, keyed by path"
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+
+        etag = self.server.etags.get(self.path)
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        body = self.server.responses.get(self.path, {'status': '404'})
+        body = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class StubTest(unittest.TestCase):
+    "Tests that run against a local stub server instead of the live API"
+
+    def setUp(self):
+        self.server = StubServer(('127.0.0.1', 0), StubHandler)
+        self.server.responses = {}
+        self.server.requests = []
+        self.server.delay = 0
+        self.server.etags = {}
+        self.base_uri = 'http://127.0.0.1:{0}/congress/v1/'.format(self.server.server_port)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, path, results):
+        self.server.responses['/congress/v1/' + path] = {'status': 'OK', 'results': results}
+
+
+class PaginationCase(StubTest):
+    "Stub tests over paginated responses"
+
+    def respond_pages(self, path, total):
+        for offset in range(0, total + 20, 20):
+            page = [{'n': n} for n in range(offset, min(offset + 20, total))]
+            self.respond('{0}?offset={1}'.format(path, offset), page)
+
+
+class RangeCase(StubTest):
+    "Stub tests over a vote range served in three windows"
+
+    def setUp(self):
+        super(RangeCase, self).setUp()
+
+        def vote(date, n):
+            return {'chamber': 'House', 'congress': 116, 'session': 1, 'roll_call': n, 'date': date}
+
+        self.respond('house/votes/2019-01-01/2019-01-30.json',
+                     {'num_results': 2, 'votes': [vote('2019-01-30', 3), vote('2019-01-03', 1)]})
+        self.respond('house/votes/2019-01-31/2019-03-01.json',
+                     {'num_results': 2, 'votes': [vote('2019-02-01', 4), vote('2019-01-30', 3)]})
+        self.respond('house/votes/2019-03-02/2019-03-11.json', {'num_results': 0, 'votes': []})
+
+
+class CassetteCase(StubTest):
+    "Stub tests that record a cassette to replay"
+
+    def setUp(self):
+        super(CassetteCase, self).setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp, 'test.cassette')
+
+    def tearDown(self):
+        super(CassetteCase, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def congress(self, http):
+        congress = Congress(API_KEY, http=http)
+        congress.votes.BASE_URI = self.base_uri
+        congress.members.BASE_URI = self.base_uri
+        return congress
+
+    def record(self):
+        from congress.cassette import Cassette
+
+        self.respond('116/house/sessions/1/votes/17.json', {'votes': {'vote': {'roll_call': 17}}})
+        self.respond('members/P000197.json', [{'id': 'P000197', 'name': u'Nanette Barrag\xe1n'}])
+
+        with Cassette(self.filename, record=True) as http:
+            congress = self.congress(http)
+            congress.votes.get('house', 17, 1, 116)
+            congress.members.get('P000197')
+        self.assertEqual(len(self.server.requests), 2)